@@ -0,0 +1,292 @@
+import errno
+import json
+import os
+import posixpath
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+
+import postprocess
+from manifest import BuildManifest
+
+# ways an asset can be copied, in the order they are tried
+HARDLINK = "hardlink"
+COPY_FILE_RANGE = "copy_file_range"
+SENDFILE = "sendfile"
+BUFFERED = "buffered"
+# errors meaning the kernel can not copy between these files, try the next way
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+# assets renamed after their content, files fetched by a well-known name
+# (favicon.ico, robots.txt) keep it
+FINGERPRINT_SUFFIXES = frozenset(
+    {
+        ".css",
+        ".js",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".svg",
+        ".webp",
+        ".avif",
+        ".woff",
+        ".woff2",
+        ".ttf",
+    }
+)
+FINGERPRINT_LENGTH = 8
+# original to fingerprinted asset paths, written to the output directory
+ASSET_MANIFEST = "assets.json"
+
+
+@dataclass
+class AssetSync:
+    """Outcome of syncing a static directory, paths are relative to it"""
+
+    copied: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    # number of copied assets per copy method
+    methods: dict[str, int] = field(default_factory=dict)
+    # output path of every asset, relative to the output directory
+    outputs: dict[str, str] = field(default_factory=dict)
+    # earlier outputs of assets whose output path changed
+    stale: list[str] = field(default_factory=list)
+    # assets whose .gz sibling was written
+    compressed: list[str] = field(default_factory=list)
+
+
+class AssetIndex:
+    """
+    Looks up the fingerprinted URL of an asset reference during rendering.
+
+    get() has the signature of dict.get, so renderers can take either. Root
+    relative URLs ("/styles.css") are always resolved, relative ones only by
+    the index of a page (see for_page), as they depend on the page directory.
+    Query strings and fragments are kept.
+    """
+
+    __slots__ = ("outputs", "base")
+
+    def __init__(self, outputs: dict[str, str], base: str | None = None):
+        self.outputs = outputs
+        self.base = base
+
+    def for_page(self, output: str) -> "AssetIndex":
+        """Returns an index resolving relative URLs of the page at output"""
+        return AssetIndex(self.outputs, posixpath.dirname(output))
+
+    def get(self, url: str, default: str | None = None) -> str | None:
+        """Returns the fingerprinted url, or default if url is not an asset"""
+        if not url or "://" in url or url.startswith(("//", "#", "data:", "mailto:")):
+            return default
+        end = len(url)
+        for separator in "?#":
+            index = url.find(separator)
+            if 0 <= index < end:
+                end = index
+        path = url[:end]
+        if path.startswith("/"):
+            asset = posixpath.normpath(path[1:])
+        elif self.base is not None:
+            asset = posixpath.normpath(posixpath.join(self.base, path))
+        else:
+            return default
+        output = self.outputs.get(asset)
+        if output is None or output == asset:
+            return default
+        # fingerprinting only renames the file, the directory stays the same
+        name = posixpath.basename(output)
+        return f"{posixpath.join(posixpath.dirname(path), name)}{url[end:]}"
+
+
+def fingerprinted_path(asset: str, asset_hash: str) -> str:
+    """Inserts the start of the content hash before the suffix of an asset path"""
+    path = PurePosixPath(asset)
+    if path.suffix.lower() not in FINGERPRINT_SUFFIXES:
+        return asset
+    name = f"{path.stem}.{asset_hash[:FINGERPRINT_LENGTH]}{path.suffix}"
+    return str(path.with_name(name))
+
+
+def write_asset_manifest(dest_dir: str | Path, outputs: dict[str, str]) -> None:
+    """Writes the original to fingerprinted path mapping for deploy tooling"""
+    path = Path(dest_dir) / ASSET_MANIFEST
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(outputs, f, indent=2, sort_keys=True)
+
+
+def find_assets(static_dir: Path) -> list[Path]:
+    """Returns every file below static_dir, relative to it and sorted"""
+    return sorted(
+        path.relative_to(static_dir)
+        for path in static_dir.rglob("*")
+        if path.is_file()
+    )
+
+
+def _copy_file_range(source_fd: int, destination_fd: int, size: int) -> None:
+    copied = 0
+    while copied < size:
+        count = os.copy_file_range(source_fd, destination_fd, size - copied)
+        if count == 0:
+            break
+        copied += count
+
+
+def _sendfile(source_fd: int, destination_fd: int, size: int) -> None:
+    copied = 0
+    while copied < size:
+        count = os.sendfile(destination_fd, source_fd, copied, size - copied)
+        if count == 0:
+            break
+        copied += count
+
+
+def _copy_contents(source: Path, destination: Path) -> str:
+    """Copies in the kernel when it can, returns the method that worked"""
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        for method, copy in (
+            (COPY_FILE_RANGE, _copy_file_range),
+            (SENDFILE, _sendfile),
+        ):
+            if not hasattr(os, method):
+                continue
+            try:
+                copy(src.fileno(), dst.fileno(), size)
+                return method
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                # start over with the next method
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+        shutil.copyfileobj(src, dst)
+        return BUFFERED
+
+
+def copy_asset(source: Path, destination: Path, hardlink: bool = False) -> str:
+    """
+    Copies a file without reading it through Python buffers where possible.
+
+    The copy is written next to the destination and moved over it, so a
+    server never sees a half copied file. With hardlink the destination
+    shares the data of the source, changing one changes the other.
+
+    :returns: str - HARDLINK, COPY_FILE_RANGE, SENDFILE or BUFFERED
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_name(destination.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        if hardlink:
+            try:
+                os.link(source, tmp_path)
+                os.replace(tmp_path, destination)
+                return HARDLINK
+            except OSError:
+                # e.g. another filesystem, copy instead
+                pass
+        method = _copy_contents(source, tmp_path)
+        shutil.copymode(source, tmp_path)
+        os.replace(tmp_path, destination)
+        return method
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def sync_assets(
+    static_dir: str | Path,
+    dest_dir: str | Path,
+    manifest: BuildManifest,
+    workers: int | None = None,
+    hardlink: bool = False,
+    force: bool = False,
+    paths: list[Path] | None = None,
+    fingerprint: bool = False,
+    gzip_level: int | None = None,
+) -> AssetSync:
+    """
+    Mirrors the files of static_dir into dest_dir, copying only changed ones.
+
+    An asset is skipped when its content hash and output path match the
+    manifest and its copy is still in dest_dir; the hash is only computed
+    again when size or mtime differ from the manifest. Hashing and copying run
+    in a thread pool, both release the GIL. Outputs of deleted assets and
+    earlier outputs of fingerprinted assets are not removed here, see
+    BuildManifest.remove_missing_assets and AssetSync.stale.
+
+    :param static_dir: directory with the assets
+    :param dest_dir: directory the assets are copied to
+    :param manifest: BuildManifest - records the copied assets
+    :param workers: copying threads, defaults to ThreadPoolExecutor's default
+    :param hardlink: link assets into dest_dir instead of copying them
+    :param force: copy every asset even if the manifest says it is up to date
+    :param paths: assets relative to static_dir, defaults to find_assets
+    :param fingerprint: name assets after their content, see fingerprinted_path
+    :param gzip_level: write .gz siblings of compressible assets at this zlib
+                       level, unless an unchanged asset has one at that level
+
+    :returns: AssetSync - copied and skipped assets
+    """
+    static_dir, dest_dir = Path(static_dir), Path(dest_dir)
+    compressed = set()  # filled by the threads, set.add is atomic
+
+    def compress(asset: str, destination: Path, copied: bool) -> int | None:
+        """Writes or removes the .gz sibling, returns its level if there is one"""
+        if gzip_level is None or not postprocess.is_compressible(destination):
+            if manifest.asset_gzip_level(asset) is not None:
+                postprocess.remove_gzip(destination)
+            return None
+        if (
+            copied
+            or manifest.asset_gzip_level(asset) != gzip_level
+            or not os.path.exists(postprocess.gzip_path(destination))
+        ):
+            postprocess.gzip_file(destination, gzip_level)
+            compressed.add(asset)
+        return gzip_level
+
+    def sync(
+        asset: Path,
+    ) -> tuple[str, os.stat_result, str, str, str | None, int | None]:
+        source = static_dir / asset
+        stat = source.stat()
+        asset_hash = manifest.asset_hash(str(asset), source, stat)
+        output = str(asset)
+        if fingerprint:
+            output = fingerprinted_path(output, asset_hash)
+        destination = dest_dir / output
+        method = None
+        if (
+            force
+            or not manifest.asset_is_fresh(str(asset), asset_hash, output)
+            or not destination.exists()
+        ):
+            method = copy_asset(source, destination, hardlink)
+        level = compress(str(asset), destination, method is not None)
+        return str(asset), stat, asset_hash, output, method, level
+
+    result = AssetSync()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for asset, stat, asset_hash, output, method, level in executor.map(
+            sync, find_assets(static_dir) if paths is None else paths
+        ):
+            previous = manifest.asset_output(asset)
+            if previous is not None and previous != output:
+                result.stale.append(previous)
+            # a touched but unchanged asset is recorded with its new stat too
+            manifest.record_asset(asset, stat, asset_hash, output, level)
+            result.outputs[asset] = output
+            if asset in compressed:
+                result.compressed.append(asset)
+            if method is None:
+                result.skipped.append(asset)
+                continue
+            result.copied.append(asset)
+            result.methods[method] = result.methods.get(method, 0) + 1
+    return result
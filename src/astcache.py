@@ -0,0 +1,127 @@
+import hashlib
+import marshal
+import os
+import zlib
+from pathlib import Path
+
+import page
+from blocknode import BlockType
+from textnode import TextNode, TextType
+
+# bump whenever parsing changes the produced blocks or TextNodes
+PARSER_VERSION = 5
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+CACHE_SUFFIX = ".ast"
+_COMPRESSION_LEVEL = 1
+
+
+def _dump_nodes(nodes: list[TextNode]) -> tuple:
+    return tuple((node.text, node.text_type.value, node.url) for node in nodes)
+
+
+def _load_nodes(nodes: tuple) -> list[TextNode]:
+    return [TextNode(text, TextType(text_type), url) for text, text_type, url in nodes]
+
+
+def dump_parsed(parsed: page.ParsedPage) -> bytes:
+    """Serializes a parsed page to compressed marshal bytes of plain tuples"""
+    title, fields, blocks, headings = parsed
+    data = []
+    for block_type, payload in blocks:
+        match block_type:
+            case BlockType.HEADING:
+                level, nodes, slug = payload
+                payload = (level, _dump_nodes(nodes), slug)
+            case BlockType.CODE:
+                pass
+            case BlockType.UNO_LIST | BlockType.ORD_LIST:
+                payload = tuple(_dump_nodes(nodes) for nodes in payload)
+            case _:
+                payload = _dump_nodes(payload)
+        data.append((block_type.value, payload))
+    return zlib.compress(
+        marshal.dumps((title, fields, tuple(data), tuple(headings))),
+        _COMPRESSION_LEVEL,
+    )
+
+
+def load_parsed(raw: bytes) -> page.ParsedPage:
+    """Restores a parsed page serialized by dump_parsed"""
+    title, fields, data, headings = marshal.loads(zlib.decompress(raw))
+    blocks = []
+    for value, payload in data:
+        block_type = BlockType(value)
+        match block_type:
+            case BlockType.HEADING:
+                level, nodes, slug = payload
+                payload = (level, _load_nodes(nodes), slug)
+            case BlockType.CODE:
+                pass
+            case BlockType.UNO_LIST | BlockType.ORD_LIST:
+                payload = [_load_nodes(nodes) for nodes in payload]
+            case _:
+                payload = _load_nodes(payload)
+        blocks.append((block_type, payload))
+    return title, fields, blocks, list(headings)
+
+
+class ASTCache:
+    """
+    On-disk cache of parsed pages keyed by source hash and parser version.
+
+    Every entry is a file, its mtime marks the last use. The cache may grow
+    past max_bytes while pages are rendered (possibly by several processes)
+    and is trimmed back by evict(), removing the least recently used entries.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, source_hash: str) -> Path:
+        # marshal format may change between Python versions
+        key = f"{PARSER_VERSION}:{marshal.version}:{source_hash}"
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / f"{digest}{CACHE_SUFFIX}"
+
+    def get(self, source_hash: str) -> page.ParsedPage | None:
+        """Returns the cached parse of a source or None, marking the entry as used"""
+        path = self._path(source_hash)
+        try:
+            raw = path.read_bytes()
+            os.utime(path)
+            return load_parsed(raw)
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            # missing, evicted meanwhile or corrupt entries are parsed again
+            return None
+
+    def put(self, source_hash: str, parsed: page.ParsedPage) -> None:
+        """Stores a parsed page, written to a temporary file first to stay atomic"""
+        path = self._path(source_hash)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(dump_parsed(parsed))
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits max_bytes"""
+        try:
+            entries = [
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(CACHE_SUFFIX)
+            ]
+        except FileNotFoundError:
+            return 0
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
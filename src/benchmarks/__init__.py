@@ -0,0 +1 @@
+"""Benchmarks for the site generator, run from src/ as `python3 -m benchmarks.<name>`"""
@@ -0,0 +1,101 @@
+"""
+Times inline.parse_inline on adversarial inputs of growing size.
+
+Every case repeats a pattern of unmatched or crossed delimiters, the inputs
+that make naive parsers rescan the rest of the text for every delimiter.
+The time per character should stay flat as the size grows; the growth column
+is the time ratio to the previous size divided by the size ratio, about 1.0
+for linear and the size ratio itself for quadratic time.
+
+Usage (from src/):
+    python3 -m benchmarks.adversarial [--sizes 10KB 100KB 1MB] [--repeat N]
+"""
+
+import argparse
+import time
+
+from benchmarks.corpus import parse_size
+from inline import parse_inline
+
+DEFAULT_SIZES = ["10KB", "100KB", "1MB"]
+
+
+def _backtick_runs(size: int) -> str:
+    # runs of every length once, none of them closes another
+    parts = []
+    length = 0
+    total = 0
+    while total < size:
+        length += 1
+        parts.append("`" * length + " a ")
+        total += length + 3
+    return "".join(parts)
+
+
+# name: function building an input of about the given size
+CASES = {
+    "unmatched_underscores": lambda size: " _a" * (size // 3 + 1),
+    "unmatched_stars": lambda size: "**a " * (size // 4 + 1),
+    "closers_only": lambda size: "a_ b** " * (size // 7 + 1),
+    "crossed": lambda size: "**a _b** c_ " * (size // 12 + 1),
+    "deep_openers": lambda size: "**a _b " * (size // 14) + "c_ d** " * (size // 14),
+    "backtick_runs": _backtick_runs,
+    "brackets": lambda size: "[a](b " * (size // 6 + 1),
+}
+
+
+def time_case(text: str, repeat: int) -> float:
+    """Returns the best of repeat runs of parse_inline on text in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_inline(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(sizes: list[int], repeat: int) -> list[dict]:
+    """Times every case at every size"""
+    results = []
+    for case, build in CASES.items():
+        for size in sizes:
+            text = build(size)
+            seconds = time_case(text, repeat)
+            results.append(
+                {
+                    "case": case,
+                    "chars": len(text),
+                    "seconds": seconds,
+                    "ns_per_char": seconds / len(text) * 1e9,
+                }
+            )
+    return results
+
+
+def format_results(results: list[dict]) -> str:
+    lines = [f"{'case':<24}{'chars':>10}{'seconds':>10}{'ns/char':>9}{'growth':>8}"]
+    previous = None
+    for row in results:
+        growth = ""
+        if previous is not None and previous["case"] == row["case"]:
+            time_ratio = row["seconds"] / previous["seconds"]
+            growth = f"{time_ratio / (row['chars'] / previous['chars']):.2f}"
+        lines.append(
+            f"{row['case']:<24}{row['chars']:>10}{row['seconds']:>10.4f}"
+            f"{row['ns_per_char']:>9.0f}{growth:>8}"
+        )
+        previous = row
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sizes = [parse_size(size) for size in args.sizes]
+    print(format_results(benchmark(sizes, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Seeded synthetic markdown corpus generator.
+
+Documents are built from randomly chosen blocks (paragraphs, headings, lists,
+code and quotes) with inline markup sprinkled over the words. The markup is
+always balanced, so every generated document parses with text_to_textnodes.
+
+Usage (from src/):
+    python3 -m benchmarks.corpus 10MB corpus.md [--seed N] [--inline-density F]
+"""
+
+import argparse
+import random
+from typing import Iterator, TextIO
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua static site generator markdown "
+    "block inline node parser render template page build cache"
+).split()
+DEFAULT_MIX = {
+    "paragraph": 10,
+    "heading": 2,
+    "unordered_list": 2,
+    "ordered_list": 1,
+    "code": 1,
+    "quote": 1,
+}
+DEFAULT_INLINE_DENSITY = 0.1
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_size(size: str) -> int:
+    """Converts sizes like "1KB", "100MB" or "512" to bytes"""
+    size = size.strip().upper()
+    for unit, factor in sorted(SIZE_UNITS.items(), key=lambda item: -len(item[0])):
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * factor)
+    return int(size)
+
+
+class CorpusGenerator:
+    """
+    Generates markdown blocks from a seeded random generator.
+
+    Attributes:
+        mix (dict[str, int]): Relative weights of the block kinds.
+        inline_density (float): Probability that a word gets inline markup.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        mix: dict[str, int] | None = None,
+        inline_density: float = DEFAULT_INLINE_DENSITY,
+    ):
+        self.rng = random.Random(seed)
+        self.mix = dict(mix or DEFAULT_MIX)
+        unknown = set(self.mix) - set(DEFAULT_MIX)
+        if unknown:
+            raise ValueError(f"Unknown block kinds: {', '.join(sorted(unknown))}")
+        self.inline_density = inline_density
+        self._kinds = list(self.mix)
+        self._weights = list(self.mix.values())
+
+    def _word(self) -> str:
+        word = self.rng.choice(WORDS)
+        if self.rng.random() >= self.inline_density:
+            return word
+        match self.rng.randrange(5):
+            case 0:
+                return f"**{word}**"
+            case 1:
+                return f"_{word}_"
+            case 2:
+                return f"`{word}`"
+            case 3:
+                return f"[{word}](https://example.com/{word})"
+            case _:
+                return f"![{word}](/images/{word}.png)"
+
+    def _sentence(self, low: int, high: int) -> str:
+        return " ".join(self._word() for _ in range(self.rng.randint(low, high)))
+
+    def block(self) -> str:
+        """Returns one markdown block of a kind picked according to the mix"""
+        kind = self.rng.choices(self._kinds, self._weights)[0]
+        match kind:
+            case "heading":
+                return "#" * self.rng.randint(1, 6) + " " + self._sentence(2, 8)
+            case "unordered_list":
+                count = self.rng.randint(2, 8)
+                return "\n".join("- " + self._sentence(3, 12) for _ in range(count))
+            case "ordered_list":
+                count = self.rng.randint(2, 8)
+                return "\n".join(
+                    f"{number}. " + self._sentence(3, 12)
+                    for number in range(1, count + 1)
+                )
+            case "code":
+                lines = [
+                    "    " * self.rng.randint(0, 2)
+                    + " ".join(self.rng.choices(WORDS, k=self.rng.randint(1, 8)))
+                    for _ in range(self.rng.randint(2, 12))
+                ]
+                return "```\n" + "\n".join(lines) + "\n```"
+            case "quote":
+                count = self.rng.randint(1, 4)
+                return "\n".join("> " + self._sentence(5, 15) for _ in range(count))
+            case _:
+                count = self.rng.randint(1, 5)
+                return "\n".join(self._sentence(5, 20) for _ in range(count))
+
+    def iter_blocks(self, size: int) -> Iterator[str]:
+        """Yields blocks until they add up to at least size characters"""
+        total = 0
+        while total < size:
+            block = self.block()
+            total += len(block) + 2
+            yield block
+
+    def document(self, size: int) -> str:
+        """Returns a document of about size characters, starting with an h1 title"""
+        return "# Synthetic document\n\n" + "\n\n".join(self.iter_blocks(size))
+
+    def write(self, fileobj: TextIO, size: int) -> int:
+        """Streams a document of about size characters to fileobj, returns its length"""
+        written = fileobj.write("# Synthetic document")
+        for block in self.iter_blocks(size):
+            written += fileobj.write("\n\n" + block)
+        return written
+
+
+def generate_document(
+    size: int,
+    seed: int = 0,
+    mix: dict[str, int] | None = None,
+    inline_density: float = DEFAULT_INLINE_DENSITY,
+) -> str:
+    """Shortcut for CorpusGenerator(seed, mix, inline_density).document(size)"""
+    return CorpusGenerator(seed, mix, inline_density).document(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("size", help="document size, e.g. 1KB, 10MB")
+    parser.add_argument("output", help="markdown file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--inline-density", type=float, default=DEFAULT_INLINE_DENSITY)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed, inline_density=args.inline_density)
+    with open(args.output, "w", encoding="utf-8") as f:
+        written = generator.write(f, parse_size(args.size))
+    print(f"Wrote {written} characters to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
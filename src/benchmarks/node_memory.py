@@ -0,0 +1,110 @@
+"""
+Reports memory used per node for TextNode, LeafNode and ParentNode.
+
+The "before" numbers come from replicas of the original node classes, which
+kept a per-instance __dict__ and stored their attributes as given.
+
+Usage (from src/):
+    python3 -m benchmarks.node_memory [--paragraphs N]
+"""
+
+import argparse
+import random
+import tracemalloc
+
+import htmlnode
+import textnode
+
+
+class LegacyTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class LegacyHTMLNode:
+    def __init__(self, tag=None, value=None, children=[], props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "site", "page", "node", "block"]
+MARKUP = ["**{}**", "_{}_", "`{}`", "[{}](https://example.com/{})", "![{}](img/{}.png)"]
+
+
+def synthetic_paragraphs(count: int, seed: int = 0) -> list[str]:
+    """Builds paragraphs with a mix of plain words and inline markup"""
+    rng = random.Random(seed)
+    paragraphs = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(10, 40)):
+            word = rng.choice(WORDS)
+            if rng.random() < 0.2:
+                word = rng.choice(MARKUP).format(word, word)
+            words.append(word)
+        paragraphs.append(" ".join(words))
+    return paragraphs
+
+
+def fresh(tag: str | None) -> str | None:
+    """Returns a new copy of the tag, as a parser reading it from a document would"""
+    return (tag + " ")[:-1] if tag else tag
+
+
+def bytes_per_node(build) -> float:
+    """Runs build() under tracemalloc and divides the retained memory by node count"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained / len(nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paragraphs", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # parse up front, only node construction is measured
+    spans = [
+        (node.text, node.text_type, node.url)
+        for paragraph in synthetic_paragraphs(args.paragraphs, args.seed)
+        for node in textnode.text_to_textnodes(paragraph)
+    ]
+    leaves = [
+        (textnode.text_node_to_html_node(textnode.TextNode(*span)).tag, span[0])
+        for span in spans
+    ]
+
+    cases = {
+        "TextNode": (
+            lambda: [LegacyTextNode(*span) for span in spans],
+            lambda: [textnode.TextNode(*span) for span in spans],
+        ),
+        "LeafNode": (
+            lambda: [LegacyHTMLNode(fresh(tag), text) for tag, text in leaves],
+            lambda: [htmlnode.LeafNode(fresh(tag), text) for tag, text in leaves],
+        ),
+        "ParentNode": (
+            lambda: [LegacyHTMLNode(fresh("div"), None, []) for _ in spans],
+            lambda: [htmlnode.ParentNode(fresh("div"), []) for _ in spans],
+        ),
+    }
+
+    print(f"{len(spans)} nodes from {args.paragraphs} paragraphs")
+    print(f"{'node':<12}{'before':>12}{'after':>12}{'saved':>8}")
+    for name, (legacy, current) in cases.items():
+        before = bytes_per_node(legacy)
+        after = bytes_per_node(current)
+        saved = 1 - after / before
+        print(f"{name:<12}{before:>10.1f} B{after:>10.1f} B{saved:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
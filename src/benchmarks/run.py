@@ -0,0 +1,152 @@
+"""
+Times every stage of the markdown to HTML pipeline on synthetic documents.
+
+Stages are timed separately on the output of the previous stage:
+    markdown_to_blocks, block_to_block_type, text_to_textnodes,
+    text_node_to_html_node, to_html, render_html
+render_html is the direct renderer the build uses instead of the last two.
+Results are written as JSON, pass an earlier result file as --baseline to
+print the speedup of every stage.
+
+Usage (from the repository root):
+    ./bench.sh [--sizes 1KB 1MB] [--repeat N] [--output results.json]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import page
+from benchmarks.corpus import DEFAULT_INLINE_DENSITY, CorpusGenerator, parse_size
+from blocknode import block_to_block_type, markdown_to_blocks
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = ["1KB", "100KB", "1MB"]
+STAGES = (
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "text_node_to_html_node",
+    "to_html",
+    "render_html",
+)
+
+
+def run_stages(document: str) -> dict[str, float]:
+    """Runs the pipeline once and returns the seconds spent in every stage"""
+    timings = {}
+    clock = time.perf_counter
+
+    start = clock()
+    blocks = markdown_to_blocks(document)
+    timings["markdown_to_blocks"] = clock() - start
+
+    start = clock()
+    types = [block_to_block_type(block) for block in blocks]
+    timings["block_to_block_type"] = clock() - start
+
+    start = clock()
+    parsed = [
+        (block_type, page.parse_block(block_type, block.split("\n")))
+        for block_type, block in zip(types, blocks)
+    ]
+    timings["text_to_textnodes"] = clock() - start
+
+    start = clock()
+    tree = page.parsed_to_html_node(parsed)
+    timings["text_node_to_html_node"] = clock() - start
+
+    start = clock()
+    tree.to_html()
+    timings["to_html"] = clock() - start
+
+    start = clock()
+    page.render_blocks(parsed)
+    timings["render_html"] = clock() - start
+    return timings
+
+
+def benchmark(
+    sizes: list[int], repeat: int, seed: int, inline_density: float
+) -> list[dict]:
+    """Times every stage repeat times for each document size"""
+    results = []
+    for size in sizes:
+        document = CorpusGenerator(seed, inline_density=inline_density).document(size)
+        runs = [run_stages(document) for _ in range(repeat)]
+        for stage in STAGES:
+            seconds = [run[stage] for run in runs]
+            best = min(seconds)
+            results.append(
+                {
+                    "size": size,
+                    "stage": stage,
+                    "min": best,
+                    "median": statistics.median(seconds),
+                    "mb_per_s": len(document) / 2**20 / best if best else None,
+                }
+            )
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict]) -> str:
+    """Formats the speedup of results over baseline for matching size and stage"""
+    before = {(row["size"], row["stage"]): row["min"] for row in baseline}
+    lines = [f"{'size':>12} {'stage':<24}{'baseline':>12}{'current':>12}{'speedup':>9}"]
+    for row in results:
+        old = before.get((row["size"], row["stage"]))
+        if old is None:
+            continue
+        speedup = old / row["min"] if row["min"] else float("inf")
+        lines.append(
+            f"{row['size']:>12} {row['stage']:<24}{old:>11.4f}s{row['min']:>11.4f}s"
+            f"{speedup:>8.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--inline-density", type=float, default=DEFAULT_INLINE_DENSITY)
+    parser.add_argument("--output", help="JSON file for the results (default: stdout)")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "inline_density": args.inline_density,
+        "repeat": args.repeat,
+        "results": benchmark(
+            [parse_size(size) for size in args.sizes],
+            args.repeat,
+            args.seed,
+            args.inline_density,
+        ),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(compare(report["results"], baseline["results"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import unittest
+
+from benchmarks.adversarial import CASES, benchmark, format_results, time_case
+
+
+class TestAdversarial(unittest.TestCase):
+    def test_linear(self):
+        # quadratic time would grow 16 times more than the input
+        for case, build in CASES.items():
+            small, large = build(4096), build(16 * 4096)
+            ratio = time_case(large, 3) / time_case(small, 3)
+            self.assertLess(ratio / (len(large) / len(small)), 4, case)
+
+    def test_format_results(self):
+        table = format_results(benchmark([256, 512], 1))
+        self.assertEqual(len(table.splitlines()), 1 + 2 * len(CASES))
+
+
+if __name__ == "__main__":
+    unittest.main()
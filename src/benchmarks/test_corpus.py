@@ -0,0 +1,50 @@
+import io
+import unittest
+
+from benchmarks.corpus import CorpusGenerator, generate_document, parse_size
+from benchmarks.run import STAGES, run_stages
+from page import markdown_to_html_node
+
+
+class TestCorpus(unittest.TestCase):
+    def test_parse_size(self):
+        self.assertEqual(parse_size("512"), 512)
+        self.assertEqual(parse_size("1KB"), 1024)
+        self.assertEqual(parse_size("1.5mb"), 1536 * 1024)
+        self.assertEqual(parse_size("100MB"), 100 * 1024**2)
+
+    def test_seeded(self):
+        self.assertEqual(generate_document(4096, seed=3), generate_document(4096, seed=3))
+        self.assertNotEqual(generate_document(4096, seed=3), generate_document(4096))
+
+    def test_size(self):
+        document = generate_document(64 * 1024)
+        self.assertGreaterEqual(len(document), 64 * 1024)
+        self.assertLess(len(document), 70 * 1024)
+
+    def test_document_parses(self):
+        document = generate_document(32 * 1024, inline_density=0.5)
+        self.assertTrue(markdown_to_html_node(document).to_html().startswith("<div>"))
+
+    def test_mix(self):
+        document = generate_document(4096, mix={"code": 1})
+        self.assertEqual(document.count("```") % 2, 0)
+        self.assertNotIn("\n- ", document)
+
+    def test_unknown_mix(self):
+        with self.assertRaises(ValueError):
+            CorpusGenerator(mix={"table": 1})
+
+    def test_write_matches_document(self):
+        output = io.StringIO()
+        written = CorpusGenerator(seed=1).write(output, 4096)
+        self.assertEqual(output.getvalue(), generate_document(4096, seed=1))
+        self.assertEqual(written, len(output.getvalue()))
+
+    def test_run_stages(self):
+        timings = run_stages(generate_document(4096))
+        self.assertEqual(tuple(timings), STAGES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,15 @@
 # the regex approach seem to be not a good idea here due to numerous possible recompilations
+import io
+import mmap
+import os
 from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, TextIO
 
+from profiling import timed
 
+
+@timed("markdown_to_blocks")
 def markdown_to_blocks(markdown: str) -> list[str]:
     """Split a raw markdown document to blocks.
 
@@ -13,6 +21,7 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     return [block.strip() for block in markdown.split("\n\n") if block.strip()]
 
 
+@timed("block_to_block_type")
 def block_to_block_type(markdown_block: str) -> "BlockType":
     """Pair a markdown block string with a right BlockType.
 
@@ -26,51 +35,237 @@ def block_to_block_type(markdown_block: str) -> "BlockType":
     if not isinstance(markdown_block, str):
         raise ValueError("Block should be string")
 
-    markdown_block = markdown_block.strip()
-
-    # helper functions for markdown syntax
-    def code_block_check(multiline_block: str) -> bool:
-        """Check if the block is a code block"""
-        lines = multiline_block.split("\n")
-        return lines[0].startswith("```") and lines[-1].startswith("```")
-
-    def quote_check(multiline_block: str) -> bool:
-        """Check quote syntax rule for each line"""
-        lines = multiline_block.split("\n")
-        return all(ln.startswith("> ") for ln in lines)
-
-    def unordered_list_check(multiline_block: str) -> bool:
-        """Check unordered list syntax rule for each line"""
-        lines = multiline_block.split("\n")
-        return all(ln.startswith("- ") for ln in lines)
-
-    def ordered_list_check(multiline_block: str) -> bool:
-        """Check ordered list syntax rule for each line"""
-        lines = multiline_block.split("\n")
-        return all(ln.startswith(f"{num}. ") for num, ln in enumerate(lines, start=1))
-
-    # ruleset withevery markdown syntax rule
-    # lambdas are used due to efficiency, not elegance
-    markdown_syntax_ruleset = [
-        (lambda s: s.startswith("# "), BlockType.HEADING),
-        (lambda s: s.startswith("## "), BlockType.HEADING),
-        (lambda s: s.startswith("### "), BlockType.HEADING),
-        (lambda s: s.startswith("#### "), BlockType.HEADING),
-        (lambda s: s.startswith("##### "), BlockType.HEADING),
-        (lambda s: s.startswith("###### "), BlockType.HEADING),
-        (code_block_check, BlockType.CODE),
-        (quote_check, BlockType.QUOTE),
-        (unordered_list_check, BlockType.UNO_LIST),
-        (ordered_list_check, BlockType.ORD_LIST),
-    ]
-
-    for syntax_rule, block_type in markdown_syntax_ruleset:
-        if syntax_rule(markdown_block):
-            return block_type
+    lines = markdown_block.strip().split("\n")
+    block_type = _first_line_type(lines[0])
+
+    if block_type is BlockType.CODE:
+        return block_type if lines[-1].startswith("```") else BlockType.PARAGRAPH
+
+    if block_type in _LINE_RULES:
+        for number, line in enumerate(lines[1:], start=2):
+            if not _line_continues(block_type, line, number):
+                return BlockType.PARAGRAPH
+
+    return block_type
+
+
+def _first_line_type(line: str) -> "BlockType":
+    """Guess the type of a block from its first (left stripped) line.
+
+    The first character is enough to pick a single candidate, so every other
+    syntax rule is skipped.
+    """
+    if not line:
+        return BlockType.PARAGRAPH
+
+    match line[0]:
+        case "#":
+            level = len(line) - len(line.lstrip("#"))
+            if level <= 6 and line[level : level + 1] == " ":
+                return BlockType.HEADING
+        case "`":
+            if line.startswith("```"):
+                return BlockType.CODE
+        case ">":
+            if line.startswith("> "):
+                return BlockType.QUOTE
+        case "-":
+            if line.startswith("- "):
+                return BlockType.UNO_LIST
+        case "1":
+            if line.startswith("1. "):
+                return BlockType.ORD_LIST
 
     return BlockType.PARAGRAPH
 
 
+def _line_continues(block_type: "BlockType", line: str, number: int) -> bool:
+    """Check if the line with given 1-based number keeps a block of block_type valid"""
+    if block_type is BlockType.ORD_LIST:
+        return line.startswith(f"{number}. ")
+    return line.startswith(_LINE_RULES[block_type])
+
+
+def _finish_block(block_type: "BlockType", block: list[str]) -> "BlockType":
+    """Right strips the last line of a block and checks its type against it again.
+
+    A type is picked before the trailing whitespace of the last line is known,
+    so "- " may have started or continued a list that ends up as "-".
+    """
+    last = block[-1] = block[-1].rstrip()
+    if len(block) == 1:
+        return _first_line_type(last)
+    if block_type in _LINE_RULES and not _line_continues(block_type, last, len(block)):
+        return BlockType.PARAGRAPH
+    return block_type
+
+
+def _closes_own_fence(line: str) -> bool:
+    """Check if the opening fence line of a code block also closes it ("```x```")"""
+    line = line.rstrip()
+    return len(line) > 3 and line.endswith("```")
+
+
+@timed("parse_blocks")
+def iter_blocks(lines: Iterable[str]) -> Iterator[tuple["BlockType", list[str]]]:
+    """Group markdown lines into typed blocks in a single pass.
+
+    Blocks are separated by blank lines, except inside a fenced code block,
+    which runs until its closing fence (or the end of the input) unless its
+    opening line closes it too. The type is picked from the first character of
+    the block and only downgraded to a paragraph when a following line breaks
+    the rule, so every line is read once.
+
+    :param lines: Iterable[str] - markdown lines without trailing newlines
+
+    :returns: Iterator[tuple[BlockType, list[str]]] - block type with the block lines,
+              stripped the same way markdown_to_blocks strips a block
+    """
+    block_type = None
+    block = []
+
+    for line in lines:
+        if block_type is BlockType.CODE:
+            block.append(line)
+            if line.startswith("```"):
+                block[-1] = line.rstrip()
+                yield block_type, block
+                block_type, block = None, []
+            continue
+
+        if not line.strip():
+            if block:
+                yield _finish_block(block_type, block), block
+                block_type, block = None, []
+            continue
+
+        if not block:
+            line = line.lstrip()
+            block_type = _first_line_type(line)
+            if block_type is BlockType.CODE and _closes_own_fence(line):
+                yield block_type, [line.rstrip()]
+                block_type = None
+                continue
+        elif block_type in _LINE_RULES and not _line_continues(
+            block_type, line, len(block) + 1
+        ):
+            block_type = BlockType.PARAGRAPH
+        block.append(line)
+
+    if block:
+        yield _finish_block(block_type, block), block
+
+
+def parse_blocks(markdown: str) -> Iterator[tuple["BlockType", list[str]]]:
+    """Split a raw markdown document to typed blocks in a single pass.
+
+    Replaces markdown_to_blocks followed by block_to_block_type, and keeps
+    fenced code blocks containing blank lines together.
+
+    :param markdown: str - a string representing markdown document
+
+    :returns: Iterator[tuple[BlockType, list[str]]] - block type with the block lines
+    """
+    return iter_blocks(markdown.split("\n"))
+
+
+def _iter_mmap_lines(buffer: mmap.mmap, encoding: str) -> Iterator[str]:
+    """Decodes a memory-mapped file line by line, never copying the whole file"""
+    start = 0
+    while True:
+        end = buffer.find(b"\n", start)
+        if end == -1:
+            # the text after the last newline, "" when the file ends with one
+            yield buffer[start:].decode(encoding)
+            return
+        line = buffer[start:end]
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        yield line.decode(encoding)
+        start = end + 1
+
+
+def iter_lines(
+    source: TextIO | BinaryIO | mmap.mmap, encoding: str = "utf-8"
+) -> Iterator[str]:
+    """Yields the lines of a markdown source without line endings.
+
+    :param source: TextIO | BinaryIO | mmap - text or binary file object, or a
+                   memory-mapped file; binary sources are decoded line by line,
+                   so the encoding has to be ASCII compatible (e.g. UTF-8)
+    :param encoding: str - encoding of binary sources
+
+    :returns: Iterator[str] - lines of the source, read lazily, the same lines
+              str.split("\n") gives, so a source ending with a newline ends
+              with an empty line
+    """
+    if isinstance(source, mmap.mmap):
+        yield from _iter_mmap_lines(source, encoding)
+        return
+
+    binary = isinstance(source, (io.RawIOBase, io.BufferedIOBase))
+    newline = True  # an empty source is a single empty line
+    for line in source:
+        if binary:
+            line = line.decode(encoding)
+        newline = line.endswith("\n")
+        if newline:
+            line = line[:-1]
+        if line.endswith("\r"):
+            line = line[:-1]
+        yield line
+    if newline:
+        yield ""
+
+
+def read_blocks(
+    source: TextIO | BinaryIO | mmap.mmap, encoding: str = "utf-8"
+) -> Iterator[tuple["BlockType", list[str]]]:
+    """Split a markdown file to typed blocks incrementally.
+
+    Only the block being built is held in memory, so documents larger than
+    memory can be fed to a streaming renderer.
+
+    :param source: TextIO | BinaryIO | mmap - see iter_lines
+    :param encoding: str - encoding of binary sources
+
+    :returns: Iterator[tuple[BlockType, list[str]]] - same blocks as parse_blocks
+    """
+    return iter_blocks(iter_lines(source, encoding))
+
+
+def read_blocks_from_path(
+    path: str | Path, encoding: str = "utf-8"
+) -> Iterator[tuple["BlockType", list[str]]]:
+    """Split a markdown file to typed blocks through a memory map of the file.
+
+    :param path: str | Path - markdown file
+    :param encoding: str - encoding of the file, has to be ASCII compatible
+
+    :returns: Iterator[tuple[BlockType, list[str]]] - same blocks as parse_blocks
+    """
+    with open(path, "rb") as f:
+        # empty files can not be memory-mapped
+        if not os.fstat(f.fileno()).st_size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from read_blocks(buffer, encoding)
+
+
+def stream_markdown_blocks(
+    source: TextIO | BinaryIO | mmap.mmap, encoding: str = "utf-8"
+) -> Iterator[str]:
+    """Streaming counterpart of markdown_to_blocks, yields block strings.
+
+    :param source: TextIO | BinaryIO | mmap - see iter_lines
+    :param encoding: str - encoding of binary sources
+
+    :returns: Iterator[str] - markdown blocks with preserved formatting
+    """
+    for _, lines in read_blocks(source, encoding):
+        yield "\n".join(lines)
+
+
 class BlockType(Enum):
     """Enum class representing different types of markdown blocks."""
 
@@ -80,3 +275,11 @@ class BlockType(Enum):
     QUOTE = "quote"
     UNO_LIST = "unordered_list"
     ORD_LIST = "ordered_list"
+
+
+# line prefix every line of a block has to keep (ordered lists are numbered)
+_LINE_RULES = {
+    BlockType.QUOTE: "> ",
+    BlockType.UNO_LIST: "- ",
+    BlockType.ORD_LIST: None,
+}
@@ -0,0 +1,570 @@
+import functools
+import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import assets
+import inline
+import memprofile
+import page
+import postprocess
+import profiling
+import templates
+import textnode
+import toc
+from astcache import DEFAULT_CACHE_SIZE, ASTCache
+from manifest import BuildManifest, text_hash
+
+# part of the template hash of every page, bump whenever a change of the code
+# changes the HTML rendered from the same source, so existing outputs are
+# rendered again instead of being skipped as unchanged
+RENDER_VERSION = 4
+
+MARKDOWN_SUFFIX = ".md"
+HTML_SUFFIX = ".html"
+DEFAULT_CHUNKSIZE = 16
+
+DEFAULT_MANIFEST = ".build/manifest.json"
+DEFAULT_AST_CACHE = ".build/ast"
+INLINE_CACHE_COUNTERS = ("hits", "misses", "evictions")
+# sources larger than this are streamed block by block instead of parsed whole
+DEFAULT_STREAM_THRESHOLD = 32 * 2**20
+
+# template and caches shared by the pages rendered in a worker process
+_template = None
+_ast_cache = None
+_inline_cache = None
+_stream_threshold = None
+_asset_index = None
+_minify = False
+_gzip_level = None
+_nested_inline = False
+_heading_index = False
+
+
+@dataclass
+class PageResult:
+    """What a worker reports back about a rendered page"""
+
+    # the parsed page came from the AST cache
+    parse_cached: bool
+    # growth of the inline cache counters while parsing the page
+    inline_counters: tuple[int, ...]
+    # span self times of the page when profiling, see profiling.collect
+    spans: dict[str, float] | None = None
+    # peak and retained bytes when profiling memory, see memprofile.finish_page
+    memory: dict | None = None
+    # hash of the written output, None for streamed pages
+    output_hash: str | None = None
+    # the .gz sibling was written
+    compressed: bool = False
+    # level, text and id of every heading of the page, None for a streamed page
+    # whose headings were not collected
+    headings: list[toc.Heading] | None = None
+
+
+@dataclass
+class BuildReport:
+    """Outcome of a build, paths are relative to the content/output directories"""
+
+    rendered: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    # rendered pages whose parse came from the AST cache
+    parse_cache_hits: int = 0
+    # inline parse cache counters summed over the workers, see InlineParseCache
+    inline_cache: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(INLINE_CACHE_COUNTERS, 0)
+    )
+    # span self times per rendered page, only filled when profiling
+    page_times: dict[str, dict[str, float]] = field(default_factory=dict)
+    # memory measurements per rendered page, only filled when profiling memory
+    page_memory: dict[str, dict] = field(default_factory=dict)
+    # copied and skipped static assets, paths are relative to the static directory
+    asset_sync: assets.AssetSync = field(default_factory=assets.AssetSync)
+    deleted_assets: list[str] = field(default_factory=list)
+    # pages and assets whose .gz sibling was written, paths relative to the output
+    compressed: list[str] = field(default_factory=list)
+
+    def add(self, source: str, result: PageResult) -> None:
+        """Records a rendered page"""
+        self.rendered.append(source)
+        if result.compressed:
+            self.compressed.append(output_path(Path(source)).as_posix())
+        self.parse_cache_hits += result.parse_cached
+        for counter, value in zip(INLINE_CACHE_COUNTERS, result.inline_counters):
+            self.inline_cache[counter] += value
+        if result.spans is not None:
+            self.page_times[source] = result.spans
+        if result.memory is not None:
+            self.page_memory[source] = result.memory
+
+    def summary(self) -> str:
+        return (
+            f"rendered {len(self.rendered)} "
+            f"({self.parse_cache_hits} from parse cache), "
+            f"skipped {len(self.skipped)} unchanged, "
+            f"deleted {len(self.deleted)} stale pages, "
+            f"inline cache {self.inline_cache['hits']} hits / "
+            f"{self.inline_cache['misses']} misses / "
+            f"{self.inline_cache['evictions']} evictions, "
+            f"assets {len(self.asset_sync.copied)} copied / "
+            f"{len(self.asset_sync.skipped)} unchanged / "
+            f"{len(self.deleted_assets)} deleted, "
+            f"compressed {len(self.compressed)}"
+        )
+
+
+def find_pages(content_dir: Path) -> list[Path]:
+    """Returns every markdown file below content_dir, relative to it and sorted"""
+    return sorted(
+        path.relative_to(content_dir)
+        for path in content_dir.rglob(f"*{MARKDOWN_SUFFIX}")
+        if path.is_file()
+    )
+
+
+def output_path(source: Path) -> Path:
+    """Maps a markdown path relative to content to its HTML path relative to public"""
+    return source.with_suffix(HTML_SUFFIX)
+
+
+def _init_worker(
+    template: templates.Template,
+    ast_cache: ASTCache | None = None,
+    inline_cache_size: int = 0,
+    profile: bool = False,
+    memory_profile: bool = False,
+    stream_threshold: int | None = DEFAULT_STREAM_THRESHOLD,
+    asset_index: assets.AssetIndex | None = None,
+    minify: bool = False,
+    gzip_level: int | None = None,
+    nested_inline: bool = False,
+    heading_index: bool = False,
+) -> None:
+    """Stores the template and caches once per worker instead of sending them per job"""
+    global _template, _ast_cache, _inline_cache, _stream_threshold, _asset_index
+    global _minify, _gzip_level, _nested_inline, _heading_index
+    profiling.enable(profile)
+    memprofile.enable(memory_profile)
+    _template = template
+    _ast_cache = ast_cache
+    _inline_cache = (
+        textnode.InlineParseCache(inline_cache_size) if inline_cache_size else None
+    )
+    _stream_threshold = stream_threshold
+    _asset_index = asset_index
+    _minify = minify
+    _gzip_level = gzip_level
+    _nested_inline = nested_inline
+    _heading_index = heading_index
+
+
+def _inline_counters() -> tuple[int, ...]:
+    if _inline_cache is None:
+        return (0,) * len(INLINE_CACHE_COUNTERS)
+    stats = _inline_cache.stats()
+    return tuple(stats[counter] for counter in INLINE_CACHE_COUNTERS)
+
+
+@contextmanager
+def _stage(name: str):
+    """Times and measures the memory of a pipeline stage, when enabled"""
+    with profiling.span(name), memprofile.measure(name):
+        yield
+
+
+def _render_job(job: tuple) -> PageResult:
+    """Renders one markdown file to its output path"""
+    before = _inline_counters()
+    memprofile.start_page()
+    cached, output_hash, compressed, headings = _render_page(*job)
+    # measured after _render_page returned, so its locals are freed
+    memory = memprofile.finish_page()
+    counters = tuple(after - start for after, start in zip(_inline_counters(), before))
+    spans = profiling.collect() if profiling.is_enabled() else None
+    return PageResult(
+        cached, counters, spans, memory, output_hash, compressed, headings
+    )
+
+
+def _parse_inline(output: str) -> page.InlineParser:
+    if _nested_inline:
+        # parse_inline replaces the URLs itself, they are looked up while parsing
+        return functools.partial(inline.parse_inline, urls=_page_urls(output))
+    return textnode.text_to_textnodes if _inline_cache is None else _inline_cache
+
+
+def _page_urls(output: str) -> assets.AssetIndex | None:
+    return _asset_index.for_page(output) if _asset_index is not None else None
+
+
+def _render_page(
+    source: str,
+    destination: str,
+    source_hash: str,
+    output: str,
+    written: tuple[str | None, int | None] = (None, None),
+) -> tuple[bool, str | None, bool, list[toc.Heading] | None]:
+    """
+    Renders a page. written is the output hash and gzip level of the last build,
+    an output with the same hash is not written or compressed again.
+
+    :returns: tuple - the parse came from the AST cache, the output hash,
+                      whether the .gz sibling was written and the headings
+    """
+    if _stream_threshold is not None and os.path.getsize(source) > _stream_threshold:
+        headings = _stream_page(source, destination, output)
+        return False, None, _compress(destination), headings
+    try:
+        with _stage("parse_cache"):
+            parsed = _ast_cache.get(source_hash) if _ast_cache else None
+        cached = parsed is not None
+        if not cached:
+            with _stage("read"):
+                with open(source, encoding="utf-8") as f:
+                    markdown = f.read()
+            with _stage("parse"):
+                parsed = page.parse_page(markdown, _parse_inline(output))
+            del markdown
+        title, fields, blocks, headings = parsed
+        with _stage("render"):
+            content = page.render_blocks(blocks, _page_urls(output))
+            contents = toc.render_toc(headings)
+        with _stage("template"):
+            rendered = page.fill_template(_template, title, content, fields, contents)
+        del content
+        if _minify:
+            with _stage("minify"):
+                rendered = postprocess.minify_html(rendered)
+    except Exception as e:
+        raise RuntimeError(f"Failed to render {source}: {e}") from e
+    with _stage("write"):
+        if not cached and _ast_cache:
+            _ast_cache.put(source_hash, parsed)
+        data = rendered.encode("utf-8")
+        del rendered
+        output_hash = hashlib.sha256(data).hexdigest()
+        unchanged = output_hash == written[0] and os.path.exists(destination)
+        if not unchanged:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            with open(destination, "wb") as f:
+                f.write(data)
+    if unchanged and written[1] == _gzip_level:
+        # e.g. a touched source or an edit the minifier removed
+        if _gzip_level is None or os.path.exists(postprocess.gzip_path(destination)):
+            return cached, output_hash, False, headings
+    return cached, output_hash, _compress(destination, data), headings
+
+
+def _compress(destination: str, data: bytes | None = None) -> bool:
+    """Writes the .gz sibling of an output, or removes it when gzip is disabled"""
+    if _gzip_level is None:
+        postprocess.remove_gzip(destination)
+        return False
+    with _stage("compress"):
+        if data is None:
+            postprocess.gzip_file(destination, _gzip_level)
+        else:
+            postprocess.write_gzip(destination, data, _gzip_level)
+    return True
+
+
+def _stream_page(
+    source: str, destination: str, output: str
+) -> list[toc.Heading] | None:
+    """
+    Renders a large page block by block straight into its output file.
+    Its memory does not grow with the page, but it is not put in the AST cache.
+
+    :returns: list | None - the headings, collected only for the heading index
+              or a {{ TOC }} placeholder, which grow with the page
+    """
+    # without them stream_page decides by the placeholder
+    headings = toc.Headings() if _heading_index else None
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    try:
+        with _stage("stream"):
+            with (
+                open(source, "rb") as f,
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+                open(destination, "w", encoding="utf-8") as out,
+            ):
+                page.stream_page(
+                    mapped,
+                    out,
+                    _template,
+                    parse_inline=_parse_inline(output),
+                    urls=_page_urls(output),
+                    headings=headings,
+                )
+    except Exception as e:
+        raise RuntimeError(f"Failed to render {source}: {e}") from e
+    return headings.entries if headings is not None else None
+
+
+def _delete_output(dest_dir: Path, output: str) -> None:
+    """Removes a stale page, its .gz sibling and the directories it leaves empty"""
+    path = dest_dir / output
+    path.unlink(missing_ok=True)
+    postprocess.remove_gzip(path)
+    for parent in path.relative_to(dest_dir).parents[:-1]:
+        try:
+            (dest_dir / parent).rmdir()
+        except OSError:
+            break
+
+
+def build_site(
+    content_dir: str | Path,
+    dest_dir: str | Path,
+    template_path: str | Path,
+    workers: int | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    manifest_path: str | Path | None = None,
+    force: bool = False,
+    ast_cache_dir: str | Path | None = None,
+    ast_cache_size: int = DEFAULT_CACHE_SIZE,
+    inline_cache_size: int = 0,
+    profile: bool = False,
+    memory_profile: bool = False,
+    stream_threshold: int | None = DEFAULT_STREAM_THRESHOLD,
+    static_dir: str | Path | None = None,
+    asset_workers: int | None = None,
+    hardlink_assets: bool = False,
+    fingerprint_assets: bool = False,
+    minify: bool = False,
+    gzip_level: int | None = None,
+    heading_index: bool = False,
+    nested_inline: bool = False,
+) -> BuildReport:
+    """
+    Renders every markdown file of content_dir into dest_dir through the template.
+
+    With a manifest only pages whose source, template or output path changed
+    since the last build are rendered, and outputs of deleted sources are removed.
+
+    :param content_dir: directory with markdown sources
+    :param dest_dir: directory the HTML pages are written to, mirroring content_dir
+    :param template_path: HTML template with {{ Title }}, {{ Content }}, {{ TOC }}
+                          and front matter field placeholders, compiled once
+                          per build
+    :param workers: number of worker processes, defaults to the number of CPUs;
+                    1 renders in the current process
+    :param chunksize: number of pages sent to a worker at once
+    :param manifest_path: file recording the inputs of every page, None renders all
+    :param force: render every page even if the manifest says it is up to date
+    :param ast_cache_dir: directory caching parsed pages by source hash, so pages
+                          rendered only because the template changed are not parsed
+    :param ast_cache_size: size limit of the AST cache in bytes
+    :param inline_cache_size: texts kept by the inline parse cache of every worker,
+                              0 disables it
+    :param profile: record timing spans of every page in BuildReport.page_times
+    :param memory_profile: record peak and retained bytes of every page and stage
+                           in BuildReport.page_memory (slow, uses tracemalloc)
+    :param stream_threshold: sources larger than this many bytes are rendered
+                             block by block with bounded memory and skip the
+                             AST cache, None never streams
+    :param static_dir: directory of assets (styles, images, fonts) mirrored
+                       into dest_dir, only changed assets are copied
+    :param asset_workers: threads copying assets, see assets.sync_assets
+    :param hardlink_assets: hardlink assets into dest_dir instead of copying
+    :param fingerprint_assets: name assets after their content hash for long
+                               lived caching, write assets.ASSET_MANIFEST and
+                               point links of pages and the template to them
+    :param minify: remove comments and insignificant whitespace from pages
+    :param gzip_level: write a .gz sibling of every page and compressible asset
+                       at this zlib level (0-9) for servers serving precompressed
+                       files, None removes them; outputs whose hash and level
+                       did not change since the last build are not compressed
+    :param heading_index: write the headings of every page to toc.HEADING_INDEX;
+                          headings of unchanged pages come from the manifest
+    :param nested_inline: parse inline markdown with inline.parse_inline, which
+                          nests emphasis and keeps unmatched delimiters as text
+                          instead of failing the page; its HTMLNodes are not
+                          put in the AST cache and the inline cache is not used
+
+    :returns: BuildReport - rendered, skipped and deleted pages
+    """
+    if gzip_level is not None and not 0 <= gzip_level <= 9:
+        raise ValueError(f"gzip level must be between 0 and 9, got {gzip_level}")
+    content_dir, dest_dir = Path(content_dir), Path(dest_dir)
+    template = templates.load(template_path)
+    manifest = BuildManifest.load(manifest_path) if manifest_path else BuildManifest()
+    ast_cache = ASTCache(ast_cache_dir, ast_cache_size) if ast_cache_dir else None
+    report = BuildReport()
+
+    sources = find_pages(content_dir)
+    for output in manifest.remove_missing({str(source) for source in sources}):
+        _delete_output(dest_dir, output)
+        report.deleted.append(output)
+
+    static_dir = Path(static_dir) if static_dir else None
+    asset_paths = (
+        assets.find_assets(static_dir) if static_dir and static_dir.is_dir() else []
+    )
+    for asset in manifest.remove_missing_assets({str(path) for path in asset_paths}):
+        _delete_output(dest_dir, asset)
+        report.deleted_assets.append(asset)
+
+    try:
+        if asset_paths:
+            report.asset_sync = assets.sync_assets(
+                static_dir,
+                dest_dir,
+                manifest,
+                asset_workers,
+                hardlink_assets,
+                force,
+                asset_paths,
+                fingerprint_assets,
+                gzip_level,
+            )
+            report.compressed.extend(
+                report.asset_sync.outputs[asset]
+                for asset in report.asset_sync.compressed
+            )
+        for output in report.asset_sync.stale:
+            _delete_output(dest_dir, output)
+            report.deleted_assets.append(output)
+
+        asset_index = None
+        template_hash = text_hash(template.source)
+        if fingerprint_assets:
+            outputs = report.asset_sync.outputs
+            assets.write_asset_manifest(dest_dir, outputs)
+            asset_index = assets.AssetIndex(outputs)
+            template = template.with_urls(asset_index)
+            # pages link to the assets, so a renamed asset renders them again
+            template_hash = text_hash(
+                template.source + json.dumps(outputs, sort_keys=True)
+            )
+        elif assets.ASSET_MANIFEST not in report.asset_sync.outputs.values():
+            # left by an earlier build, it would point to deleted assets
+            (dest_dir / assets.ASSET_MANIFEST).unlink(missing_ok=True)
+        if minify:
+            template_hash = text_hash(f"{template_hash}:minify")
+        if nested_inline:
+            template_hash = text_hash(f"{template_hash}:nested-inline")
+        template_hash = text_hash(f"{template_hash}:render-{RENDER_VERSION}")
+
+        jobs = []
+        pending = []  # manifest entries of the pages to render
+        recompress = []  # unchanged pages whose .gz sibling is missing or stale
+        for source in sources:
+            path = content_dir / source
+            output = output_path(source).as_posix()
+            stat = path.stat()
+            source_hash = manifest.source_hash(str(source), path, stat)
+            if (
+                not force
+                and manifest.is_fresh(str(source), source_hash, template_hash, output)
+                and (dest_dir / output).exists()
+                and not (heading_index and manifest.headings(str(source)) is None)
+            ):
+                report.skipped.append(str(source))
+                if _needs_compress(
+                    dest_dir / output, manifest, str(source), gzip_level
+                ):
+                    recompress.append(str(source))
+                continue
+            written = manifest.written_output(str(source))
+            destination = str(dest_dir / output)
+            jobs.append((str(path), destination, source_hash, output, written))
+            pending.append((str(source), stat, source_hash, template_hash, output))
+        for source in _compress_pages(recompress, dest_dir, gzip_level, asset_workers):
+            manifest.record_gzip_level(source, gzip_level)
+            if gzip_level is not None:
+                report.compressed.append(output_path(Path(source)).as_posix())
+
+        initargs = (
+            template,
+            # marshal can not store the HTMLNodes of parse_inline
+            None if nested_inline else ast_cache,
+            0 if nested_inline else inline_cache_size,
+            profile,
+            memory_profile,
+            stream_threshold,
+            asset_index,
+            minify,
+            gzip_level,
+            nested_inline,
+            heading_index,
+        )
+        results = _render_all(jobs, initargs, workers, chunksize)
+        for result, entry in zip(results, pending):
+            manifest.record(*entry, result.output_hash, gzip_level, result.headings)
+            report.add(entry[0], result)
+        if heading_index:
+            toc.write_heading_index(
+                dest_dir,
+                {
+                    output_path(source).as_posix(): manifest.headings(str(source))
+                    for source in sources
+                },
+            )
+        elif toc.HEADING_INDEX not in report.asset_sync.outputs.values():
+            # left by an earlier build, it would not match the pages
+            (dest_dir / toc.HEADING_INDEX).unlink(missing_ok=True)
+    finally:
+        # pages rendered before a failure do not have to be rendered again
+        manifest.save()
+        if ast_cache:
+            ast_cache.evict()
+    return report
+
+
+def _needs_compress(
+    path: Path, manifest: BuildManifest, source: str, gzip_level: int | None
+) -> bool:
+    """An unchanged page needs its .gz sibling written again or removed"""
+    if manifest.written_output(source)[1] != gzip_level:
+        return True
+    return gzip_level is not None and not os.path.exists(postprocess.gzip_path(path))
+
+
+def _compress_pages(
+    sources: list[str], dest_dir: Path, gzip_level: int | None, workers: int | None
+) -> list[str]:
+    """
+    Brings the .gz siblings of unchanged pages in line with gzip_level in a
+    thread pool, zlib releases the GIL while compressing.
+    """
+
+    def compress(source: str) -> str:
+        path = dest_dir / output_path(Path(source))
+        if gzip_level is None:
+            postprocess.remove_gzip(path)
+        else:
+            postprocess.gzip_file(path, gzip_level)
+        return source
+
+    if not sources:
+        return []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(compress, sources))
+
+
+def _render_all(jobs: list, initargs: tuple, workers: int | None, chunksize: int):
+    """Renders the jobs and yields the result of every finished job in order"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker(*initargs)
+        try:
+            yield from map(_render_job, jobs)
+        finally:
+            profiling.enable(False)
+            memprofile.enable(False)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        initializer=_init_worker,
+        initargs=initargs,
+    ) as executor:
+        yield from executor.map(_render_job, jobs, chunksize=max(1, chunksize))
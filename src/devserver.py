@@ -0,0 +1,257 @@
+import io
+import os
+import posixpath
+import threading
+import urllib.parse
+from dataclasses import dataclass
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+
+import page
+import templates
+import textnode
+from build import MARKDOWN_SUFFIX, find_pages, output_path
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.2
+INLINE_CACHE_SIZE = 4096
+
+# size and mtime of every watched file, see DevSite.snapshot
+Snapshot = dict[str, tuple[int, int]]
+
+
+@dataclass
+class DevPage:
+    """A page kept in memory by the dev server"""
+
+    # mtime and size of the source the page was parsed from
+    stat: tuple[int, int]
+    # None if the page failed to parse
+    parsed: page.ParsedPage | None
+    # rendered page, or the error message when rendering failed
+    html: bytes
+    error: bool = False
+
+
+def _stat_key(stat: os.stat_result) -> tuple[int, int]:
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DevSite:
+    """
+    Rendered pages of a site kept in memory, refreshed from changed files.
+
+    Only pages whose source changed are parsed again, a changed template
+    renders the already parsed pages again. Pages are keyed by their output
+    path relative to the site root, e.g. "blog/post.html".
+    """
+
+    def __init__(self, content_dir: str | Path, template_path: str | Path):
+        self.content_dir = Path(content_dir)
+        self.template_path = Path(template_path)
+        self._template = None
+        self._pages: dict[str, DevPage] = {}
+        self._lock = threading.Lock()
+        # pages often repeat the same list items and paragraphs between edits
+        self._inline_cache = textnode.InlineParseCache(INLINE_CACHE_SIZE)
+
+    def snapshot(self) -> Snapshot:
+        """Returns the mtime and size of the template and every markdown file"""
+        paths = [self.template_path]
+        paths += self.content_dir.rglob(f"*{MARKDOWN_SUFFIX}")
+        result = {}
+        for path in paths:
+            try:
+                result[str(path)] = _stat_key(path.stat())
+            except FileNotFoundError:
+                continue
+        return result
+
+    def get(self, output: str) -> DevPage | None:
+        with self._lock:
+            return self._pages.get(output)
+
+    def outputs(self) -> list[str]:
+        with self._lock:
+            return sorted(self._pages)
+
+    def refresh(self) -> list[str]:
+        """
+        Renders the pages whose source or template changed since the last refresh
+        and forgets pages whose source was deleted.
+
+        :returns: list[str] - outputs of the rendered and removed pages
+        """
+        template = templates.load(self.template_path)
+        template_changed = template is not self._template
+        self._template = template
+
+        pages = {}
+        changed = []
+        for source in find_pages(self.content_dir):
+            output = output_path(source).as_posix()
+            stat = _stat_key((self.content_dir / source).stat())
+            current = self._pages.get(output)
+            if current is not None and current.stat == stat:
+                if not template_changed:
+                    pages[output] = current
+                    continue
+                pages[output] = self._render(stat, current.parsed, source)
+            else:
+                pages[output] = self._render(stat, None, source)
+            changed.append(output)
+        changed += sorted(set(self._pages) - set(pages))
+
+        with self._lock:
+            self._pages = pages
+        return changed
+
+    def _render(
+        self, stat: tuple[int, int], parsed: page.ParsedPage | None, source: Path
+    ) -> DevPage:
+        try:
+            if parsed is None:
+                markdown = (self.content_dir / source).read_text(encoding="utf-8")
+                parsed = page.parse_page(markdown, self._inline_cache)
+            html = page.render_parsed(parsed, self._template)
+        except Exception as e:
+            message = f"Failed to render {source}: {e}"
+            return DevPage(stat, parsed, message.encode(), error=True)
+        return DevPage(stat, parsed, html.encode())
+
+
+class PollingWatcher(threading.Thread):
+    """
+    Polls a snapshot of the watched files and calls on_change once the files
+    stopped changing for the debounce interval, so an editor saving several
+    files (or one file in several writes) triggers a single refresh.
+    """
+
+    def __init__(
+        self,
+        snapshot: Callable[[], Snapshot],
+        on_change: Callable[[], None],
+        interval: float = DEFAULT_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ):
+        super().__init__(daemon=True)
+        self.snapshot = snapshot
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self._stopped = threading.Event()
+
+    def run(self):
+        last = self.snapshot()
+        while not self._stopped.wait(self.interval):
+            current = self.snapshot()
+            if current == last:
+                continue
+            while not self._stopped.wait(self.debounce):
+                settled = self.snapshot()
+                if settled == current:
+                    break
+                current = settled
+            last = current
+            self.on_change()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def page_key(url: str) -> str:
+    """Maps a request path to an output path, e.g. /blog/ to blog/index.html"""
+    path = urllib.parse.unquote(urllib.parse.urlsplit(url).path)
+    if path.endswith("/"):
+        path += "index.html"
+    elif not posixpath.splitext(path)[1]:
+        path += ".html"
+    return posixpath.normpath(path).lstrip("/")
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serves pages from a DevSite and any other file from the static directory"""
+
+    def __init__(self, *args, site: DevSite, **kwargs):
+        self.site = site
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        key = page_key(self.path)
+        if not key.endswith(".html"):
+            return super().send_head()
+        dev_page = self.site.get(key)
+        if dev_page is None:
+            self.send_error(HTTPStatus.NOT_FOUND, f"No page renders to {key}")
+            return None
+        if dev_page.error:
+            self.send_response(HTTPStatus.INTERNAL_SERVER_ERROR)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        else:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(dev_page.html)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        return io.BytesIO(dev_page.html)
+
+
+def make_server(
+    site: DevSite,
+    static_dir: str | Path,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+) -> ThreadingHTTPServer:
+    """Creates an HTTP server for the site, port 0 picks a free port"""
+    handler = partial(DevRequestHandler, site=site, directory=str(static_dir))
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(
+    content_dir: str | Path,
+    template_path: str | Path,
+    static_dir: str | Path,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    interval: float = DEFAULT_INTERVAL,
+) -> None:
+    """
+    Serves the site rendered in memory until interrupted, nothing is written to
+    static_dir. Edited pages and templates are rendered again when saved.
+
+    :param content_dir: directory with markdown sources
+    :param template_path: HTML template of the pages
+    :param static_dir: directory with the other files of the site (e.g. styles)
+    :param host: address to listen on
+    :param port: port to listen on
+    :param interval: seconds between polls of the watched files
+    """
+    site = DevSite(content_dir, template_path)
+    site.refresh()
+
+    def on_change():
+        try:
+            changed = site.refresh()
+        except OSError as e:
+            # e.g. the template is being replaced, the next change retries
+            print(f"Refresh failed: {e}")
+            return
+        for output in changed:
+            print(f"Rendered {output}")
+
+    watcher = PollingWatcher(site.snapshot, on_change, interval)
+    server = make_server(site, static_dir, host, port)
+    watcher.start()
+    print(f"Serving {len(site.outputs())} pages on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        server.server_close()
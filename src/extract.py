@@ -1,21 +1,182 @@
 import re
+from array import array
+from bisect import bisect_left
+from typing import Iterator
+
+# kinds of spans found by iter_spans
+IMAGE = "image"
+LINK = "link"
+# a span of markdown link or image syntax:
+# start and end offset in the text, kind, label (alt text of images) and url
+Span = tuple[int, int, str, str, str]
+
+# an image or link, the character classes stop at the first bracket of the
+# label and the first parenthesis of the url, so the attempts at different "["
+# scan different parts of the text and there is nothing to backtrack into
+SPAN_PATTERN = re.compile(r"!?\[([^\[\]]*)\]\(([^()]*)\)")
+# images and links alone, scanned separately they may overlap: in
+# "![a]([b](c)" the image "![a]([b](c)" holds the link "[b](c)"
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^()]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^()]*)\)")
+# a line that may open or close a fenced code block
+_FENCE = re.compile(r"^[ \t]*```", re.MULTILINE)
+
+
+def iter_spans(text: str) -> Iterator[Span]:
+    """
+    Yields the images and links of text from left to right in a single scan.
+
+    Spans are "![alt](url)" and "[label](url)" where the label has no brackets
+    and the url no parentheses. They never overlap, a link inside the url of an
+    image is not a span, unlike the separate scans of the extract functions.
+    No two attempts scan the same label or url, so runs like "[[[[" or "](]("
+    take linear time.
+    """
+    for match in SPAN_PATTERN.finditer(text):
+        start, end = match.span()
+        kind = IMAGE if text[start] == "!" else LINK
+        yield start, end, kind, match.group(1), match.group(2)
+
+
+def _prose_ranges(text: str) -> Iterator[tuple[int, int]]:
+    """
+    Yields start and end of the parts of a document outside fenced code blocks.
+    A fence opens a code block on the first line of a block and the block runs
+    to the next line starting with a fence, like blocknode.iter_blocks.
+    """
+    start = 0  # start of the prose not yielded yet
+    code = False
+    for fence in _FENCE.finditer(text):
+        line = fence.start()
+        if code:
+            if text.startswith("```", line):
+                code = False
+                end = text.find("\n", line)
+                start = len(text) if end == -1 else end + 1
+            continue
+        previous = text.rfind("\n", 0, line - 1) + 1
+        if line != start and text[previous : line - 1].strip():
+            # a line inside a paragraph does not open a code block
+            continue
+        if line > start:
+            yield start, line
+        code = True
+    if not code and start < len(text):
+        yield start, len(text)
+
+
+class SpanIndex:
+    """
+    Images and links of a whole document, found in a single scan.
+
+    Tools checking links or rewriting URLs across a site look spans up here
+    instead of running the extract functions over every fragment again.
+    Offsets are kept in arrays and labels and urls in lists, so a large index
+    holds no match object or tuple per span. Spans are sorted by offset and
+    never overlap.
+
+    Attributes:
+        starts (array): Offset of the first character of every span.
+        ends (array): Offset after the last character of every span.
+        kinds (bytearray): 1 for images, 0 for links.
+        labels (list[str]): Link labels and image alt texts.
+        urls (list[str]): Link and image urls.
+    """
+
+    __slots__ = ("starts", "ends", "kinds", "labels", "urls")
+
+    def __init__(self, text: str, skip_code: bool = True):
+        """
+        :param text: str - markdown document or inline text
+        :param skip_code: leave out the content of fenced code blocks
+        """
+        self.starts = array("q")
+        self.ends = array("q")
+        self.kinds = bytearray()
+        self.labels = []
+        self.urls = []
+        ranges = _prose_ranges(text) if skip_code else ((0, len(text)),)
+        for start, end in ranges:
+            for match in SPAN_PATTERN.finditer(text, start, end):
+                span_start, span_end = match.span()
+                self.starts.append(span_start)
+                self.ends.append(span_end)
+                self.kinds.append(text[span_start] == "!")
+                self.labels.append(match.group(1))
+                self.urls.append(match.group(2))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Span:
+        return (
+            self.starts[index],
+            self.ends[index],
+            IMAGE if self.kinds[index] else LINK,
+            self.labels[index],
+            self.urls[index],
+        )
+
+    def __iter__(self) -> Iterator[Span]:
+        return map(self.__getitem__, range(len(self.starts)))
+
+    def at(self, offset: int) -> Span | None:
+        """Returns the span starting at offset, if there is one"""
+        index = bisect_left(self.starts, offset)
+        if index < len(self.starts) and self.starts[index] == offset:
+            return self[index]
+        return None
+
+    def between(self, start: int, end: int) -> Iterator[Span]:
+        """Yields the spans lying completely within start:end"""
+        index = bisect_left(self.starts, start)
+        while index < len(self.starts) and self.ends[index] <= end:
+            yield self[index]
+            index += 1
+
+    def spans(self, kind: str | None = None) -> Iterator[Span]:
+        """Yields the spans of kind (IMAGE or LINK), or all of them"""
+        if kind is None:
+            return iter(self)
+        flag = kind == IMAGE
+        return (
+            self[index] for index, value in enumerate(self.kinds) if value == flag
+        )
+
+
+def iter_link_syntax(text: str) -> Iterator[tuple[int, int]]:
+    """
+    Yields start and end of every "[label](url)" split_nodes_link cuts out.
+
+    Unlike iter_spans the label may hold "[" and the url "(", both must not be
+    empty. The positions of the next "]" and ")" are remembered, so a run of
+    "[" before the same "]" does not search for it again.
+    """
+    pos = 0
+    close = paren = -1
+    while (start := text.find("[", pos)) != -1:
+        if close <= start:
+            close = text.find("]", start + 1)
+            if close == -1:
+                return
+        pos = start + 1
+        if close == start + 1 or not text.startswith("(", close + 1):
+            continue
+        if paren <= close + 1:
+            paren = text.find(")", close + 2)
+            if paren == -1:
+                return
+        if paren == close + 2:
+            continue
+        yield start, paren + 1
+        pos = paren + 1
 
 
 def extract_markdown_images(text: str) -> list:
     """Extracting url and alt text of images in markdown text"""
-
-    img_match = re.findall(
-        r"!\[([^\[\]]*)\]\(([^\(\)]*)\)",
-        text,
-    )
-    return img_match
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text: str) -> list:
     """Extracts anchor text and url from markdown formatted links"""
-
-    link_match = re.findall(
-        r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)",
-        text,
-    )
-    return link_match
+    return LINK_PATTERN.findall(text)
@@ -1,4 +1,41 @@
 import functools
+import sys
+from typing import Iterator, TextIO
+
+from profiling import timed
+
+
+class _ImmutableList(list):
+    """A list refusing modification, shared by every node created without children"""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("shared empty children list cannot be modified")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+
+EMPTY_CHILDREN = _ImmutableList()
+
+# characters that are unsafe inside a double quoted attribute value
+_ATTRIBUTE_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+PROPS_CACHE_SIZE = 4096
+# elements rendered without a closing tag and value
+VOID_TAGS = frozenset({"img", "br", "hr", "input", "meta", "link"})
+
+
+def _serialize_props(items: tuple[tuple[str, object], ...]) -> str:
+    """Formats (name, value) pairs as HTML attributes with escaped values"""
+    return "".join(
+        f' {name}="{str(value).translate(_ATTRIBUTE_ESCAPES)}"' for name, value in items
+    )
+
+
+# the same href/src props show up on many nodes and pages, so their
+# serialized form is memoized in a bounded LRU cache
+serialize_props = functools.lru_cache(maxsize=PROPS_CACHE_SIZE)(_serialize_props)
 
 
 class HTMLNode:
@@ -13,15 +50,19 @@ class HTMLNode:
                       For example: {"href": "https://www.google.com"}.
     """
 
+    # slots drop the per-instance __dict__, pages hold a lot of nodes at once
+    __slots__ = ("tag", "value", "children", "props")
+
     # annotating class as a forward reference 'ClassName'
     def __init__(
         self,
         tag: str = None,
         value: str = None,
-        children: list["HTMLNode"] = [],
+        children: list["HTMLNode"] = EMPTY_CHILDREN,
         props: dict = None,  # maybe this should be an empty string?
     ):
-        self.tag = tag
+        # tag names repeat in every node, interning keeps a single copy of each
+        self.tag = sys.intern(tag) if tag else tag
         self.value = value
         self.children = children
         self.props = props
@@ -33,21 +74,77 @@ class HTMLNode:
         """Child classes should override this method to render themselves as HTML"""
         raise NotImplementedError
 
+    def html_parts(self) -> tuple[str, list["HTMLNode"], str]:
+        """
+        Returns the opening HTML, the children to render in between and the closing HTML.
+        Nodes overriding only to_html are rendered as a single opening chunk.
+        """
+        return self.to_html(), [], ""
+
+    def iter_html(self) -> Iterator[str]:
+        """
+        Yields the HTML of the node tree in chunks.
+        Uses an explicit stack instead of recursion, so deep trees do not hit
+        the recursion limit and no string of the whole tree is built.
+        """
+        stack = [self]  # holds nodes to render and closing tags to emit
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                yield item
+                continue
+            opening, children, closing = item.html_parts()
+            yield opening
+            if children:
+                stack.append(closing)
+                stack.extend(reversed(children))
+            elif closing:
+                yield closing
+
+    @timed("to_html")
+    def write_to(self, fileobj: TextIO, buffer_size: int = 65536) -> int:
+        """
+        Streams the HTML of the node tree to a text file object.
+        Chunks are grouped up to buffer_size characters to limit write calls.
+        Returns the number of characters written.
+        """
+        written = 0
+        buffer = []
+        buffered = 0
+        for chunk in self.iter_html():
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= buffer_size:
+                fileobj.write("".join(buffer))
+                written += buffered
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            fileobj.write("".join(buffer))
+            written += buffered
+        return written
+
     def props_to_html(self):
         """
         Returns props as HTML formatted string.
         Example:
             input: {'class':'some-container-class'}
             output:  class="some-container-class"
+        Values are HTML escaped, serialized props are cached by their items.
         """
-        return functools.reduce(
-            lambda i, j: i + f' {j[0]}="{j[1]}"', self.props.items(), ""
-        )
+        if not self.props:
+            return ""
+        # keyed by the text of the values: 1, 1.0 and True are equal keys
+        # but render differently, and unhashable values become hashable
+        items = tuple((name, str(value)) for name, value in self.props.items())
+        return serialize_props(items)
 
 
 class LeafNode(HTMLNode):
     """This class represents a HTML node with no children"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str,
@@ -58,6 +155,8 @@ class LeafNode(HTMLNode):
 
     def to_html(self):
         """Renders a LeafNode as HTML string or raw string if tag is not present"""
+        if self.tag in VOID_TAGS:
+            return f"<{self.tag}{self.props_to_html()} />"
         if not self.value:
             raise ValueError("LeafNode must have a value.")
         if not self.tag:
@@ -69,18 +168,25 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props: dict[str] = None):
         super().__init__(tag, value=None, children=children, props=props)
 
+    @timed("to_html")
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def html_parts(self):
         if not self.tag:
             raise ValueError("tag is required for parent node")
         if not self.children:
             raise ValueError("parent node must have at least one child")
-        content = ""
-        for child in self.children:
-            content += child.to_html()
-        return f"<{self.tag}{self.props_to_html() if self.props else ''}>{content}</{self.tag}>"
+        return (
+            f"<{self.tag}{self.props_to_html() if self.props else ''}>",
+            self.children,
+            f"</{self.tag}>",
+        )
 
     def __repr__(self):
         return (
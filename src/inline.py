@@ -0,0 +1,180 @@
+import re
+from typing import Mapping
+
+import extract
+import htmlnode
+
+# emphasis delimiters and the tags of the elements they produce
+EMPHASIS_TAGS = {"**": "b", "_": "i"}
+CODE_TAG = "code"
+
+_TOKEN = re.compile(r"`+|\*\*|_|!?\[")
+_BACKTICKS = re.compile(r"`+")
+
+
+class _CodeRuns:
+    """
+    Finds the closing backtick run of a code span opener.
+
+    Runs are indexed once by length and every length keeps a pointer to its
+    next run, which only moves forward as openers are looked up left to right.
+    Thousands of unmatched runs are looked up in linear time instead of every
+    opener scanning the rest of the text.
+    """
+
+    __slots__ = ("_runs", "_next")
+
+    def __init__(self, text: str):
+        self._runs: dict[int, list[tuple[int, int]]] = {}
+        for match in _BACKTICKS.finditer(text):
+            run = match.span()
+            self._runs.setdefault(run[1] - run[0], []).append(run)
+        self._next = dict.fromkeys(self._runs, 0)
+
+    def closer(self, start: int, end: int) -> tuple[int, int] | None:
+        """Returns the span of the first run after end as long as start:end"""
+        length = end - start
+        runs = self._runs[length]
+        index = self._next[length]
+        while index < len(runs) and runs[index][0] < end:
+            index += 1
+        self._next[length] = index
+        return runs[index] if index < len(runs) else None
+
+
+def _to_nodes(items: list) -> list[htmlnode.HTMLNode]:
+    """Turns items into nodes, adjacent strings become a single text LeafNode"""
+    nodes = []
+    text = []
+    for item in items:
+        if isinstance(item, str):
+            text.append(item)
+            continue
+        if text:
+            nodes.append(htmlnode.LeafNode(None, "".join(text)))
+            text.clear()
+        nodes.append(item)
+    if text:
+        nodes.append(htmlnode.LeafNode(None, "".join(text)))
+    return nodes
+
+
+def _element(tag: str, items: list) -> htmlnode.HTMLNode:
+    """Wraps items in tag, a LeafNode when they are plain text"""
+    children = _to_nodes(items)
+    if len(children) == 1 and children[0].tag is None:
+        return htmlnode.LeafNode(tag, children[0].value)
+    return htmlnode.ParentNode(tag, children)
+
+
+def _flanking(text: str, start: int, end: int, delimiter: str) -> tuple[bool, bool]:
+    """Returns whether the delimiter at start:end can open and can close emphasis"""
+    before = text[start - 1] if start else " "
+    after = text[end] if end < len(text) else " "
+    can_open = not after.isspace()
+    can_close = not before.isspace()
+    if delimiter == "_":
+        # snake_case_names are not emphasis
+        can_open = can_open and not before.isalnum()
+        can_close = can_close and not after.isalnum()
+    return can_open, can_close
+
+
+def parse_inline(
+    text: str, urls: Mapping[str, str] | None = None
+) -> list[htmlnode.HTMLNode]:
+    """
+    Parses inline markdown into HTML nodes, nesting emphasis.
+
+    "**bold _and italic_**" gives a ParentNode <b> holding a text LeafNode and
+    an <i> LeafNode. Emphasis that only holds text is a LeafNode, so balanced
+    markup without nesting gives the same nodes as page.text_to_children.
+
+    Delimiters are matched with a stack of openers in a single scan. A closer
+    pops the nearest opener of its kind and the delimiters opened in between
+    stay literal text. When no opener is found, the search for that kind does
+    not reach below the current stack again. Each delimiter is pushed, searched
+    past and popped a bounded number of times, so parsing takes linear time
+    even for thousands of unmatched "_" or "**".
+
+    Unmatched delimiters are kept as text instead of raising. Code spans are
+    delimited by backtick runs of equal length and their content is not parsed.
+    A "_" inside a word does not open or close emphasis. Links and images are
+    matched with extract.SPAN_PATTERN, their labels are plain text and their
+    URLs are looked up in urls like textnodes_to_html. A link with an empty
+    label, "[](url)", is kept as text like text_to_textnodes keeps it.
+
+    :param text: str - inline markdown of a block
+    :param urls: replacements of link and image URLs, e.g. an assets.AssetIndex
+
+    :returns: list[HTMLNode] - LeafNodes and ParentNodes of the text
+    """
+    items = []  # text strings and finished nodes
+    stack = []  # open emphasis delimiters, (delimiter, index in items)
+    # the stack below these sizes has no opener for the delimiter
+    bottom = dict.fromkeys(EMPHASIS_TAGS, 0)
+    code_runs = None  # indexed on the first backtick
+    pos = 0  # start of the text not added to items yet
+    scan = 0
+
+    while match := _TOKEN.search(text, scan):
+        token = match.group()
+        start, end = match.span()
+        scan = end
+
+        if token[0] == "`":
+            if code_runs is None:
+                code_runs = _CodeRuns(text)
+            closer = code_runs.closer(start, end)
+            if closer is None:
+                continue
+            items.append(text[pos:start])
+            items.append(htmlnode.LeafNode(CODE_TAG, text[end : closer[0]]))
+            pos = scan = closer[1]
+            continue
+
+        if token[-1] == "[":
+            span = extract.SPAN_PATTERN.match(text, start)
+            # a link without a label has no text to render, it stays literal
+            if span is None or (token == "[" and not span.group(1)):
+                continue
+            items.append(text[pos:start])
+            label, url = span.groups()
+            if urls is not None:
+                url = urls.get(url, url)
+            if token == "[":
+                node = htmlnode.LeafNode("a", label, {"href": url})
+            else:
+                node = htmlnode.LeafNode("img", None, {"src": url, "alt": label})
+            items.append(node)
+            pos = scan = span.end()
+            continue
+
+        items.append(text[pos:start])
+        pos = end
+        can_open, can_close = _flanking(text, start, end, token)
+        if can_close:
+            opener = None
+            for depth in range(len(stack) - 1, bottom[token] - 1, -1):
+                if stack[depth][0] == token:
+                    opener = depth
+                    break
+            if opener is None:
+                bottom[token] = len(stack)
+            else:
+                index = stack[opener][1]
+                content = [item for item in items[index + 1 :] if item != ""]
+                if content:
+                    del items[index:]
+                    items.append(_element(EMPHASIS_TAGS[token], content))
+                    # delimiters opened inside the element stay text
+                    del stack[opener:]
+                    for delimiter, size in bottom.items():
+                        bottom[delimiter] = min(size, len(stack))
+                    continue
+        items.append(token)
+        if can_open:
+            stack.append((token, len(items) - 1))
+
+    items.append(text[pos:])
+    return _to_nodes([item for item in items if item != ""])
@@ -0,0 +1,373 @@
+import fnmatch
+import json
+import os
+import posixpath
+import re
+import urllib.parse
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import assets
+import build
+import extract
+import htmlnode
+import inline
+import page
+import textnode
+from blocknode import BlockType
+
+REPORT_VERSION = 1
+DEFAULT_CHUNKSIZE = 16
+# URLs that do not point to a file
+IGNORED_SCHEMES = ("mailto:", "tel:", "data:", "javascript:")
+# ids and names of elements a URL fragment can point to
+_ANCHOR = re.compile(r"""\s(?:id|name)\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+
+# output paths relative to the output directory and the anchors of each
+SiteIndex = dict[str, frozenset[str]]
+# returns True if an external URL is fine, e.g. an AllowList
+ExternalCheck = Callable[[str], bool]
+
+# site index, external check and inline parser shared by the pages checked in
+# a worker process
+_index = None
+_external = None
+_parse_inline = textnode.text_to_textnodes
+
+
+@dataclass
+class BrokenLink:
+    """A link or image of a page whose target does not exist"""
+
+    # markdown path relative to the content directory
+    source: str
+    line: int
+    # extract.LINK or extract.IMAGE
+    kind: str
+    url: str
+    reason: str
+
+
+@dataclass
+class LinkReport:
+    """Outcome of checking the links and images of every page"""
+
+    pages: int = 0
+    checked: int = 0
+    # external URLs skipped because no external check was configured
+    external_unchecked: int = 0
+    broken: list[BrokenLink] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.broken
+
+    def summary(self) -> str:
+        return (
+            f"checked {self.checked} links in {self.pages} pages, "
+            f"{len(self.broken)} broken, "
+            f"{self.external_unchecked} external unchecked"
+        )
+
+    def to_dict(self) -> dict:
+        """Returns the report as JSON serializable data for tooling"""
+        return {
+            "version": REPORT_VERSION,
+            "pages": self.pages,
+            "checked": self.checked,
+            "external_unchecked": self.external_unchecked,
+            "broken": [asdict(link) for link in self.broken],
+        }
+
+    def format_broken(self) -> str:
+        """Formats broken links as "source:line: kind url: reason" lines"""
+        return "\n".join(
+            f"{link.source}:{link.line}: {link.kind} {link.url}: {link.reason}"
+            for link in self.broken
+        )
+
+
+class AllowList:
+    """
+    External URLs allowed without fetching them.
+
+    An entry containing "://" allows URLs starting with it, any other entry is
+    a host name pattern (fnmatch, e.g. "*.example.com") matched against the host
+    of the URL.
+    """
+
+    __slots__ = ("prefixes", "hosts")
+
+    def __init__(self, entries: Iterable[str]):
+        entries = [entry.strip() for entry in entries]
+        self.prefixes = tuple(entry for entry in entries if "://" in entry)
+        self.hosts = tuple(
+            entry.lower() for entry in entries if entry and "://" not in entry
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "AllowList":
+        """Reads one entry per line, lines starting with # are comments"""
+        with open(path, encoding="utf-8") as f:
+            return cls(line for line in f if not line.lstrip().startswith("#"))
+
+    def __call__(self, url: str) -> bool:
+        if url.startswith(self.prefixes):
+            return True
+        host = urllib.parse.urlsplit(url).hostname or ""
+        return any(fnmatch.fnmatchcase(host, pattern) for pattern in self.hosts)
+
+
+def is_external(url: str) -> bool:
+    return "://" in url or url.startswith("//")
+
+
+def _anchors(path: str) -> frozenset[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return frozenset(_ANCHOR.findall(f.read()))
+
+
+def _paths(dest_dir: Path) -> list[str]:
+    return sorted(
+        path.relative_to(dest_dir).as_posix()
+        for path in dest_dir.rglob("*")
+        if path.is_file()
+    )
+
+
+def build_index(
+    dest_dir: str | Path, workers: int | None = None, chunksize: int = DEFAULT_CHUNKSIZE
+) -> SiteIndex:
+    """
+    Maps every file below dest_dir to the ids and names of its elements.
+
+    HTML files are read in worker processes, other files have no anchors.
+    Assets renamed by fingerprinting are also indexed under their original
+    path (see assets.ASSET_MANIFEST), which is how pages link to them.
+    """
+    dest_dir = Path(dest_dir)
+    paths = _paths(dest_dir)
+    pages = [path for path in paths if path.endswith(build.HTML_SUFFIX)]
+    anchors = _map(
+        _anchors, [str(dest_dir / page) for page in pages], workers, chunksize
+    )
+    index = dict.fromkeys(paths, frozenset())
+    index.update(zip(pages, anchors))
+    asset_manifest = dest_dir / assets.ASSET_MANIFEST
+    if asset_manifest.is_file():
+        with open(asset_manifest, encoding="utf-8") as f:
+            for asset, output in json.load(f).items():
+                if output in index:
+                    index.setdefault(asset, index[output])
+    return index
+
+
+def _candidates(path: str, directory: bool) -> list[str]:
+    """Output paths a URL path can be served from, e.g. blog/ from blog/index.html"""
+    index_page = posixpath.join(path, "index.html")
+    if directory:
+        return [index_page]
+    return [path, f"{path}{build.HTML_SUFFIX}", index_page]
+
+
+def check_url(
+    url: str, page: str, index: SiteIndex, external: ExternalCheck | None = None
+) -> str | None:
+    """
+    Checks a link or image URL of the page with output path page.
+
+    :returns: str | None - why the URL is broken, None if it is fine or can
+              not be checked (external URLs without an external check)
+    """
+    if url.startswith(IGNORED_SCHEMES):
+        return None
+    if is_external(url):
+        if external is None or external(url):
+            return None
+        return "external URL not allowed"
+    parts = urllib.parse.urlsplit(url)
+    path = urllib.parse.unquote(parts.path)
+    fragment = urllib.parse.unquote(parts.fragment)
+    target = page
+    if path:
+        if path.startswith("/"):
+            relative = path.lstrip("/")
+        else:
+            relative = posixpath.join(posixpath.dirname(page), path)
+        normalized = posixpath.normpath(relative)
+        if normalized == ".." or normalized.startswith("../"):
+            return "points outside the site"
+        if normalized == ".":
+            normalized = ""
+        candidates = _candidates(normalized, path.endswith("/"))
+        target = next((output for output in candidates if output in index), None)
+        if target is None:
+            return "no such page or file"
+    if fragment and fragment not in index.get(target, ()):
+        return f"no anchor #{fragment} in {target}"
+    return None
+
+
+def _init_worker(
+    index: SiteIndex, external: ExternalCheck | None, nested_inline: bool = False
+) -> None:
+    """Stores the index once per worker instead of sending it with every page"""
+    global _index, _external, _parse_inline
+    _index = index
+    _external = external
+    _parse_inline = inline.parse_inline if nested_inline else textnode.text_to_textnodes
+
+
+def _node_targets(node: textnode.TextNode | htmlnode.HTMLNode) -> Iterator[tuple]:
+    """Yields kind, label and url of the links and images of an inline node"""
+    if isinstance(node, textnode.TextNode):
+        if node.text_type is textnode.TextType.LINK:
+            yield extract.LINK, node.text, node.url
+        elif node.text_type is textnode.TextType.IMG:
+            yield extract.IMAGE, node.text, node.url
+        return
+    if node.tag == "a":
+        yield extract.LINK, node.value, node.props["href"]
+    elif node.tag == "img":
+        yield extract.IMAGE, node.props["alt"], node.props["src"]
+    for child in node.children:
+        yield from _node_targets(child)
+
+
+def rendered_targets(blocks: list[page.ParsedBlock]) -> Iterator[tuple]:
+    """
+    Yields kind, label and url of the links and images parsed blocks render,
+    in document order. Link syntax in code blocks and code spans is not
+    among them.
+    """
+    for block_type, payload in blocks:
+        match block_type:
+            case BlockType.CODE:
+                continue
+            case BlockType.HEADING:
+                groups = (payload[1],)
+            case BlockType.UNO_LIST | BlockType.ORD_LIST:
+                groups = payload
+            case _:
+                groups = (payload,)
+        for nodes in groups:
+            for node in nodes:
+                yield from _node_targets(node)
+
+
+def _check_page(job: tuple[str, str, str]) -> tuple[int, int, list[BrokenLink]]:
+    """
+    Checks every link and image a markdown source renders against the site index.
+
+    The targets come from parsing the page like the build does, so link syntax
+    in code is not checked. Their lines come from the spans of the source
+    with the same kind, label and url, taken in order.
+    """
+    path, source, output = job
+    with open(path, encoding="utf-8") as f:
+        markdown = f.read()
+    _, content = page.split_front_matter(markdown)
+    try:
+        blocks = page.parse_markdown(content, _parse_inline)
+    except Exception as e:
+        raise RuntimeError(f"Failed to check {source}: {e}") from e
+    offsets = {}  # kind, label and url to the offsets of their spans
+    for start, _, kind, label, url in extract.SpanIndex(markdown):
+        offsets.setdefault((kind, label, url), deque()).append(start)
+    line_starts = None  # offsets after every newline, found on the first break
+    offset = 0
+    checked = unchecked = 0
+    broken = []
+    for target in rendered_targets(blocks):
+        # a target without a span of its own keeps the line of the one before
+        spans = offsets.get(target)
+        if spans:
+            offset = spans.popleft()
+        kind, _, url = target
+        if _external is None and is_external(url):
+            unchecked += 1
+            continue
+        checked += 1
+        reason = check_url(url, output, _index, _external)
+        if reason is not None:
+            if line_starts is None:
+                line_starts = [m.end() for m in re.finditer("\n", markdown)]
+            line = bisect_right(line_starts, offset) + 1
+            broken.append(BrokenLink(source, line, kind, url, reason))
+    return checked, unchecked, broken
+
+
+def check_links(
+    content_dir: str | Path,
+    dest_dir: str | Path,
+    workers: int | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    external: ExternalCheck | None = None,
+    nested_inline: bool = False,
+) -> LinkReport:
+    """
+    Checks the links and images of every page against the built site.
+
+    The targets of all pages are checked against a single index of the output
+    paths and their anchors (see build_index), which every worker process
+    receives once. Only the links and images the pages render are checked,
+    link syntax in code blocks and code spans is not.
+
+    :param content_dir: directory with the markdown sources
+    :param dest_dir: directory the site was built into
+    :param workers: number of worker processes, defaults to the number of CPUs;
+                    1 checks in the current process
+    :param chunksize: number of pages sent to a worker at once
+    :param external: check for external URLs, e.g. an AllowList; None leaves
+                     them unchecked
+    :param nested_inline: parse pages with inline.parse_inline, like a build
+                          with nested_inline
+
+    :returns: LinkReport - broken links sorted by source and line
+    """
+    content_dir, dest_dir = Path(content_dir), Path(dest_dir)
+    index = build_index(dest_dir, workers, chunksize)
+    jobs = [
+        (str(content_dir / source), str(source), build.output_path(source).as_posix())
+        for source in build.find_pages(content_dir)
+    ]
+    report = LinkReport(pages=len(jobs))
+    initargs = (index, external, nested_inline)
+    results = _map(_check_page, jobs, workers, chunksize, initargs)
+    for checked, unchecked, broken in results:
+        report.checked += checked
+        report.external_unchecked += unchecked
+        report.broken.extend(broken)
+    return report
+
+
+def write_report(report: LinkReport, path: str | Path) -> None:
+    """Writes the report as JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+
+
+def _map(
+    function: Callable,
+    items: list,
+    workers: int | None,
+    chunksize: int,
+    initargs: tuple | None = None,
+) -> list:
+    """Applies function to the items in worker processes, results keep their order"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) <= 1:
+        if initargs is not None:
+            _init_worker(*initargs)
+        return list(map(function, items))
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(items)),
+        initializer=_init_worker if initargs is not None else None,
+        initargs=initargs or (),
+    ) as executor:
+        return list(executor.map(function, items, chunksize=max(1, chunksize)))
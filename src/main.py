@@ -1,12 +1,231 @@
-import textnode
+import argparse
+import sys
 
+import astcache
+import build
+import devserver
+import linkcheck
+import memprofile
+import profiling
 
-def main():
-    print("Hello from bootdev-ssgen!")
-    new_node = textnode.TextNode(
-        "A special sentence", textnode.TextType.LINK, "www.special.se"
+
+def _add_link_check_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--external-allow",
+        metavar="FILE",
+        help="check external URLs against the hosts and prefixes listed in FILE",
+    )
+    parser.add_argument(
+        "--link-report", metavar="REPORT", help="write broken links to REPORT (JSON)"
+    )
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Static site generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="render content to public")
+    build_parser.add_argument("--content", default="content", help="markdown sources")
+    build_parser.add_argument("--dest", default="public", help="output directory")
+    build_parser.add_argument("--template", default="template.html")
+    build_parser.add_argument(
+        "--workers", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    build_parser.add_argument(
+        "--chunksize", type=int, default=build.DEFAULT_CHUNKSIZE, help="pages per task"
+    )
+    build_parser.add_argument(
+        "--manifest", default=build.DEFAULT_MANIFEST, help="incremental build manifest"
+    )
+    build_parser.add_argument(
+        "--force", action="store_true", help="render every page, even unchanged ones"
+    )
+    build_parser.add_argument(
+        "--ast-cache", default=build.DEFAULT_AST_CACHE, help="parsed page cache"
+    )
+    build_parser.add_argument(
+        "--ast-cache-mb",
+        type=int,
+        default=astcache.DEFAULT_CACHE_SIZE // 2**20,
+        help="parsed page cache size limit in MB",
+    )
+    build_parser.add_argument(
+        "--inline-cache",
+        type=int,
+        default=0,
+        help="paragraphs kept by the inline parse cache per worker (0 disables it)",
+    )
+    build_parser.add_argument(
+        "--stream-mb",
+        type=int,
+        default=build.DEFAULT_STREAM_THRESHOLD // 2**20,
+        help="pages larger than this many MB are streamed with bounded memory",
+    )
+    build_parser.add_argument(
+        "--static", default="static", help="assets copied to the output directory"
+    )
+    build_parser.add_argument(
+        "--asset-workers", type=int, default=None, help="threads copying assets"
+    )
+    build_parser.add_argument(
+        "--hardlink-assets",
+        action="store_true",
+        help="hardlink assets instead of copying them (edits show through)",
+    )
+    build_parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="name assets after their content hash and rewrite links to them",
+    )
+    build_parser.add_argument(
+        "--minify", action="store_true", help="remove comments and whitespace"
+    )
+    build_parser.add_argument(
+        "--gzip-level",
+        type=int,
+        choices=range(10),
+        metavar="0-9",
+        help="write precompressed .gz siblings of pages and text assets",
+    )
+    build_parser.add_argument(
+        "--nested-inline",
+        action="store_true",
+        help="nest emphasis and keep unmatched delimiters as text instead of failing",
     )
-    print(new_node)
+    build_parser.add_argument(
+        "--heading-index",
+        action="store_true",
+        help="write the headings of every page to headings.json in the output",
+    )
+    build_parser.add_argument(
+        "--profile",
+        metavar="REPORT",
+        help="write per stage timings to REPORT (JSON) and REPORT.folded (flamegraph)",
+    )
+    build_parser.add_argument(
+        "--memory-profile",
+        metavar="REPORT",
+        help="write peak and retained memory per page and stage to REPORT (JSON)",
+    )
+    build_parser.add_argument(
+        "--profile-top", type=int, default=20, help="pages listed in the reports"
+    )
+    build_parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="check internal links and images after building, fail if any is broken",
+    )
+    _add_link_check_arguments(build_parser)
+
+    check_parser = commands.add_parser(
+        "check-links", help="check the links and images of a built site"
+    )
+    check_parser.add_argument("--content", default="content", help="markdown sources")
+    check_parser.add_argument("--dest", default="public", help="built site")
+    check_parser.add_argument(
+        "--workers", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    check_parser.add_argument(
+        "--nested-inline",
+        action="store_true",
+        help="parse pages like a build with --nested-inline",
+    )
+    _add_link_check_arguments(check_parser)
+
+    serve_parser = commands.add_parser(
+        "serve", help="serve pages rendered in memory, re-rendering edited ones"
+    )
+    serve_parser.add_argument("--content", default="content", help="markdown sources")
+    serve_parser.add_argument("--template", default="template.html")
+    serve_parser.add_argument(
+        "--static", default="static", help="directory serving the other files"
+    )
+    serve_parser.add_argument("--host", default=devserver.DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=devserver.DEFAULT_PORT)
+    serve_parser.add_argument(
+        "--interval",
+        type=float,
+        default=devserver.DEFAULT_INTERVAL,
+        help="seconds between checks for changed files",
+    )
+    return parser.parse_args(argv)
+
+
+def check_links(args: argparse.Namespace) -> bool:
+    """Checks the links of the built site, returns True if none is broken"""
+    external = (
+        linkcheck.AllowList.load(args.external_allow) if args.external_allow else None
+    )
+    report = linkcheck.check_links(
+        args.content,
+        args.dest,
+        workers=args.workers,
+        external=external,
+        nested_inline=args.nested_inline,
+    )
+    print(f"Links of {args.dest}: {report.summary()}")
+    if report.broken:
+        print(report.format_broken(), file=sys.stderr)
+    if args.link_report:
+        linkcheck.write_report(report, args.link_report)
+        print(f"Link report written to {args.link_report}")
+    return report.ok
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.command == "build":
+        report = build.build_site(
+            args.content,
+            args.dest,
+            args.template,
+            workers=args.workers,
+            chunksize=args.chunksize,
+            manifest_path=args.manifest,
+            force=args.force,
+            ast_cache_dir=args.ast_cache,
+            ast_cache_size=args.ast_cache_mb * 2**20,
+            inline_cache_size=args.inline_cache,
+            profile=bool(args.profile),
+            memory_profile=bool(args.memory_profile),
+            stream_threshold=args.stream_mb * 2**20,
+            static_dir=args.static,
+            asset_workers=args.asset_workers,
+            hardlink_assets=args.hardlink_assets,
+            fingerprint_assets=args.fingerprint,
+            minify=args.minify,
+            gzip_level=args.gzip_level,
+            heading_index=args.heading_index,
+            nested_inline=args.nested_inline,
+        )
+        print(f"Built {args.dest}: {report.summary()}")
+        if args.profile:
+            profiling.write_report(
+                profiling.build_report(report.page_times, args.profile_top),
+                args.profile,
+            )
+            print(f"Profile written to {args.profile}")
+        if args.memory_profile:
+            memprofile.write_report(
+                memprofile.build_report(report.page_memory, args.profile_top),
+                args.memory_profile,
+            )
+            print(f"Memory profile written to {args.memory_profile}")
+        if args.check_links and not check_links(args):
+            sys.exit(1)
+    elif args.command == "check-links":
+        if not check_links(args):
+            sys.exit(1)
+    elif args.command == "serve":
+        devserver.serve(
+            args.content,
+            args.template,
+            args.static,
+            host=args.host,
+            port=args.port,
+            interval=args.interval,
+        )
 
 
 if __name__ == "__main__":
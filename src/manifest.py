@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+
+def file_hash(path: str | Path) -> str:
+    """Returns the sha256 hex digest of a file content"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Returns the sha256 hex digest of a string encoded as UTF-8"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """
+    Persistent record of the inputs every page was last rendered from.
+
+    Each entry is keyed by the source path relative to the content directory
+    and keeps the source hash, template hash and output path of the page. The
+    size and mtime of the source are stored too, so unchanged files are not
+    hashed again. Static assets are recorded the same way, keyed by their path
+    relative to the static directory, which is also their output path.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        pages: dict | None = None,
+        assets: dict | None = None,
+    ):
+        self.path = Path(path) if path else None
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BuildManifest":
+        """Reads a manifest, an unreadable or outdated one is treated as empty"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}), data.get("assets", {}))
+
+    def save(self) -> None:
+        """Writes the manifest atomically, so an interrupted build can not corrupt it"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            data = {
+                "version": MANIFEST_VERSION,
+                "pages": self.pages,
+                "assets": self.assets,
+            }
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def source_hash(self, source: str, path: Path, stat: os.stat_result) -> str:
+        """Returns the content hash of the source, reusing the recorded one if stat matches"""
+        return _recorded_hash(self.pages.get(source), "source_hash", path, stat)
+
+    def is_fresh(
+        self, source: str, source_hash: str, template_hash: str, output: str
+    ) -> bool:
+        """Checks if the page was rendered from the same inputs to the same output"""
+        entry = self.pages.get(source)
+        return (
+            entry is not None
+            and entry["source_hash"] == source_hash
+            and entry["template_hash"] == template_hash
+            and entry["output"] == output
+        )
+
+    def record(
+        self,
+        source: str,
+        stat: os.stat_result,
+        source_hash: str,
+        template_hash: str,
+        output: str,
+        output_hash: str | None = None,
+        gzip_level: int | None = None,
+        headings: list[tuple[int, str, str]] | None = None,
+    ) -> None:
+        """
+        Stores the inputs a page was rendered from, stat is taken before hashing.
+        output_hash and gzip_level describe the written output and its .gz sibling,
+        headings the level, text and id of the headings of the page.
+        """
+        self.pages[source] = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "output": output,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "output_hash": output_hash,
+            "gzip_level": gzip_level,
+            "headings": headings,
+        }
+
+    def written_output(self, source: str) -> tuple[str | None, int | None]:
+        """Returns the hash and gzip level of the page output written last"""
+        entry = self.pages.get(source, {})
+        return entry.get("output_hash"), entry.get("gzip_level")
+
+    def headings(self, source: str) -> list[tuple[int, str, str]] | None:
+        """Returns the headings recorded for the page, None if there are none"""
+        headings = self.pages.get(source, {}).get("headings")
+        if headings is None:
+            return None
+        # JSON turns the tuples into lists
+        return [tuple(heading) for heading in headings]
+
+    def record_gzip_level(self, source: str, gzip_level: int | None) -> None:
+        """Updates the gzip level of a page whose .gz sibling was written again"""
+        self.pages[source]["gzip_level"] = gzip_level
+
+    def remove_missing(self, sources: set[str]) -> list[str]:
+        """Drops entries of sources that no longer exist and returns their outputs"""
+        missing = [source for source in self.pages if source not in sources]
+        return [self.pages.pop(source)["output"] for source in missing]
+
+    def asset_hash(self, asset: str, path: Path, stat: os.stat_result) -> str:
+        """Returns the hash of an asset, reusing the recorded one if unchanged"""
+        return _recorded_hash(self.assets.get(asset), "hash", path, stat)
+
+    def asset_output(self, asset: str) -> str | None:
+        """Returns the path the asset was last copied to, None if it was not"""
+        entry = self.assets.get(asset)
+        # entries without an output were copied under their own path
+        return entry.get("output", asset) if entry else None
+
+    def asset_is_fresh(self, asset: str, asset_hash: str, output: str) -> bool:
+        """Checks if the asset was copied with the same content to the same output"""
+        entry = self.assets.get(asset)
+        return (
+            entry is not None
+            and entry["hash"] == asset_hash
+            and self.asset_output(asset) == output
+        )
+
+    def asset_gzip_level(self, asset: str) -> int | None:
+        """Returns the level the .gz sibling of the asset was written at, if any"""
+        return self.assets.get(asset, {}).get("gzip_level")
+
+    def record_asset(
+        self,
+        asset: str,
+        stat: os.stat_result,
+        asset_hash: str,
+        output: str,
+        gzip_level: int | None = None,
+    ) -> None:
+        """Stores the content an asset was copied with, stat is taken before hashing"""
+        self.assets[asset] = {
+            "hash": asset_hash,
+            "output": output,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "gzip_level": gzip_level,
+        }
+
+    def remove_missing_assets(self, assets: set[str]) -> list[str]:
+        """Drops entries of assets that no longer exist and returns their outputs"""
+        missing = [asset for asset in self.assets if asset not in assets]
+        outputs = [self.asset_output(asset) for asset in missing]
+        for asset in missing:
+            del self.assets[asset]
+        return outputs
+
+
+def _recorded_hash(
+    entry: dict | None, key: str, path: Path, stat: os.stat_result
+) -> str:
+    """Returns the hash recorded in entry if size and mtime match, else hashes path"""
+    if (
+        entry
+        and entry["size"] == stat.st_size
+        and entry["mtime_ns"] == stat.st_mtime_ns
+    ):
+        return entry[key]
+    return file_hash(path)
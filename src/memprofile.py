@@ -0,0 +1,120 @@
+"""
+Memory attribution of the build pipeline based on tracemalloc.
+
+For every page the peak (highest traced memory above the level the page
+started at) and the retained bytes (memory still allocated when the page is
+done) are recorded, together with the peak and retained bytes of each
+pipeline stage measured with measure().
+"""
+
+import json
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+_enabled = False
+_page_start = 0
+_page_peak = 0
+_stages: dict[str, dict[str, int]] = {}
+
+
+def enable(enabled: bool = True) -> None:
+    """Starts or stops tracemalloc for the current process"""
+    global _enabled
+    _enabled = enabled
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def start_page() -> None:
+    """Starts measuring a new page"""
+    global _page_start, _page_peak
+    if not _enabled:
+        return
+    _stages.clear()
+    _page_start = tracemalloc.get_traced_memory()[0]
+    _page_peak = 0
+    tracemalloc.reset_peak()
+
+
+@contextmanager
+def measure(name: str):
+    """Records peak and retained bytes of the enclosed code as stage name"""
+    global _page_peak
+    if not _enabled:
+        yield
+        return
+    before = tracemalloc.get_traced_memory()[0]
+    _page_peak = max(_page_peak, tracemalloc.get_traced_memory()[1] - _page_start)
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        stage = _stages.setdefault(name, {"peak": 0, "retained": 0})
+        stage["peak"] = max(stage["peak"], peak - before)
+        stage["retained"] += current - before
+        _page_peak = max(_page_peak, peak - _page_start)
+        tracemalloc.reset_peak()
+
+
+def finish_page() -> dict | None:
+    """Returns the measurements of the current page, None when disabled"""
+    if not _enabled:
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "peak": max(_page_peak, peak - _page_start),
+        "retained": current - _page_start,
+        "stages": {name: dict(stage) for name, stage in _stages.items()},
+    }
+
+
+def build_report(page_memory: dict[str, dict], top: int = 20) -> dict:
+    """
+    Ranks pages and stages by memory use.
+
+    :param page_memory: dict - finish_page results per page source
+    :param top: int - number of pages listed in each ranking
+
+    :returns: dict - JSON serializable report with per stage maxima and totals,
+              the pages with the highest peak and the most retained memory
+    """
+    stages = {}
+    for measurements in page_memory.values():
+        for name, stage in measurements["stages"].items():
+            total = stages.setdefault(
+                name, {"max_peak": 0, "max_retained": 0, "total_retained": 0}
+            )
+            total["max_peak"] = max(total["max_peak"], stage["peak"])
+            total["max_retained"] = max(total["max_retained"], stage["retained"])
+            total["total_retained"] += stage["retained"]
+
+    pages = [
+        {"source": source, **measurements}
+        for source, measurements in page_memory.items()
+    ]
+    by_peak = sorted(pages, key=lambda entry: entry["peak"], reverse=True)
+    by_retained = sorted(pages, key=lambda entry: entry["retained"], reverse=True)
+    ranked_stages = sorted(
+        stages.items(), key=lambda item: item[1]["max_peak"], reverse=True
+    )
+    return {
+        "pages": len(page_memory),
+        "stages": dict(ranked_stages),
+        "highest_peak": by_peak[:top],
+        "most_retained": by_retained[:top],
+    }
+
+
+def write_report(report: dict, path: str | Path) -> None:
+    """Writes the report as JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
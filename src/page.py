@@ -0,0 +1,413 @@
+import html
+import itertools
+import mmap
+from typing import BinaryIO, Callable, Iterable, Iterator, Mapping, Sequence, TextIO
+
+import htmlnode
+import templates
+import textnode
+import toc
+from blocknode import BlockType, iter_blocks, iter_lines, parse_blocks
+from profiling import timed
+
+# line opening and closing the "name: value" fields at the top of a page
+FRONT_MATTER_FENCE = "---"
+NO_TITLE = "Page has no h1 heading to use as a title."
+
+# a parsed block is its type and a payload depending on the type:
+#   HEADING - (level, Sequence[TextNode], id), id is unique within the page
+#   CODE - str, the escaped code
+#   PARAGRAPH, QUOTE - Sequence[TextNode]
+#   UNO_LIST, ORD_LIST - list[Sequence[TextNode]], one sequence per item
+ParsedBlock = tuple[BlockType, object]
+# title of the page, its front matter fields, its parsed blocks and its headings
+ParsedPage = tuple[str, dict[str, str], list[ParsedBlock], list[toc.Heading]]
+# inline parser, text_to_textnodes or a textnode.InlineParseCache; or
+# inline.parse_inline giving HTMLNodes with nested emphasis, whose URLs are
+# replaced while parsing, so the urls given for rendering do not apply
+InlineParser = Callable[
+    [str], Sequence[textnode.TextNode] | Sequence[htmlnode.HTMLNode]
+]
+# replacements of link and image URLs, a dict or an assets.AssetIndex
+URLs = Mapping[str, str]
+
+
+def text_to_children(text: str) -> list[htmlnode.HTMLNode]:
+    """Converts inline markdown to a list of HTML nodes"""
+    return textnodes_to_children(textnode.text_to_textnodes(text))
+
+
+# timed per block, a span per node would slow down text_node_to_html_node
+@timed("text_node_to_html_node")
+def textnodes_to_children(
+    nodes: Sequence[textnode.TextNode],
+) -> list[htmlnode.HTMLNode]:
+    """Converts parsed inline markdown to a list of HTML nodes"""
+    if _is_html(nodes):
+        return list(nodes)
+    return [textnode.text_node_to_html_node(node) for node in nodes]
+
+
+def _is_html(nodes: Sequence) -> bool:
+    """Checks if inline markdown was parsed to HTMLNodes by inline.parse_inline"""
+    return bool(nodes) and isinstance(nodes[0], htmlnode.HTMLNode)
+
+
+def _html_text(node: htmlnode.HTMLNode) -> str:
+    if node.children:
+        return "".join(_html_text(child) for child in node.children)
+    if node.tag == "img":
+        return node.props["alt"]
+    return node.value
+
+
+def plain_text(nodes: Sequence[textnode.TextNode]) -> str:
+    """Returns the text of parsed inline markdown without its markup"""
+    if _is_html(nodes):
+        return "".join(_html_text(node) for node in nodes)
+    return "".join(node.text for node in nodes)
+
+
+def parse_block(
+    block_type: BlockType,
+    lines: list[str],
+    parse_inline: InlineParser = textnode.text_to_textnodes,
+    headings: toc.Headings | None = None,
+) -> object:
+    """
+    Parses the inline markdown of a single block.
+
+    :param block_type: BlockType - type of the block
+    :param lines: list[str] - lines of the block as returned by parse_blocks
+    :param parse_inline: InlineParser - function turning text into TextNodes
+    :param headings: toc.Headings - headings of the page so far, a heading
+                     is added to them and gets an id unique within the page
+
+    :returns: object - payload of the block, see ParsedBlock
+    """
+    match block_type:
+        case BlockType.HEADING:
+            level = len(lines[0]) - len(lines[0].lstrip("#"))
+            nodes = parse_inline(" ".join(lines)[level + 1 :])
+            if headings is None:
+                headings = toc.Headings()
+            return level, nodes, headings.add(level, plain_text(nodes))
+        case BlockType.CODE:
+            # an unclosed fence runs to the end of the document
+            end = -1 if len(lines) > 1 and lines[-1].startswith("```") else None
+            # code is not parsed for inline markdown, only escaped
+            return html.escape("\n".join(lines[1:end]) + "\n", quote=False)
+        case BlockType.QUOTE:
+            text = " ".join(line.lstrip(">").strip() for line in lines)
+            return parse_inline(text)
+        case BlockType.UNO_LIST | BlockType.ORD_LIST:
+            return [parse_inline(line.split(" ", 1)[1]) for line in lines]
+        case _:
+            return parse_inline(" ".join(lines))
+
+
+def parsed_block_to_html_node(
+    block_type: BlockType, payload: object
+) -> htmlnode.HTMLNode:
+    """Converts a parsed block to an HTML node"""
+    match block_type:
+        case BlockType.HEADING:
+            level, nodes, slug = payload
+            return htmlnode.ParentNode(
+                f"h{level}", textnodes_to_children(nodes), {"id": slug}
+            )
+        case BlockType.CODE:
+            return htmlnode.ParentNode("pre", [htmlnode.LeafNode("code", payload)])
+        case BlockType.QUOTE:
+            return htmlnode.ParentNode("blockquote", textnodes_to_children(payload))
+        case BlockType.UNO_LIST | BlockType.ORD_LIST:
+            items = [
+                htmlnode.ParentNode("li", textnodes_to_children(nodes))
+                for nodes in payload
+                if nodes
+            ]
+            tag = "ul" if block_type is BlockType.UNO_LIST else "ol"
+            return htmlnode.ParentNode(tag, items)
+        case _:
+            return htmlnode.ParentNode("p", textnodes_to_children(payload))
+
+
+def _render_inline_block(
+    tag: str, nodes: Sequence[textnode.TextNode], urls: URLs | None, props: str = ""
+) -> str:
+    if not nodes:
+        return ""
+    if _is_html(nodes):
+        html = "".join(node.to_html() for node in nodes)
+    else:
+        html = textnode.textnodes_to_html(nodes, urls)
+    return f"<{tag}{props}>{html}</{tag}>"
+
+
+def render_parsed_block(
+    block_type: BlockType, payload: object, urls: URLs | None = None
+) -> str:
+    """
+    Renders a parsed block straight to HTML, without building its HTMLNode tree.
+    Returns the same HTML as parsed_block_to_html_node(...).to_html(), or ""
+    for a block with no content, which parsed_to_html_node would skip.
+    Link and image URLs found in urls are replaced.
+    """
+    match block_type:
+        case BlockType.HEADING:
+            level, nodes, slug = payload
+            props = htmlnode.serialize_props((("id", slug),))
+            return _render_inline_block(f"h{level}", nodes, urls, props)
+        case BlockType.CODE:
+            return f"<pre><code>{payload}</code></pre>"
+        case BlockType.QUOTE:
+            return _render_inline_block("blockquote", payload, urls)
+        case BlockType.UNO_LIST | BlockType.ORD_LIST:
+            items = "".join(
+                _render_inline_block("li", nodes, urls) for nodes in payload
+            )
+            tag = "ul" if block_type is BlockType.UNO_LIST else "ol"
+            return f"<{tag}>{items}</{tag}>" if items else ""
+        case _:
+            return _render_inline_block("p", payload, urls)
+
+
+def render_blocks(blocks: list[ParsedBlock], urls: URLs | None = None) -> str:
+    """Renders parsed blocks as a single div, the fast path of parsed_to_html_node"""
+    rendered = "".join(
+        render_parsed_block(block_type, payload, urls) for block_type, payload in blocks
+    )
+    return f"<div>{rendered}</div>"
+
+
+def block_to_html_node(block_type: BlockType, lines: list[str]) -> htmlnode.HTMLNode:
+    """
+    Converts a single markdown block to an HTML node.
+
+    :param block_type: BlockType - type of the block
+    :param lines: list[str] - lines of the block as returned by parse_blocks
+
+    :returns: HTMLNode - node representing the whole block
+    """
+    return parsed_block_to_html_node(block_type, parse_block(block_type, lines))
+
+
+def parse_markdown(
+    markdown: str,
+    parse_inline: InlineParser = textnode.text_to_textnodes,
+    headings: toc.Headings | None = None,
+) -> list[ParsedBlock]:
+    """
+    Parses a whole markdown document into typed blocks with parsed inline markdown.
+    Its headings are collected into headings in the same pass, see parse_block.
+    """
+    if headings is None:
+        headings = toc.Headings()
+    return [
+        (block_type, parse_block(block_type, lines, parse_inline, headings))
+        for block_type, lines in parse_blocks(markdown)
+    ]
+
+
+def parsed_to_html_node(blocks: list[ParsedBlock]) -> htmlnode.ParentNode:
+    """
+    Converts parsed blocks to a single div node.
+    Blocks with no content after inline parsing (e.g. "****") are skipped.
+    """
+    children = []
+    for block_type, payload in blocks:
+        node = parsed_block_to_html_node(block_type, payload)
+        if node.children:
+            children.append(node)
+    return htmlnode.ParentNode("div", children)
+
+
+def markdown_to_html_node(markdown: str) -> htmlnode.ParentNode:
+    """Converts a whole markdown document to a single div node"""
+    return parsed_to_html_node(parse_markdown(markdown))
+
+
+def block_title(block_type: BlockType, lines: list[str]) -> str | None:
+    """Returns the title an h1 heading block gives its page, None for other blocks"""
+    if block_type is BlockType.HEADING and lines[0].startswith("# "):
+        return lines[0][2:].strip()
+    return None
+
+
+def extract_title(markdown: str) -> str:
+    """
+    Returns the text of the first h1 heading block of the document.
+    "# " lines inside fenced code blocks are not headings.
+    """
+    for block_type, lines in parse_blocks(markdown):
+        title = block_title(block_type, lines)
+        if title is not None:
+            return title
+    raise ValueError(NO_TITLE)
+
+
+def read_front_matter(
+    lines: Iterable[str],
+) -> tuple[dict[str, str], Iterator[str]]:
+    """
+    Reads the front matter fields from the start of a page.
+
+    Front matter is a block of "name: value" lines between two "---" lines
+    that has to start on the first line of the page.
+
+    :param lines: Iterable[str] - lines of the page without line endings
+
+    :returns: tuple[dict[str, str], Iterator[str]] - the fields and the lines
+              of the page after the front matter
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, lines
+    if first.rstrip() != FRONT_MATTER_FENCE:
+        return {}, itertools.chain((first,), lines)
+
+    fields = {}
+    for line in lines:
+        if line.rstrip() == FRONT_MATTER_FENCE:
+            return fields, lines
+        if not line.strip():
+            continue
+        name, separator, value = line.partition(":")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid front matter line: {line!r}")
+        fields[name.strip()] = value.strip()
+    raise ValueError(f"Front matter is not closed with {FRONT_MATTER_FENCE}")
+
+
+def split_front_matter(markdown: str) -> tuple[dict[str, str], str]:
+    """Returns the front matter fields of a page and the markdown after them"""
+    if not markdown.startswith(FRONT_MATTER_FENCE):
+        return {}, markdown
+    fields, lines = read_front_matter(markdown.split("\n"))
+    return fields, "\n".join(lines)
+
+
+def parse_page(
+    markdown: str, parse_inline: InlineParser = textnode.text_to_textnodes
+) -> ParsedPage:
+    """
+    Parses a markdown document with its title, front matter and headings.
+    The title comes from the first h1 heading block, like in stream_page.
+    """
+    fields, markdown = split_front_matter(markdown)
+    headings = toc.Headings()
+    title = None
+    blocks = []
+    for block_type, lines in parse_blocks(markdown):
+        if title is None:
+            title = block_title(block_type, lines)
+        blocks.append(
+            (block_type, parse_block(block_type, lines, parse_inline, headings))
+        )
+    if title is None:
+        raise ValueError(NO_TITLE)
+    return title, fields, blocks, headings.entries
+
+
+def _compiled(template: str | templates.Template) -> templates.Template:
+    if isinstance(template, str):
+        return templates.compile_template(template)
+    return template
+
+
+def fill_template(
+    template: str | templates.Template,
+    title: str,
+    content: str,
+    fields: dict[str, str] | None = None,
+    contents: str | None = None,
+) -> str:
+    """
+    Puts the title, rendered content, table of contents and front matter fields
+    into the template. Title, content and table of contents take precedence
+    over front matter fields of the same name.
+    """
+    values = {**fields} if fields else {}
+    values[templates.TITLE] = title
+    values[templates.CONTENT] = content
+    if contents is not None:
+        values[templates.TOC] = contents
+    return _compiled(template).render(values)
+
+
+def render_parsed(
+    parsed: ParsedPage, template: str | templates.Template, urls: URLs | None = None
+) -> str:
+    """Renders a parsed page into the template as a full HTML page"""
+    title, fields, blocks, headings = parsed
+    content = render_blocks(blocks, urls)
+    return fill_template(template, title, content, fields, toc.render_toc(headings))
+
+
+def render_page(markdown: str, template: str | templates.Template) -> str:
+    """Renders a markdown document into the template as a full HTML page"""
+    return render_parsed(parse_page(markdown), template)
+
+
+def stream_page(
+    source: TextIO | BinaryIO | mmap.mmap,
+    out: TextIO,
+    template: str | templates.Template,
+    encoding: str = "utf-8",
+    parse_inline: InlineParser = textnode.text_to_textnodes,
+    urls: URLs | None = None,
+    headings: toc.Headings | None = None,
+) -> None:
+    """
+    Renders a markdown source into the template block by block.
+
+    Every block is parsed, rendered and written to out as soon as it is read,
+    so memory depends on the largest block and not on the document size.
+    Blocks before the first h1 heading, which gives the title, are kept until
+    the heading is found. The headings are only all known at the end, so a
+    {{ TOC }} placeholder is filled when it comes after {{ Content }} and left
+    empty when it comes before.
+
+    :param source: text/binary file object or mmap, see blocknode.read_blocks
+    :param out: TextIO - file object the page is written to
+    :param template: str | Template - template with {{ Title }}, {{ Content }}
+                     and front matter field placeholders
+    :param encoding: str - encoding of binary sources
+    :param parse_inline: InlineParser - function turning text into TextNodes
+    :param urls: URLs - replacements of link and image URLs
+    :param headings: toc.Headings - collects the headings of the page, by
+                     default they are only kept for a {{ TOC }} placeholder
+    """
+    template = _compiled(template)
+    fields, lines = read_front_matter(iter_lines(source, encoding))
+    if headings is None:
+        headings = toc.Headings(
+            collect=any(name == templates.TOC for name, _ in template.slots)
+        )
+    values = {**fields, templates.TOC: ""}
+    title = None
+    pending = []  # rendered blocks read before the title
+
+    for block_type, lines in iter_blocks(lines):
+        if title is None and (title := block_title(block_type, lines)) is not None:
+            values[templates.TITLE] = title
+            head, _ = template.render_around(values)
+            out.write(head)
+            out.write("<div>")
+            out.writelines(pending)
+            pending = None
+
+        html = render_parsed_block(
+            block_type, parse_block(block_type, lines, parse_inline, headings), urls
+        )
+        if title is None:
+            pending.append(html)
+        else:
+            out.write(html)
+
+    if title is None:
+        raise ValueError(NO_TITLE)
+    out.write("</div>")
+    values[templates.TOC] = toc.render_toc(headings)
+    out.write(template.render_around(values)[1])
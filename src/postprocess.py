@@ -0,0 +1,154 @@
+import os
+import re
+import zlib
+from pathlib import Path
+
+GZIP_SUFFIX = ".gz"
+DEFAULT_GZIP_LEVEL = 9
+# outputs worth compressing, images and fonts are compressed already
+COMPRESSIBLE_SUFFIXES = frozenset(
+    {".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map"}
+)
+_CHUNK_SIZE = 1024 * 1024
+# gzip header and trailer around a raw deflate stream
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# comments, elements whose content is kept as is, other tags and text
+_HTML_TOKEN = re.compile(
+    r"<!--.*?-->"
+    r"|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>"
+    r"|<[^>]*>"
+    r"|[^<]+",
+    re.DOTALL | re.IGNORECASE,
+)
+_TAG_NAME = re.compile(r"</?([A-Za-z!][\w-]*)")
+_WHITESPACE = re.compile(r"\s+")
+# whitespace next to these tags is not rendered, so it can be dropped
+BLOCK_TAGS = frozenset(
+    {
+        "!doctype",
+        "html",
+        "head",
+        "body",
+        "title",
+        "meta",
+        "link",
+        "script",
+        "style",
+        "article",
+        "aside",
+        "div",
+        "footer",
+        "header",
+        "main",
+        "nav",
+        "section",
+        "p",
+        "blockquote",
+        "pre",
+        "ul",
+        "ol",
+        "li",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "hr",
+        "br",
+        "table",
+        "thead",
+        "tbody",
+        "tr",
+        "th",
+        "td",
+    }
+)
+
+
+def _block_tag(token: str | None) -> bool:
+    if token is None or not token.startswith("<"):
+        return False
+    match = _TAG_NAME.match(token)
+    return match is not None and match.group(1).lower() in BLOCK_TAGS
+
+
+def minify_html(html: str) -> str:
+    """
+    Removes comments and whitespace that does not change how a page renders.
+
+    Whitespace runs in text collapse to a single space and whitespace next to
+    block level tags is dropped. Content of pre, textarea, script and style
+    elements is kept as is.
+    """
+    tokens = [match.group() for match in _HTML_TOKEN.finditer(html)]
+    parts = []
+    previous = None  # last kept tag or text
+    for index, token in enumerate(tokens):
+        if token.startswith("<!--"):
+            continue
+        if not token.startswith("<"):
+            following = tokens[index + 1] if index + 1 < len(tokens) else None
+            if _block_tag(previous):
+                token = token.lstrip()
+            if _block_tag(following):
+                token = token.rstrip()
+            token = _WHITESPACE.sub(" ", token)
+            if not token:
+                continue
+        parts.append(token)
+        previous = token
+    return "".join(parts)
+
+
+def is_compressible(path: str | Path) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_SUFFIXES
+
+
+def gzip_path(path: str | Path) -> str:
+    """Returns the path of the precompressed sibling of an output"""
+    return f"{path}{GZIP_SUFFIX}"
+
+
+def _replace_with(path: str, write) -> None:
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def write_gzip(path: str | Path, data: bytes, level: int = DEFAULT_GZIP_LEVEL) -> None:
+    """
+    Writes data compressed as the .gz sibling of path.
+    The gzip header has no name and mtime, so equal data gives equal files.
+    """
+
+    def write(f):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+        f.write(compressor.compress(data))
+        f.write(compressor.flush())
+
+    _replace_with(gzip_path(path), write)
+
+
+def gzip_file(path: str | Path, level: int = DEFAULT_GZIP_LEVEL) -> None:
+    """Writes the .gz sibling of a file, reading it in chunks"""
+
+    def write(f):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+        with open(path, "rb") as source:
+            while chunk := source.read(_CHUNK_SIZE):
+                f.write(compressor.compress(chunk))
+        f.write(compressor.flush())
+
+    _replace_with(gzip_path(path), write)
+
+
+def remove_gzip(path: str | Path) -> None:
+    """Removes the .gz sibling of an output, so a stale one is never served"""
+    Path(gzip_path(path)).unlink(missing_ok=True)
@@ -0,0 +1,176 @@
+"""
+Lightweight timing spans for the build pipeline.
+
+Spans are off by default, a disabled span costs a single flag check. When
+enabled, the self time (time not spent in nested spans) is accumulated per
+span stack such as "parse;parse_blocks", which maps directly onto the folded
+stack format used by flamegraph tools.
+"""
+
+import functools
+import inspect
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+_enabled = False
+_stack: list[str] = []  # names of the active spans
+_children: list[float] = []  # time spent in nested spans, per active span
+_self_times: dict[str, float] = {}  # "outer;inner" stack -> self time in seconds
+
+
+def enable(enabled: bool = True) -> None:
+    """Switches span recording on or off for the current process"""
+    global _enabled
+    _enabled = enabled
+    reset()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Drops every recorded span"""
+    _stack.clear()
+    _children.clear()
+    _self_times.clear()
+
+
+def collect() -> dict[str, float]:
+    """Returns the recorded self times per span stack and starts over"""
+    recorded = dict(_self_times)
+    _self_times.clear()
+    return recorded
+
+
+def _enter(name: str) -> float:
+    _stack.append(name)
+    _children.append(0.0)
+    return perf_counter()
+
+
+def _exit(start: float) -> None:
+    elapsed = perf_counter() - start
+    key = ";".join(_stack)
+    _stack.pop()
+    _self_times[key] = _self_times.get(key, 0.0) + elapsed - _children.pop()
+    if _children:
+        _children[-1] += elapsed
+
+
+@contextmanager
+def span(name: str):
+    """Times the enclosed code as a span named name"""
+    if not _enabled:
+        yield
+        return
+    start = _enter(name)
+    try:
+        yield
+    finally:
+        _exit(start)
+
+
+def timed(name: str):
+    """
+    Decorator timing every call of the function as a span named name.
+    For generator functions every resumption is timed, so lazily consumed
+    generators are attributed correctly.
+    """
+
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if not _enabled:
+                    yield from func(*args, **kwargs)
+                    return
+                generator = func(*args, **kwargs)
+                while True:
+                    start = _enter(name)
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        _exit(start)
+                    yield item
+
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = _enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _exit(start)
+
+        return wrapper
+
+    return decorator
+
+
+def stage_totals(self_times: dict[str, float]) -> dict[str, float]:
+    """Sums self times by the innermost span name"""
+    totals = {}
+    for stack, seconds in self_times.items():
+        stage = stack.rsplit(";", 1)[-1]
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return totals
+
+
+def folded_stacks(self_times: dict[str, float], root: str = "build") -> list[str]:
+    """Formats self times as folded stack lines with microsecond counts"""
+    return [
+        f"{root};{stack} {round(seconds * 1e6)}"
+        for stack, seconds in sorted(self_times.items())
+        if seconds > 0
+    ]
+
+
+def build_report(page_times: dict[str, dict[str, float]], top: int = 20) -> dict:
+    """
+    Summarizes recorded spans of every page.
+
+    :param page_times: dict - span self times per page source
+    :param top: int - number of slowest pages to list
+
+    :returns: dict - JSON serializable report with per stage totals, the
+              slowest pages with their stage times and folded stacks of the build
+    """
+    merged = {}
+    pages = []
+    for source, self_times in page_times.items():
+        for stack, seconds in self_times.items():
+            merged[stack] = merged.get(stack, 0.0) + seconds
+        pages.append(
+            {
+                "source": source,
+                "seconds": sum(self_times.values()),
+                "stages": stage_totals(self_times),
+            }
+        )
+    pages.sort(key=lambda entry: entry["seconds"], reverse=True)
+    return {
+        "pages": len(page_times),
+        "seconds": sum(merged.values()),
+        "stages": stage_totals(merged),
+        "slowest_pages": pages[:top],
+        "folded": folded_stacks(merged),
+    }
+
+
+def write_report(report: dict, path: str | Path) -> None:
+    """Writes the report as JSON and its folded stacks next to it (.folded)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    path.with_suffix(".folded").write_text(
+        "\n".join(report["folded"]) + "\n", encoding="utf-8"
+    )
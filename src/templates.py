@@ -0,0 +1,127 @@
+import functools
+import os
+import re
+from pathlib import Path
+from typing import Mapping, Self
+
+# {{ Name }} placeholders, the whitespace inside the braces is optional
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][\w-]*)\s*\}\}")
+# href and src attribute values in the template markup
+URL_ATTRIBUTE_PATTERN = re.compile(
+    r"""(\s(?:href|src)\s*=\s*)(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE
+)
+TITLE = "Title"
+CONTENT = "Content"
+# table of contents of the page, see toc.render_toc
+TOC = "TOC"
+COMPILED_CACHE_SIZE = 64
+
+# compiled templates of load(), by resolved path, with the stat they were read at
+_loaded: dict[str, tuple[tuple[int, int], "Template"]] = {}
+
+
+class Template:
+    """
+    A page template compiled to literal segments and the slots between them.
+
+    Rendering joins the segments with the field of every slot instead of
+    scanning the template for every placeholder of every page.
+
+    Attributes:
+        source (str): Text of the template.
+        segments (tuple[str, ...]): Literal text, one more than there are slots.
+        slots (tuple[tuple[str, str], ...]): Field name and placeholder text of
+            every slot, the placeholder is kept when a page has no such field.
+    """
+
+    __slots__ = ("source", "segments", "slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        segments = []
+        slots = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            segments.append(source[position : match.start()])
+            slots.append((match.group(1), match.group()))
+            position = match.end()
+        segments.append(source[position:])
+        self.segments = tuple(segments)
+        self.slots = tuple(slots)
+
+    def __repr__(self) -> str:
+        return f"Template(slots={[name for name, _ in self.slots]})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Template) and self.source == other.source
+
+    def __hash__(self) -> int:
+        return hash(self.source)
+
+    def _parts(self, fields: Mapping[str, str], start: int, stop: int) -> list[str]:
+        segments = self.segments
+        parts = [segments[start]]
+        for index in range(start, stop):
+            name, placeholder = self.slots[index]
+            parts.append(fields.get(name, placeholder))
+            parts.append(segments[index + 1])
+        return parts
+
+    def render(self, fields: Mapping[str, str]) -> str:
+        """Fills every slot with its field, slots without a field are left as is"""
+        return "".join(self._parts(fields, 0, len(self.slots)))
+
+    def with_urls(self, urls: Mapping[str, str]) -> Self:
+        """
+        Returns the template with the href and src attributes of its own markup
+        looked up in urls (e.g. fingerprinted assets). Done once per build on
+        the template, rendered pages are not scanned.
+        """
+
+        def replace(match: re.Match) -> str:
+            quote = '"' if match.group(2) is not None else "'"
+            url = match.group(2) if match.group(2) is not None else match.group(3)
+            return f"{match.group(1)}{quote}{urls.get(url, url)}{quote}"
+
+        return type(self)(URL_ATTRIBUTE_PATTERN.sub(replace, self.source))
+
+    def render_around(
+        self, fields: Mapping[str, str], slot: str = CONTENT
+    ) -> tuple[str, str]:
+        """
+        Renders the template before and after the first slot named slot,
+        so that slot can be written in between piece by piece.
+
+        :param fields: Mapping[str, str] - fields of the other slots
+        :param slot: str - name of the slot to split at
+
+        :returns: tuple[str, str] - the rendered head and tail, the tail is
+                  empty if there is no such slot
+        """
+        names = [name for name, _ in self.slots]
+        if slot not in names:
+            return self.render(fields), ""
+        index = names.index(slot)
+        head = self._parts(fields, 0, index)
+        tail = self._parts(fields, index + 1, len(self.slots))
+        return "".join(head), "".join(tail)
+
+
+# the same template text is rendered for every page
+compile_template = functools.lru_cache(maxsize=COMPILED_CACHE_SIZE)(Template)
+
+
+def load(path: str | Path) -> Template:
+    """
+    Returns the compiled template of a file.
+    Compiled templates are kept until the size or mtime of their file changes.
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    template = compile_template(Path(path).read_text(encoding="utf-8"))
+    _loaded[path] = (key, template)
+    return template
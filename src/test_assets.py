@@ -0,0 +1,218 @@
+import errno
+import gzip
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import assets
+from assets import (
+    AssetIndex,
+    copy_asset,
+    find_assets,
+    fingerprinted_path,
+    sync_assets,
+)
+from manifest import BuildManifest
+
+DATA = os.urandom(300_000)
+
+
+class TestCopyAsset(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.source = self.root / "image.png"
+        self.source.write_bytes(DATA)
+        self.destination = self.root / "public" / "img" / "image.png"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_copied(self, method):
+        self.assertEqual(self.destination.read_bytes(), DATA)
+        self.assertNotEqual(
+            self.destination.stat().st_ino, self.source.stat().st_ino, method
+        )
+        self.assertEqual(list(self.destination.parent.iterdir()), [self.destination])
+
+    def test_kernel_copy(self):
+        method = copy_asset(self.source, self.destination)
+        self.assertIn(method, (assets.COPY_FILE_RANGE, assets.SENDFILE))
+        self.assert_copied(method)
+
+    def test_overwrite(self):
+        self.destination.parent.mkdir(parents=True)
+        self.destination.write_bytes(b"old content that is longer" * 100_000)
+        copy_asset(self.source, self.destination)
+        self.assert_copied("overwrite")
+
+    def test_fallbacks(self):
+        unsupported = OSError(errno.EXDEV, "cross-device")
+        with mock.patch("os.copy_file_range", side_effect=unsupported, create=True):
+            self.assertEqual(copy_asset(self.source, self.destination), assets.SENDFILE)
+            self.assert_copied("sendfile")
+            with mock.patch("os.sendfile", side_effect=unsupported, create=True):
+                method = copy_asset(self.source, self.destination)
+        self.assertEqual(method, assets.BUFFERED)
+        self.assert_copied(method)
+
+    def test_other_errors_raised(self):
+        with mock.patch(
+            "os.copy_file_range", side_effect=OSError(errno.ENOSPC, "full"), create=True
+        ):
+            with self.assertRaises(OSError):
+                copy_asset(self.source, self.destination)
+        self.assertEqual(list(self.destination.parent.iterdir()), [])
+
+    def test_hardlink(self):
+        self.assertEqual(
+            copy_asset(self.source, self.destination, hardlink=True), assets.HARDLINK
+        )
+        self.assertEqual(self.destination.stat().st_ino, self.source.stat().st_ino)
+
+    def test_hardlink_fallback(self):
+        with mock.patch("os.link", side_effect=OSError(errno.EXDEV, "cross-device")):
+            method = copy_asset(self.source, self.destination, hardlink=True)
+        self.assertNotEqual(method, assets.HARDLINK)
+        self.assert_copied(method)
+
+
+class TestSyncAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.static = root / "static"
+        self.dest = root / "public"
+        (self.static / "fonts").mkdir(parents=True)
+        (self.static / "styles.css").write_text("body {}")
+        (self.static / "fonts" / "font.woff2").write_bytes(DATA)
+        self.manifest = BuildManifest()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_assets(self):
+        self.assertEqual(
+            find_assets(self.static), [Path("fonts/font.woff2"), Path("styles.css")]
+        )
+
+    def test_sync(self):
+        result = sync_assets(self.static, self.dest, self.manifest, workers=2)
+        self.assertEqual(result.copied, ["fonts/font.woff2", "styles.css"])
+        self.assertEqual(sum(result.methods.values()), 2)
+        self.assertEqual((self.dest / "styles.css").read_text(), "body {}")
+        self.assertEqual((self.dest / "fonts" / "font.woff2").read_bytes(), DATA)
+
+    def test_unchanged_skipped_without_hashing(self):
+        sync_assets(self.static, self.dest, self.manifest)
+        with mock.patch("manifest.file_hash") as file_hash:
+            result = sync_assets(self.static, self.dest, self.manifest)
+        file_hash.assert_not_called()
+        self.assertEqual(result.copied, [])
+        self.assertEqual(result.skipped, ["fonts/font.woff2", "styles.css"])
+
+    def test_touched_but_same_content_skipped(self):
+        sync_assets(self.static, self.dest, self.manifest)
+        path = self.static / "styles.css"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        result = sync_assets(self.static, self.dest, self.manifest)
+        self.assertEqual(result.copied, [])
+        self.assertEqual(result.skipped, ["fonts/font.woff2", "styles.css"])
+        # the new mtime was recorded
+        with mock.patch("manifest.file_hash") as file_hash:
+            sync_assets(self.static, self.dest, self.manifest)
+        file_hash.assert_not_called()
+
+    def test_changed_copied(self):
+        sync_assets(self.static, self.dest, self.manifest)
+        (self.static / "styles.css").write_text("body { color: red }")
+        result = sync_assets(self.static, self.dest, self.manifest)
+        self.assertEqual(result.copied, ["styles.css"])
+        self.assertEqual((self.dest / "styles.css").read_text(), "body { color: red }")
+
+    def test_missing_output_copied(self):
+        sync_assets(self.static, self.dest, self.manifest)
+        (self.dest / "styles.css").unlink()
+        result = sync_assets(self.static, self.dest, self.manifest)
+        self.assertEqual(result.copied, ["styles.css"])
+
+    def test_force(self):
+        sync_assets(self.static, self.dest, self.manifest)
+        result = sync_assets(self.static, self.dest, self.manifest, force=True)
+        self.assertEqual(result.copied, ["fonts/font.woff2", "styles.css"])
+
+    def test_fingerprint(self):
+        (self.static / "robots.txt").write_text("")
+        result = sync_assets(self.static, self.dest, self.manifest, fingerprint=True)
+        styles = result.outputs["styles.css"]
+        self.assertRegex(styles, r"^styles\.[0-9a-f]{8}\.css$")
+        self.assertEqual(result.outputs["robots.txt"], "robots.txt")
+        self.assertEqual((self.dest / styles).read_text(), "body {}")
+        self.assertFalse((self.dest / "styles.css").exists())
+        self.assertEqual(result.stale, [])
+
+        (self.static / "styles.css").write_text("body { color: red }")
+        result = sync_assets(self.static, self.dest, self.manifest, fingerprint=True)
+        self.assertEqual(result.copied, ["styles.css"])
+        self.assertEqual(result.stale, [styles])
+        self.assertNotEqual(result.outputs["styles.css"], styles)
+
+    def test_fingerprint_toggled(self):
+        sync_assets(self.static, self.dest, self.manifest)
+        result = sync_assets(self.static, self.dest, self.manifest, fingerprint=True)
+        self.assertEqual(result.copied, ["fonts/font.woff2", "styles.css"])
+        self.assertEqual(result.stale, ["fonts/font.woff2", "styles.css"])
+
+    def test_gzip(self):
+        result = sync_assets(self.static, self.dest, self.manifest, gzip_level=9)
+        self.assertEqual(result.compressed, ["styles.css"])
+        gz = self.dest / "styles.css.gz"
+        self.assertEqual(gzip.decompress(gz.read_bytes()), b"body {}")
+        self.assertFalse((self.dest / "fonts" / "font.woff2.gz").exists())
+
+        result = sync_assets(self.static, self.dest, self.manifest, gzip_level=9)
+        self.assertEqual(result.compressed, [])
+        result = sync_assets(self.static, self.dest, self.manifest, gzip_level=1)
+        self.assertEqual(result.compressed, ["styles.css"])
+        self.assertEqual(result.copied, [])
+
+        result = sync_assets(self.static, self.dest, self.manifest)
+        self.assertEqual(result.compressed, [])
+        self.assertFalse(gz.exists())
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_fingerprinted_path(self):
+        self.assertEqual(
+            fingerprinted_path("css/site.min.css", "0123456789abcdef"),
+            "css/site.min.01234567.css",
+        )
+        self.assertEqual(fingerprinted_path("favicon.ico", "0123"), "favicon.ico")
+
+    def test_asset_index(self):
+        index = AssetIndex(
+            {"styles.css": "styles.1234.css", "blog/img/a.png": "blog/img/a.99.png"}
+        )
+        self.assertEqual(index.get("/styles.css"), "/styles.1234.css")
+        self.assertEqual(index.get("/styles.css?v=2#x"), "/styles.1234.css?v=2#x")
+        # relative URLs depend on the page
+        self.assertIsNone(index.get("styles.css"))
+        self.assertIsNone(index.get("https://example.com/styles.css"))
+        self.assertEqual(index.get("/missing.css", "/missing.css"), "/missing.css")
+
+        post = index.for_page("blog/post.html")
+        self.assertEqual(post.get("img/a.png"), "img/a.99.png")
+        self.assertEqual(post.get("../styles.css"), "../styles.1234.css")
+        self.assertEqual(post.get("/blog/img/a.png"), "/blog/img/a.99.png")
+        self.assertIsNone(index.for_page("index.html").get("img/a.png"))
+
+    def test_not_fingerprinted(self):
+        index = AssetIndex({"robots.txt": "robots.txt"})
+        self.assertEqual(index.get("/robots.txt", "default"), "default")
+
+
+if __name__ == "__main__":
+    unittest.main()
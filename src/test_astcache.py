@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from astcache import ASTCache, dump_parsed, load_parsed
+from page import parse_page, render_parsed
+
+MARKDOWN = """# Title with **bold**
+
+A paragraph with a [link](https://boot.dev) and ![img](a.png)
+
+```
+code <here>
+```
+
+## Section
+
+## Section
+
+> quote _text_
+
+- one
+- two
+
+1. first
+2. `second`
+"""
+
+
+class TestSerialization(unittest.TestCase):
+    def test_round_trip(self):
+        parsed = parse_page(MARKDOWN)
+        self.assertEqual(load_parsed(dump_parsed(parsed)), parsed)
+
+    def test_renders_the_same(self):
+        parsed = parse_page(MARKDOWN)
+        template = "{{ Title }}|{{ TOC }}|{{ Content }}"
+        self.assertEqual(
+            render_parsed(load_parsed(dump_parsed(parsed)), template),
+            render_parsed(parsed, template),
+        )
+
+
+class TestASTCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name) / "ast"
+        self.parsed = parse_page(MARKDOWN)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_missing(self):
+        self.assertIsNone(ASTCache(self.directory).get("abc"))
+
+    def test_put_get(self):
+        cache = ASTCache(self.directory)
+        cache.put("abc", self.parsed)
+        self.assertEqual(cache.get("abc"), self.parsed)
+        self.assertIsNone(cache.get("other"))
+
+    def test_corrupt_entry(self):
+        cache = ASTCache(self.directory)
+        cache.put("abc", self.parsed)
+        for path in self.directory.iterdir():
+            path.write_bytes(b"garbage")
+        self.assertIsNone(cache.get("abc"))
+
+    def test_evict_least_recently_used(self):
+        cache = ASTCache(self.directory)
+        for number, key in enumerate(["a", "b", "c"]):
+            cache.put(key, self.parsed)
+            os.utime(cache._path(key), ns=(number * 10**9, number * 10**9))
+        entry_size = cache._path("a").stat().st_size
+        # using "a" makes "b" the least recently used entry
+        cache.get("a")
+        cache.max_bytes = entry_size * 2
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_evict_missing_directory(self):
+        self.assertEqual(ASTCache(self.directory).evict(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
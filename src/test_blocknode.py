@@ -1,6 +1,19 @@
+import io
+import mmap
+import tempfile
 import unittest
+from pathlib import Path
 
-from blocknode import BlockType, block_to_block_type, markdown_to_blocks
+from blocknode import (
+    BlockType,
+    block_to_block_type,
+    iter_lines,
+    markdown_to_blocks,
+    parse_blocks,
+    read_blocks,
+    read_blocks_from_path,
+    stream_markdown_blocks,
+)
 
 
 class TestMarkdownToBlock(unittest.TestCase):
@@ -97,5 +110,160 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
 
+class TestParseBlocks(unittest.TestCase):
+    def test_matches_markdown_to_blocks(self):
+        md = """
+# Heading
+
+This is another paragraph with _italic_ text and `code` here
+This is the same paragraph on a new line
+
+- This is a list
+- with items
+
+1. first
+2. second
+
+> quote
+> more quote
+
+1. first
+3. not ordered
+"""
+        self.assertEqual(
+            [(block_type, "\n".join(lines)) for block_type, lines in parse_blocks(md)],
+            [
+                (block_to_block_type(block), block)
+                for block in markdown_to_blocks(md)
+            ],
+        )
+
+    def test_empty_string(self):
+        self.assertEqual(list(parse_blocks("")), [])
+
+    def test_whitespace_only(self):
+        self.assertEqual(list(parse_blocks(" \n\n ")), [])
+
+    def test_code_block_with_blank_lines(self):
+        md = "Here is some code:\n\n```\ndef hello():\n\n    pass\n```\n\nEnd of code."
+        self.assertEqual(
+            list(parse_blocks(md)),
+            [
+                (BlockType.PARAGRAPH, ["Here is some code:"]),
+                (BlockType.CODE, ["```", "def hello():", "", "    pass", "```"]),
+                (BlockType.PARAGRAPH, ["End of code."]),
+            ],
+        )
+
+    def test_unclosed_code_block(self):
+        self.assertEqual(
+            list(parse_blocks("```\ncode\n\nmore")),
+            [(BlockType.CODE, ["```", "code", "", "more"])],
+        )
+
+    def test_code_block_closed_on_opening_line(self):
+        md = "```x```\n\npara\n\n# h"
+        self.assertEqual(
+            list(parse_blocks(md)),
+            [
+                (BlockType.CODE, ["```x```"]),
+                (BlockType.PARAGRAPH, ["para"]),
+                (BlockType.HEADING, ["# h"]),
+            ],
+        )
+        self.assertEqual(
+            [block_type for block_type, _ in parse_blocks(md)],
+            [block_to_block_type(block) for block in markdown_to_blocks(md)],
+        )
+
+    def test_stripped_like_markdown_to_blocks(self):
+        self.assertEqual(
+            list(parse_blocks("   > This is a quote  \n")),
+            [(BlockType.QUOTE, ["> This is a quote"])],
+        )
+
+    def test_broken_list_is_paragraph(self):
+        self.assertEqual(
+            list(parse_blocks("- Item 1\nItem 2")),
+            [(BlockType.PARAGRAPH, ["- Item 1", "Item 2"])],
+        )
+
+    def test_type_checked_after_stripping(self):
+        for md in ("# T\n\n- a\n- ", "1. a\n2. ", "# ", "- \n\n", "1. a\n2. \n\nb"):
+            with self.subTest(md=md):
+                self.assertEqual(
+                    [
+                        (block_type, "\n".join(lines))
+                        for block_type, lines in parse_blocks(md)
+                    ],
+                    [
+                        (block_to_block_type(block), block)
+                        for block in markdown_to_blocks(md)
+                    ],
+                )
+        self.assertEqual(
+            list(parse_blocks("- a\n- ")), [(BlockType.PARAGRAPH, ["- a", "-"])]
+        )
+
+
+class TestReadBlocks(unittest.TestCase):
+    markdown = (
+        "# Zażółć gęślą jaźń\n\nA paragraph\nwith two lines\n\n"
+        "```\ncode\n\nmore code\n```\n\n- one\n- two\n"
+    )
+
+    def test_text_file(self):
+        self.assertEqual(
+            list(read_blocks(io.StringIO(self.markdown))),
+            list(parse_blocks(self.markdown)),
+        )
+
+    def test_binary_file(self):
+        source = io.BytesIO(self.markdown.encode("utf-8"))
+        self.assertEqual(list(read_blocks(source)), list(parse_blocks(self.markdown)))
+
+    def test_crlf(self):
+        source = io.BytesIO(self.markdown.replace("\n", "\r\n").encode("utf-8"))
+        self.assertEqual(list(read_blocks(source)), list(parse_blocks(self.markdown)))
+
+    def test_mmap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "page.md"
+            path.write_bytes(self.markdown.encode("utf-8"))
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    blocks = list(read_blocks(buffer))
+            self.assertEqual(blocks, list(parse_blocks(self.markdown)))
+            self.assertEqual(
+                list(read_blocks_from_path(path)), list(parse_blocks(self.markdown))
+            )
+
+    def test_lines_split_like_str(self):
+        for text in ("", "a", "a\n", "a\n\n", "\n  \n"):
+            with self.subTest(text=text):
+                self.assertEqual(list(iter_lines(io.StringIO(text))), text.split("\n"))
+                self.assertEqual(
+                    list(iter_lines(io.BytesIO(text.encode()))), text.split("\n")
+                )
+
+    def test_empty_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "empty.md"
+            path.touch()
+            self.assertEqual(list(read_blocks_from_path(path)), [])
+
+    def test_lazy(self):
+        lines = iter(["first", "", "second", ""])
+        blocks = read_blocks(lines)
+        self.assertEqual(next(blocks), (BlockType.PARAGRAPH, ["first"]))
+        self.assertEqual(next(lines), "second")
+
+    def test_stream_markdown_blocks(self):
+        md = "Para one\n\n- a\n- b\n\n\n  Para two  "
+        self.assertEqual(
+            list(stream_markdown_blocks(io.StringIO(md))), markdown_to_blocks(md)
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
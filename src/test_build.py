@@ -0,0 +1,389 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import build
+from build import build_site, find_pages
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestBuildSite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.dest = root / "public"
+        self.template = root / "template.html"
+        self.template.write_text(TEMPLATE)
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "post.md").write_text("# Post\n\n- a\n- b")
+        (self.content / "notes.txt").write_text("not a page")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_pages(self):
+        self.assertEqual(
+            find_pages(self.content), [Path("blog/post.md"), Path("index.md")]
+        )
+
+    def assert_built(self, report):
+        self.assertEqual(report.rendered, ["blog/post.md", "index.md"])
+        self.assertEqual(
+            (self.dest / "index.html").read_text(),
+            '<title>Home</title><div><h1 id="home">Home</h1><p>Welcome</p></div>',
+        )
+        self.assertEqual(
+            (self.dest / "blog" / "post.html").read_text(),
+            '<title>Post</title>'
+            '<div><h1 id="post">Post</h1><ul><li>a</li><li>b</li></ul></div>',
+        )
+
+    def test_build_single_process(self):
+        self.assert_built(build_site(self.content, self.dest, self.template, workers=1))
+
+    def test_build_process_pool(self):
+        self.assert_built(
+            build_site(self.content, self.dest, self.template, workers=2, chunksize=1)
+        )
+
+    def test_build_inline_cache(self):
+        (self.content / "blog" / "other.md").write_text("# Other\n\n- a\n- b")
+        report = build_site(
+            self.content, self.dest, self.template, workers=1, inline_cache_size=16
+        )
+        # "a" and "b" list items repeat in the second post
+        self.assertEqual(report.inline_cache["hits"], 2)
+        self.assertEqual(report.inline_cache["evictions"], 0)
+        self.assertEqual(
+            (self.dest / "blog" / "other.html").read_text(),
+            '<title>Other</title>'
+            '<div><h1 id="other">Other</h1><ul><li>a</li><li>b</li></ul></div>',
+        )
+
+    def test_build_profile(self):
+        report = build_site(
+            self.content, self.dest, self.template, workers=2, profile=True
+        )
+        self.assertEqual(set(report.page_times), {"blog/post.md", "index.md"})
+        stacks = report.page_times["index.md"]
+        self.assertIn("parse;text_to_textnodes", stacks)
+        self.assertIn("render", stacks)
+        self.assertIn("write", stacks)
+
+    def test_build_memory_profile(self):
+        report = build_site(
+            self.content, self.dest, self.template, workers=1, memory_profile=True
+        )
+        self.assertEqual(set(report.page_memory), {"blog/post.md", "index.md"})
+        stages = report.page_memory["index.md"]["stages"]
+        self.assertEqual(
+            set(stages),
+            {"parse_cache", "read", "parse", "render", "template", "write"},
+        )
+        self.assertGreater(stages["parse"]["peak"], 0)
+
+    def test_build_front_matter(self):
+        self.template.write_text("<title>{{ Title }}</title>{{ author }}")
+        (self.content / "index.md").write_text("---\nauthor: me\n---\n# Home")
+        build_site(self.content, self.dest, self.template, workers=1)
+        self.assertEqual(
+            (self.dest / "index.html").read_text(), "<title>Home</title>me"
+        )
+
+    def test_build_streamed(self):
+        self.assert_built(
+            build_site(
+                self.content, self.dest, self.template, workers=1, stream_threshold=0
+            )
+        )
+
+    def test_build_streamed_error_names_page(self):
+        (self.content / "broken.md").write_text("no title here")
+        with self.assertRaisesRegex(RuntimeError, "broken.md"):
+            build_site(
+                self.content, self.dest, self.template, workers=1, stream_threshold=0
+            )
+
+    def test_build_without_profile(self):
+        report = build_site(self.content, self.dest, self.template, workers=1)
+        self.assertEqual(report.page_times, {})
+        self.assertEqual(report.page_memory, {})
+
+    def test_build_error_names_page(self):
+        (self.content / "broken.md").write_text("no title here")
+        with self.assertRaisesRegex(RuntimeError, "broken.md"):
+            build_site(self.content, self.dest, self.template, workers=1)
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.dest = root / "public"
+        self.template = root / "template.html"
+        self.manifest = root / ".build" / "manifest.json"
+        self.ast_cache = root / ".build" / "ast"
+        self.template.write_text(TEMPLATE)
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "post.md").write_text("# Post\n\nText")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, **kwargs):
+        return build_site(
+            self.content,
+            self.dest,
+            self.template,
+            workers=1,
+            manifest_path=self.manifest,
+            ast_cache_dir=self.ast_cache,
+            **kwargs,
+        )
+
+    def test_assets(self):
+        static = Path(self.tmp.name) / "static"
+        (static / "img").mkdir(parents=True)
+        (static / "styles.css").write_text("body {}")
+        (static / "img" / "logo.png").write_bytes(b"png")
+        report = self.build(static_dir=static)
+        self.assertEqual(report.asset_sync.copied, ["img/logo.png", "styles.css"])
+        self.assertEqual((self.dest / "img" / "logo.png").read_bytes(), b"png")
+
+        report = self.build(static_dir=static)
+        self.assertEqual(report.asset_sync.copied, [])
+        self.assertEqual(report.asset_sync.skipped, ["img/logo.png", "styles.css"])
+
+        (static / "img" / "logo.png").unlink()
+        report = self.build(static_dir=static)
+        self.assertEqual(report.deleted_assets, ["img/logo.png"])
+        self.assertFalse((self.dest / "img").exists())
+        self.assertTrue((self.dest / "styles.css").exists())
+
+    def test_fingerprinted_assets(self):
+        static = Path(self.tmp.name) / "static"
+        static.mkdir()
+        (static / "styles.css").write_text("body {}")
+        (static / "logo.png").write_bytes(b"png")
+        self.template.write_text('<link href="/styles.css">{{ Content }}')
+        (self.content / "index.md").write_text("# Home\n\n![logo](/logo.png)")
+        report = self.build(static_dir=static, fingerprint_assets=True)
+        outputs = report.asset_sync.outputs
+        self.assertEqual(
+            json.loads((self.dest / "assets.json").read_text()), outputs
+        )
+        styles, logo = outputs["styles.css"], outputs["logo.png"]
+        self.assertEqual(
+            (self.dest / "index.html").read_text(),
+            f'<link href="/{styles}"><div><h1 id="home">Home</h1>'
+            f'<p><img src="/{logo}" alt="logo" /></p></div>',
+        )
+
+        # a changed asset renders the pages linking to it again
+        (static / "styles.css").write_text("body { color: red }")
+        report = self.build(static_dir=static, fingerprint_assets=True)
+        self.assertEqual(report.deleted_assets, [styles])
+        self.assertEqual(report.rendered, ["blog/post.md", "index.md"])
+        self.assertEqual(report.parse_cache_hits, 2)
+        self.assertFalse((self.dest / styles).exists())
+        self.assertIn(
+            report.asset_sync.outputs["styles.css"],
+            (self.dest / "index.html").read_text(),
+        )
+
+        report = self.build(static_dir=static, fingerprint_assets=True)
+        self.assertEqual(report.rendered, [])
+
+        # without fingerprinting the asset manifest would point to deleted files
+        self.build(static_dir=static)
+        self.assertFalse((self.dest / "assets.json").exists())
+        self.assertTrue((self.dest / "styles.css").exists())
+
+    def test_minify_and_gzip(self):
+        static = Path(self.tmp.name) / "static"
+        static.mkdir()
+        (static / "styles.css").write_text("body {}")
+        (static / "logo.png").write_bytes(b"png")
+        self.template.write_text(
+            "<title>{{ Title }}</title>\n<!-- x -->\n{{ Content }}"
+        )
+        report = self.build(static_dir=static, minify=True, gzip_level=6)
+        self.assertEqual(
+            report.compressed, ["styles.css", "blog/post.html", "index.html"]
+        )
+        html = (self.dest / "index.html").read_bytes()
+        self.assertEqual(
+            html, b'<title>Home</title><div><h1 id="home">Home</h1><p>Welcome</p></div>'
+        )
+        compressed = (self.dest / "index.html.gz").read_bytes()
+        self.assertEqual(gzip.decompress(compressed), html)
+        self.assertFalse((self.dest / "logo.png.gz").exists())
+
+        report = self.build(static_dir=static, minify=True, gzip_level=6)
+        self.assertEqual(report.compressed, [])
+
+        # touched, rendered again to the same output, not compressed again
+        (self.content / "index.md").write_text("# Home\n\nWelcome\n")
+        with mock.patch("postprocess.write_gzip") as write_gzip:
+            report = self.build(static_dir=static, minify=True, gzip_level=6)
+        self.assertEqual(report.rendered, ["index.md"])
+        write_gzip.assert_not_called()
+
+        # a new level compresses the unchanged outputs again without rendering
+        report = self.build(static_dir=static, minify=True, gzip_level=1)
+        self.assertEqual(report.rendered, [])
+        self.assertEqual(
+            report.compressed, ["styles.css", "blog/post.html", "index.html"]
+        )
+
+        (self.dest / "index.html.gz").unlink()
+        report = self.build(static_dir=static, minify=True, gzip_level=1)
+        self.assertEqual(report.compressed, ["index.html"])
+
+        report = self.build(static_dir=static, minify=True)
+        self.assertEqual(report.compressed, [])
+        self.assertEqual(list(self.dest.rglob("*.gz")), [])
+
+    def test_streamed_gzip(self):
+        report = self.build(stream_threshold=0, gzip_level=9)
+        self.assertEqual(report.compressed, ["blog/post.html", "index.html"])
+        self.assertEqual(
+            gzip.decompress((self.dest / "index.html.gz").read_bytes()),
+            (self.dest / "index.html").read_bytes(),
+        )
+
+    def test_heading_index(self):
+        (self.content / "index.md").write_text("# Home\n\n## News\n\n## News")
+        self.template.write_text("{{ Content }}<nav>{{ TOC }}</nav>")
+        self.build(heading_index=True)
+        index = json.loads((self.dest / "headings.json").read_text())
+        self.assertEqual(
+            index["index.html"],
+            [
+                {"level": 1, "text": "Home", "id": "home"},
+                {"level": 2, "text": "News", "id": "news"},
+                {"level": 2, "text": "News", "id": "news-1"},
+            ],
+        )
+        html = (self.dest / "index.html").read_text()
+        self.assertIn('<a href="#news-1">News</a>', html)
+
+        # headings of skipped pages come from the manifest
+        (self.content / "blog" / "post.md").write_text("# Post\n\n## Part")
+        report = self.build(heading_index=True)
+        self.assertEqual(report.rendered, ["blog/post.md"])
+        index2 = json.loads((self.dest / "headings.json").read_text())
+        self.assertEqual(index2["index.html"], index["index.html"])
+        self.assertEqual(index2["blog/post.html"][1]["id"], "part")
+
+        # the index of an earlier build is removed
+        self.build()
+        self.assertFalse((self.dest / "headings.json").exists())
+
+    def test_heading_index_streamed(self):
+        self.build(heading_index=True, stream_threshold=0)
+        index = json.loads((self.dest / "headings.json").read_text())
+        self.assertEqual(
+            index["blog/post.html"], [{"level": 1, "text": "Post", "id": "post"}]
+        )
+
+    def test_streamed_headings_bounded_memory(self):
+        size = 1024 * 1024
+        section = "## Part\n\nSome text here.\n\n"
+        (self.content / "big.md").write_text(
+            "# Big\n\n" + section * (size // len(section))
+        )
+        report = self.build(stream_threshold=0, memory_profile=True)
+        # headings are only kept for the heading index or a {{ TOC }}
+        self.assertLess(report.page_memory["big.md"]["peak"], 4 * 1024 * 1024)
+
+    def test_render_version_renders_all(self):
+        self.build()
+        self.assertEqual(self.build().rendered, [])
+        with mock.patch("build.RENDER_VERSION", build.RENDER_VERSION + 1):
+            self.assertEqual(len(self.build().rendered), 2)
+
+    def test_nested_inline(self):
+        (self.content / "index.md").write_text("# Home\n\n**a _b_** and 2 ** 3")
+        with self.assertRaisesRegex(RuntimeError, "index.md"):
+            self.build()
+        report = self.build(nested_inline=True)
+        self.assertEqual(report.rendered, ["blog/post.md", "index.md"])
+        self.assertIn(
+            "<p><b>a <i>b</i></b> and 2 ** 3</p>",
+            (self.dest / "index.html").read_text(),
+        )
+        # the streamed path renders the same
+        html = (self.dest / "index.html").read_text()
+        self.build(nested_inline=True, stream_threshold=0, force=True)
+        self.assertEqual((self.dest / "index.html").read_text(), html)
+
+    def test_minify_renders_all(self):
+        self.build()
+        self.assertEqual(len(self.build(minify=True).rendered), 2)
+
+    def test_deleted_source_removes_gzip(self):
+        self.build(gzip_level=9)
+        (self.content / "index.md").unlink()
+        self.build(gzip_level=9)
+        self.assertEqual(
+            sorted(path.name for path in self.dest.rglob("*.gz")), ["post.html.gz"]
+        )
+
+    def test_invalid_gzip_level(self):
+        with self.assertRaises(ValueError):
+            self.build(gzip_level=10)
+
+    def test_unchanged_pages_skipped(self):
+        self.assertEqual(len(self.build().rendered), 2)
+        report = self.build()
+        self.assertEqual(report.rendered, [])
+        self.assertEqual(report.skipped, ["blog/post.md", "index.md"])
+
+    def test_changed_source_rendered(self):
+        self.build()
+        (self.content / "index.md").write_text("# Home\n\nChanged")
+        report = self.build()
+        self.assertEqual(report.rendered, ["index.md"])
+        self.assertEqual(report.parse_cache_hits, 0)
+        self.assertIn("Changed", (self.dest / "index.html").read_text())
+
+    def test_changed_template_renders_all(self):
+        self.build()
+        self.template.write_text("<h1>{{ Title }}</h1>{{ Content }}")
+        report = self.build()
+        self.assertEqual(len(report.rendered), 2)
+        self.assertEqual(report.parse_cache_hits, 2)
+        self.assertEqual(
+            (self.dest / "index.html").read_text(),
+            '<h1>Home</h1><div><h1 id="home">Home</h1><p>Welcome</p></div>',
+        )
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        (self.content / "blog" / "post.md").unlink()
+        report = self.build()
+        self.assertEqual(report.deleted, ["blog/post.html"])
+        self.assertFalse((self.dest / "blog").exists())
+        self.assertTrue((self.dest / "index.html").exists())
+
+    def test_missing_output_rendered(self):
+        self.build()
+        (self.dest / "index.html").unlink()
+        self.assertEqual(self.build().rendered, ["index.md"])
+
+    def test_force(self):
+        self.build()
+        self.assertEqual(len(self.build(force=True).rendered), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest import mock
+
+from devserver import (
+    DevRequestHandler,
+    DevSite,
+    PollingWatcher,
+    make_server,
+    page_key,
+)
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+def touch(path: Path, text: str) -> None:
+    """Writes a file and moves its mtime forward, coarse timestamps may not change"""
+    mtime = path.stat().st_mtime_ns if path.exists() else time.time_ns()
+    path.write_text(text)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+class DevSiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.static = root / "public"
+        self.template = root / "template.html"
+        self.template.write_text(TEMPLATE)
+        (self.content / "blog").mkdir(parents=True)
+        self.static.mkdir()
+        (self.static / "styles.css").write_text("body {}")
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "post.md").write_text("# Post\n\n- a\n- b")
+        self.site = DevSite(self.content, self.template)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class TestDevSite(DevSiteTestCase):
+    def test_initial_refresh(self):
+        self.assertEqual(self.site.refresh(), ["blog/post.html", "index.html"])
+        self.assertEqual(
+            self.site.get("index.html").html,
+            b'<title>Home</title><div><h1 id="home">Home</h1><p>Welcome</p></div>',
+        )
+
+    def test_unchanged(self):
+        self.site.refresh()
+        self.assertEqual(self.site.refresh(), [])
+
+    def test_edited_page(self):
+        self.site.refresh()
+        post = self.site.get("blog/post.html")
+        touch(self.content / "index.md", "# Home\n\nEdited")
+        self.assertEqual(self.site.refresh(), ["index.html"])
+        self.assertIn(b"Edited", self.site.get("index.html").html)
+        self.assertIs(self.site.get("blog/post.html"), post)
+
+    def test_edited_template_renders_without_parsing(self):
+        self.site.refresh()
+        parsed = self.site.get("index.html").parsed
+        touch(self.template, "<h1>{{ Title }}</h1>")
+        self.assertEqual(self.site.refresh(), ["blog/post.html", "index.html"])
+        self.assertEqual(self.site.get("index.html").html, b"<h1>Home</h1>")
+        self.assertIs(self.site.get("index.html").parsed, parsed)
+
+    def test_new_and_deleted_pages(self):
+        self.site.refresh()
+        (self.content / "blog" / "post.md").unlink()
+        (self.content / "about.md").write_text("# About")
+        self.assertEqual(self.site.refresh(), ["about.html", "blog/post.html"])
+        self.assertEqual(self.site.outputs(), ["about.html", "index.html"])
+
+    def test_broken_page(self):
+        (self.content / "broken.md").write_text("no title")
+        self.site.refresh()
+        broken = self.site.get("broken.html")
+        self.assertTrue(broken.error)
+        self.assertIn(b"broken.md", broken.html)
+        self.assertFalse(self.site.get("index.html").error)
+
+
+class TestPageKey(unittest.TestCase):
+    def test_page_key(self):
+        self.assertEqual(page_key("/"), "index.html")
+        self.assertEqual(page_key("/blog/"), "blog/index.html")
+        self.assertEqual(page_key("/blog/post"), "blog/post.html")
+        self.assertEqual(page_key("/blog/post.html?x=1#top"), "blog/post.html")
+        self.assertEqual(page_key("/my%20page"), "my page.html")
+        self.assertEqual(page_key("/styles.css"), "styles.css")
+
+
+class TestServer(DevSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.site.refresh()
+        self.server = make_server(self.site, self.static, port=0)
+        # requests are logged to stderr
+        patcher = mock.patch.object(DevRequestHandler, "log_message")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        super().tearDown()
+
+    def get(self, path: str) -> tuple[int, bytes]:
+        try:
+            with urllib.request.urlopen(self.url + path) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def test_page_from_memory(self):
+        status, body = self.get("/")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, self.site.get("index.html").html)
+        self.assertFalse((self.static / "index.html").exists())
+
+    def test_static_file(self):
+        self.assertEqual(self.get("/styles.css"), (200, b"body {}"))
+
+    def test_missing_page(self):
+        self.assertEqual(self.get("/missing")[0], 404)
+
+    def test_broken_page(self):
+        (self.content / "broken.md").write_text("no title")
+        self.site.refresh()
+        status, body = self.get("/broken.html")
+        self.assertEqual(status, 500)
+        self.assertIn(b"no h1 heading", body)
+
+
+class TestPollingWatcher(unittest.TestCase):
+    def test_debounced(self):
+        # the files change on three polls in a row, then settle
+        snapshots = iter([{}, {"a": 1}, {"a": 2}, {"a": 3}])
+        last = {"a": 3}
+        changes = threading.Semaphore(0)
+        calls = []
+
+        def on_change():
+            calls.append(time.monotonic())
+            changes.release()
+
+        watcher = PollingWatcher(
+            lambda: next(snapshots, last), on_change, interval=0.01, debounce=0.01
+        )
+        watcher.start()
+        try:
+            self.assertTrue(changes.acquire(timeout=5))
+            time.sleep(0.1)
+        finally:
+            watcher.stop()
+            watcher.join()
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
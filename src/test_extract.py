@@ -1,7 +1,34 @@
+import time
 import unittest
 
+import extract
 from constants import EXAMPLES_LINKS
 from extract import extract_markdown_images, extract_markdown_links
+from textnode import (
+    TextNode,
+    TextType,
+    split_nodes_image,
+    split_nodes_link,
+    tokenize_inline,
+)
+
+# seconds any extraction may take on a worst case input of WORST_CASE_SIZE,
+# scanners rescanning the rest of the text per "[" take minutes
+TIME_BUDGET = 1.0
+WORST_CASE_SIZE = 200_000
+# inputs making backtracking regexes rescan the text, built from a unit
+WORST_CASE_UNITS = {
+    "open_brackets": "[",
+    "image_openers": "![",
+    "close_open": "](",
+    "unclosed_links": "[a](",
+    "unclosed_images": "![a](b",
+    "open_parens": "[a](b(",
+    "brackets_in_labels": "[a[",
+    "empty_labels": "[](",
+    "nested": "[[]]((",
+    "fences": "a\n```[a](b)\n",
+}
 
 
 class TestExtractMarkdownImages(unittest.TestCase):
@@ -53,5 +80,140 @@ class TestExtractMarkdownLinks(unittest.TestCase):
         self.assertEqual(matches, expected_matches)
 
 
+class TestSpans(unittest.TestCase):
+    def test_iter_spans(self):
+        text = "a ![i](x.png) [l](y) [no](a(b) [x]"
+        self.assertEqual(
+            list(extract.iter_spans(text)),
+            [(2, 13, "image", "i", "x.png"), (14, 20, "link", "l", "y")],
+        )
+
+    def test_url_holding_a_link(self):
+        self.assertEqual(extract_markdown_links("[a](x[b](y)"), [("b", "y")])
+        self.assertEqual(extract_markdown_images("![a](x[b])"), [("a", "x[b]")])
+
+    def test_overlapping_image_and_link(self):
+        # the link lies inside the url of an image, the separate scans find both
+        text = "![)((![]([[a)(]()"
+        self.assertEqual(extract_markdown_links(text), [("a)(", "")])
+        self.assertEqual(extract_markdown_images(text), [("", "[[a")])
+        self.assertEqual(
+            [span[2] for span in extract.iter_spans(text)], [extract.IMAGE]
+        )
+        self.assertEqual(
+            split_nodes_link([TextNode("]![]([)]([)(!)[[)([", TextType.NORMAL)]),
+            [
+                TextNode("]![](", TextType.NORMAL),
+                TextNode(")", TextType.LINK, "["),
+                TextNode("(!)[[)([", TextType.NORMAL),
+            ],
+        )
+
+    def test_iter_link_syntax(self):
+        text = "[a[b](u) [](v) [c](d(e) [f]()"
+        self.assertEqual(
+            [text[start:end] for start, end in extract.iter_link_syntax(text)],
+            ["[a[b](u)", "[c](d(e)"],
+        )
+
+    def test_split_nodes_link_without_link(self):
+        with self.assertRaises(ValueError):
+            split_nodes_link([TextNode("[a](b(c)", TextType.NORMAL)])
+
+    def test_split_nodes_link_label_after_last_bracket(self):
+        self.assertEqual(
+            split_nodes_link([TextNode("x [a[b](u) y", TextType.NORMAL)]),
+            [
+                TextNode("x ", TextType.NORMAL),
+                TextNode("b", TextType.LINK, "u"),
+                TextNode(" y", TextType.NORMAL),
+            ],
+        )
+
+
+DOCUMENT = """# [Home](/index.html)
+
+See ![logo](/logo.png) and [docs](/docs/).
+
+```
+[not a link](/code)
+```
+text ```[inline](/fence) is not a fence
+
+  ```
+[indented](/fence)
+```
+[after](/after)
+"""
+
+
+class TestSpanIndex(unittest.TestCase):
+    def test_index(self):
+        index = extract.SpanIndex(DOCUMENT)
+        self.assertEqual(
+            [(kind, label, url) for _, _, kind, label, url in index],
+            [
+                ("link", "Home", "/index.html"),
+                ("image", "logo", "/logo.png"),
+                ("link", "docs", "/docs/"),
+                ("link", "inline", "/fence"),
+                ("link", "after", "/after"),
+            ],
+        )
+        for start, end, _, label, url in index:
+            self.assertTrue(DOCUMENT[start:end].endswith(f"[{label}]({url})"))
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index[1][2], extract.IMAGE)
+
+    def test_same_as_iter_spans_without_skipping_code(self):
+        self.assertEqual(
+            list(extract.SpanIndex(DOCUMENT, skip_code=False)),
+            list(extract.iter_spans(DOCUMENT)),
+        )
+
+    def test_unclosed_fence(self):
+        self.assertEqual(len(extract.SpanIndex("[a](b)\n\n```\n[c](d)")), 1)
+        self.assertEqual(len(extract.SpanIndex("```\n[c](d)\n```\n[e](f)")), 1)
+        self.assertEqual(len(extract.SpanIndex("")), 0)
+
+    def test_lookups(self):
+        index = extract.SpanIndex(DOCUMENT)
+        start = DOCUMENT.index("![logo]")
+        self.assertEqual(index.at(start)[3], "logo")
+        self.assertIsNone(index.at(start + 1))
+        self.assertEqual(
+            [span[3] for span in index.between(0, DOCUMENT.index("```"))],
+            ["Home", "logo", "docs"],
+        )
+        self.assertEqual([span[3] for span in index.spans(extract.IMAGE)], ["logo"])
+        self.assertEqual(len(list(index.spans(extract.LINK))), 4)
+
+
+class TestWorstCase(unittest.TestCase):
+    """Fails when an extraction takes more than TIME_BUDGET on a worst case input"""
+
+    EXTRACTIONS = {
+        "extract_markdown_images": extract_markdown_images,
+        "extract_markdown_links": extract_markdown_links,
+        "split_nodes_image": lambda text: split_nodes_image(
+            [TextNode(text, TextType.NORMAL)]
+        ),
+        "split_nodes_link": lambda text: split_nodes_link(
+            [TextNode(text, TextType.NORMAL)]
+        ),
+        "tokenize_inline": lambda text: tokenize_inline(text, compat=False),
+        "SpanIndex": extract.SpanIndex,
+    }
+
+    def test_time_budget(self):
+        for name, unit in WORST_CASE_UNITS.items():
+            text = unit * (WORST_CASE_SIZE // len(unit))
+            for extraction, function in self.EXTRACTIONS.items():
+                with self.subTest(input=name, extraction=extraction):
+                    start = time.perf_counter()
+                    function(text)
+                    self.assertLess(time.perf_counter() - start, TIME_BUDGET)
+
+
 if __name__ == "__main__":
     unittest.main()
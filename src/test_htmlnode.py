@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, serialize_props
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -35,9 +36,52 @@ class TestHTMLNode(unittest.TestCase):
         props = ' class="container" id="new-id"'
         self.assertEqual(self.node.props_to_html(), props)
 
+    def test_props_to_html_escaping(self):
+        node = HTMLNode(
+            tag="a", props={"href": "/search?q=a&b=<c>", "title": "\"it's\""}
+        )
+        self.assertEqual(
+            node.props_to_html(),
+            ' href="/search?q=a&amp;b=&lt;c&gt;" title="&quot;it&#x27;s&quot;"',
+        )
+
+    def test_props_to_html_empty(self):
+        self.assertEqual(self.node_empy.props_to_html(), "")
+
+    def test_props_to_html_cached(self):
+        props = {"href": "https://cache.example.com"}
+        HTMLNode(tag="a", props=props).props_to_html()
+        hits = serialize_props.cache_info().hits
+        HTMLNode(tag="a", props=dict(props)).props_to_html()
+        self.assertEqual(serialize_props.cache_info().hits, hits + 1)
+
+    def test_props_to_html_equal_values_of_other_types(self):
+        for values in ((True, 1), (1.0, 1), (1, True)):
+            for value in values:
+                node = HTMLNode(tag="input", props={"checked": value})
+                self.assertEqual(node.props_to_html(), f' checked="{value}"')
+
+    def test_props_to_html_unhashable(self):
+        node = HTMLNode(tag="div", props={"class": ["a", "b"]})
+        self.assertEqual(node.props_to_html(), ' class="[&#x27;a&#x27;, &#x27;b&#x27;]"')
+
     def test_to_html(self):
         self.assertRaises(NotImplementedError, self.node.to_html)
 
+    def test_slots(self):
+        for node in (self.node, LeafNode("b", "bold"), ParentNode("p", [self.node])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_shared_empty_children(self):
+        self.assertIs(self.node.children, self.node_empy.children)
+        with self.assertRaises(TypeError):
+            self.node.children.append(self.node_empy)
+        self.assertEqual(self.node_empy.children, [])
+
+    def test_interned_tag(self):
+        tag = "".join(["s", "pan"])
+        self.assertIs(HTMLNode(tag=tag).tag, HTMLNode(tag="span").tag)
+
 
 class TestLeafNode(unittest.TestCase):
     def setUp(self):
@@ -62,6 +106,10 @@ class TestLeafNode(unittest.TestCase):
         self.leaf_node.tag = None
         self.assertEqual(self.leaf_node.to_html(), "Click me!")
 
+    def test_to_html_void_tag(self):
+        node = LeafNode("img", None, {"src": "image.png", "alt": "An image"})
+        self.assertEqual(node.to_html(), '<img src="image.png" alt="An image" />')
+
     def test_to_html_no_value(self):
         self.leaf_node.value = None
         with self.assertRaises(ValueError):
@@ -137,5 +185,51 @@ class TestParentNode(unittest.TestCase):
         )
 
 
+class TestStreamingHTML(unittest.TestCase):
+    def setUp(self):
+        self.tree = ParentNode(
+            "div",
+            [
+                LeafNode("a", "link", {"href": "https://www.google.com"}),
+                ParentNode("p", [LeafNode(None, "text "), LeafNode("b", "bold")]),
+            ],
+            {"class": "container"},
+        )
+        self.expected = (
+            '<div class="container"><a href="https://www.google.com">link</a>'
+            "<p>text <b>bold</b></p></div>"
+        )
+
+    def test_iter_html(self):
+        self.assertEqual("".join(self.tree.iter_html()), self.expected)
+
+    def test_iter_html_leaf(self):
+        self.assertEqual(list(LeafNode("b", "bold").iter_html()), ["<b>bold</b>"])
+
+    def test_iter_html_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            list(HTMLNode(tag="p").iter_html())
+
+    def test_iter_html_invalid_child(self):
+        tree = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            list(tree.iter_html())
+
+    def test_write_to(self):
+        output = io.StringIO()
+        written = self.tree.write_to(output, buffer_size=8)
+        self.assertEqual(output.getvalue(), self.expected)
+        self.assertEqual(written, len(self.expected))
+
+    def test_deep_tree(self):
+        depth = 50_000
+        tree = LeafNode("b", "deep")
+        for _ in range(depth):
+            tree = ParentNode("span", [tree])
+        html = tree.to_html()
+        self.assertTrue(html.startswith("<span>" * depth + "<b>deep</b>"))
+        self.assertEqual(len(html), depth * len("<span></span>") + len("<b>deep</b>"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import htmlnode
+import textnode
+from benchmarks.corpus import generate_document
+from blocknode import markdown_to_blocks
+from inline import parse_inline
+
+
+def render(text: str, urls=None) -> str:
+    return "".join(node.to_html() for node in parse_inline(text, urls))
+
+
+class TestParseInline(unittest.TestCase):
+    def test_plain(self):
+        nodes = parse_inline("just text")
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual((nodes[0].tag, nodes[0].value), (None, "just text"))
+        self.assertEqual(parse_inline(""), [])
+
+    def test_flat(self):
+        self.assertEqual(
+            render("_a_ **b** `c` [l](u) ![x](s)"),
+            "<i>a</i> <b>b</b> <code>c</code> "
+            '<a href="u">l</a> <img src="s" alt="x" />',
+        )
+
+    def test_nested(self):
+        (bold,) = parse_inline("**bold _and italic_**")
+        self.assertIsInstance(bold, htmlnode.ParentNode)
+        self.assertEqual(bold.tag, "b")
+        self.assertEqual(
+            [(child.tag, child.value) for child in bold.children],
+            [(None, "bold "), ("i", "and italic")],
+        )
+        self.assertEqual(
+            render("_a **b `c`** [l](u)_"),
+            '<i>a <b>b <code>c</code></b> <a href="u">l</a></i>',
+        )
+
+    def test_crossed(self):
+        # the closer pops its opener, the "_" opened in between stays text
+        self.assertEqual(render("**a _b** c_"), "<b>a _b</b> c_")
+
+    def test_unmatched_kept(self):
+        self.assertEqual(render("_open **open `tick"), "_open **open `tick")
+        self.assertEqual(render("a_ b** ****"), "a_ b** ****")
+
+    def test_flanking(self):
+        self.assertEqual(render("** not bold **"), "** not bold **")
+        self.assertEqual(render("snake_case_name"), "snake_case_name")
+        self.assertEqual(render("x**y**z"), "x<b>y</b>z")
+
+    def test_code_spans(self):
+        self.assertEqual(render("``a ` _b_``"), "<code>a ` _b_</code>")
+        self.assertEqual(render("` `` x"), "` `` x")
+        self.assertEqual(render("**`a**`**"), "<b><code>a**</code></b>")
+
+    def test_urls(self):
+        urls = {"/a.png": "/a.1.png", "/b": "/c"}
+        self.assertEqual(
+            render("![a](/a.png) [b](/b) [d](/d)", urls),
+            '<img src="/a.1.png" alt="a" /> <a href="/c">b</a> <a href="/d">d</a>',
+        )
+
+    def test_empty_label(self):
+        # like text_to_textnodes, a link without a label stays text
+        self.assertEqual(render("[](u)"), "[](u)")
+        self.assertEqual(render("a [](u) [l](v)"), 'a [](u) <a href="v">l</a>')
+        self.assertEqual(render("![](s)"), '<img src="s" alt="" />')
+
+    def test_deep_nesting(self):
+        depth = 5000
+        html = render("**a _b " * depth + "c_ d** " * depth)
+        self.assertEqual(html.count("<b>"), depth)
+        self.assertEqual(html.count("<i>"), depth)
+
+    def test_same_as_text_to_children_on_corpus(self):
+        # balanced markup without nesting renders like the flat parser
+        document = generate_document(64 * 1024, seed=2, inline_density=0.5)
+        for block in markdown_to_blocks(document):
+            if block.startswith(("```", "#", "-", ">", "1.")):
+                continue
+            text = " ".join(block.split("\n"))
+            expected = textnode.textnodes_to_html(textnode.text_to_textnodes(text))
+            self.assertEqual(render(text), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
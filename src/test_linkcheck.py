@@ -0,0 +1,189 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import linkcheck
+from build import build_site
+from linkcheck import AllowList, BrokenLink, build_index, check_links, check_url
+
+TEMPLATE = '<title>{{ Title }}</title><main id="main">{{ Content }}</main>'
+INDEX = {
+    "index.html": frozenset({"main"}),
+    "blog/index.html": frozenset(),
+    "blog/post.html": frozenset({"main", "intro"}),
+    "styles.css": frozenset(),
+}
+MISSING = "no such page or file"
+
+
+class TestCheckUrl(unittest.TestCase):
+    def check(self, url, page="blog/post.html", external=None):
+        return check_url(url, page, INDEX, external)
+
+    def test_found(self):
+        for url in (
+            "/index.html",
+            "../index.html",
+            "post.html#intro",
+            "#main",
+            "/blog/post",
+            "/blog/",
+            "/blog",
+            "./",
+            "/",
+            "/styles.css?v=1",
+            "mailto:someone@example.com",
+            "https://example.com/",
+        ):
+            self.assertIsNone(self.check(url), url)
+
+    def test_broken(self):
+        self.assertEqual(self.check("/missing.html"), "no such page or file")
+        self.assertEqual(self.check("other.html"), "no such page or file")
+        self.assertEqual(self.check("/index.html#top"), "no anchor #top in index.html")
+        self.assertEqual(self.check("#top"), "no anchor #top in blog/post.html")
+        self.assertEqual(self.check("../../index.html"), "points outside the site")
+
+    def test_external(self):
+        allow = AllowList(["*.example.com", "https://docs.python.org/3/"])
+        self.assertIsNone(self.check("https://www.example.com/a", external=allow))
+        self.assertIsNone(self.check("https://docs.python.org/3/x", external=allow))
+        self.assertEqual(
+            self.check("https://docs.python.org/2/", external=allow),
+            "external URL not allowed",
+        )
+        self.assertEqual(
+            self.check("//example.com/a", external=lambda url: False),
+            "external URL not allowed",
+        )
+
+    def test_allow_list_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "allow.txt"
+            path.write_text("# hosts\nexample.org\n\nhttps://a.test/x/\n")
+            allow = AllowList.load(path)
+        self.assertEqual(allow.hosts, ("example.org",))
+        self.assertEqual(allow.prefixes, ("https://a.test/x/",))
+
+
+class TestCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.dest = root / "public"
+        self.static = root / "static"
+        self.template = root / "template.html"
+        self.template.write_text(TEMPLATE)
+        (self.content / "blog").mkdir(parents=True)
+        self.static.mkdir()
+        (self.static / "logo.png").write_bytes(b"png")
+        (self.content / "index.md").write_text(
+            "# Home\n\n[post](blog/post.html) ![logo](/logo.png)\n\n"
+            "[gone](/gone.html) and [ext](https://example.com)\n\n"
+            "```\n[in code](/nowhere)\n```\n\n"
+            "[anchor](/blog/post.html#main) [bad anchor](#nope)"
+        )
+        (self.content / "blog" / "post.md").write_text(
+            "# Post\n\n![missing](missing.png)"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, **kwargs):
+        build_site(
+            self.content,
+            self.dest,
+            self.template,
+            workers=1,
+            static_dir=self.static,
+            **kwargs,
+        )
+
+    def test_check_links(self):
+        self.build()
+        for workers in (1, 2):
+            report = check_links(self.content, self.dest, workers=workers)
+            self.assertEqual(report.pages, 2)
+            self.assertEqual(report.checked, 6)
+            self.assertEqual(report.external_unchecked, 1)
+            self.assertEqual(
+                report.broken,
+                [
+                    BrokenLink("blog/post.md", 3, "image", "missing.png", MISSING),
+                    BrokenLink("index.md", 5, "link", "/gone.html", MISSING),
+                    BrokenLink(
+                        "index.md", 11, "link", "#nope", "no anchor #nope in index.html"
+                    ),
+                ],
+            )
+            self.assertFalse(report.ok)
+
+    def test_external_check(self):
+        self.build()
+        report = check_links(
+            self.content, self.dest, workers=1, external=AllowList(["example.com"])
+        )
+        self.assertEqual(report.checked, 7)
+        self.assertEqual(report.external_unchecked, 0)
+        self.assertEqual(len(report.broken), 3)
+
+    def test_code_spans_not_checked(self):
+        (self.content / "blog" / "post.md").write_text(
+            "# Post\n\nWrite links as `[text](page.html)`\n\n"
+            "```\n[x](gone.html)\n```\n\n"
+            "`[a](gone.html)` and [a](gone.html)"
+        )
+        self.build()
+        report = check_links(self.content, self.dest, workers=1)
+        post = [link for link in report.broken if link.source == "blog/post.md"]
+        self.assertEqual(
+            post, [BrokenLink("blog/post.md", 9, "link", "gone.html", MISSING)]
+        )
+
+    def test_nested_inline(self):
+        (self.content / "blog" / "post.md").write_text(
+            "# Post\n\n**see _[a](gone.html)_** and 2 ** 3"
+        )
+        self.build(nested_inline=True)
+        report = check_links(self.content, self.dest, workers=1, nested_inline=True)
+        post = [link for link in report.broken if link.source == "blog/post.md"]
+        self.assertEqual(
+            post, [BrokenLink("blog/post.md", 3, "link", "gone.html", MISSING)]
+        )
+
+    def test_heading_anchors(self):
+        (self.content / "blog" / "post.md").write_text(
+            "# Post\n\n## Part one\n\n## Part one\n\n"
+            "[first](#part-one) [second](#part-one-1) [home](/index.html#home)"
+        )
+        self.build()
+        report = check_links(self.content, self.dest, workers=1)
+        self.assertNotIn("blog/post.md", [link.source for link in report.broken])
+
+    def test_fingerprinted_assets(self):
+        self.build(fingerprint_assets=True)
+        index = build_index(self.dest, workers=1)
+        self.assertIn("logo.png", index)
+        self.assertFalse((self.dest / "logo.png").exists())
+        report = check_links(self.content, self.dest, workers=1)
+        self.assertNotIn("/logo.png", [link.url for link in report.broken])
+
+    def test_write_report(self):
+        self.build()
+        report = check_links(self.content, self.dest, workers=1)
+        path = Path(self.tmp.name) / "reports" / "links.json"
+        linkcheck.write_report(report, path)
+        data = json.loads(path.read_text())
+        self.assertEqual(data["version"], linkcheck.REPORT_VERSION)
+        self.assertEqual(data["broken"][0]["source"], "blog/post.md")
+        self.assertEqual(
+            report.format_broken().splitlines()[0],
+            "blog/post.md:3: image missing.png: no such page or file",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
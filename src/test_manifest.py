@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from manifest import BuildManifest, file_hash, text_hash
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.path = self.root / "manifest.json"
+        self.source = self.root / "page.md"
+        self.source.write_text("# Page")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hashes(self):
+        self.assertEqual(file_hash(self.source), text_hash("# Page"))
+
+    def test_round_trip(self):
+        manifest = BuildManifest(self.path)
+        stat = self.source.stat()
+        manifest.record("page.md", stat, "abc", "def", "page.html")
+        manifest.save()
+        loaded = BuildManifest.load(self.path)
+        self.assertTrue(loaded.is_fresh("page.md", "abc", "def", "page.html"))
+        self.assertFalse(loaded.is_fresh("page.md", "abc", "xyz", "page.html"))
+        self.assertFalse(loaded.is_fresh("other.md", "abc", "def", "page.html"))
+
+    def test_source_hash_reused_when_stat_matches(self):
+        manifest = BuildManifest()
+        stat = self.source.stat()
+        manifest.record("page.md", stat, "recorded", "def", "page.html")
+        self.assertEqual(manifest.source_hash("page.md", self.source, stat), "recorded")
+        self.assertEqual(
+            manifest.source_hash("new.md", self.source, stat), text_hash("# Page")
+        )
+
+    def test_load_corrupt(self):
+        self.path.write_text("{not json")
+        self.assertEqual(BuildManifest.load(self.path).pages, {})
+
+    def test_load_missing(self):
+        self.assertEqual(BuildManifest.load(self.root / "missing.json").pages, {})
+
+    def test_remove_missing(self):
+        manifest = BuildManifest()
+        stat = self.source.stat()
+        manifest.record("a.md", stat, "1", "t", "a.html")
+        manifest.record("b.md", stat, "2", "t", "b.html")
+        self.assertEqual(manifest.remove_missing({"a.md"}), ["b.html"])
+        self.assertEqual(list(manifest.pages), ["a.md"])
+
+    def test_written_output(self):
+        manifest = BuildManifest(self.path)
+        stat = self.source.stat()
+        manifest.record("a.md", stat, "1", "t", "a.html", "out", 9)
+        manifest.record("b.md", stat, "2", "t", "b.html")
+        manifest.record_gzip_level("b.md", 6)
+        manifest.save()
+        loaded = BuildManifest.load(self.path)
+        self.assertEqual(loaded.written_output("a.md"), ("out", 9))
+        self.assertEqual(loaded.written_output("b.md"), (None, 6))
+        self.assertEqual(loaded.written_output("new.md"), (None, None))
+
+    def test_headings(self):
+        manifest = BuildManifest(self.path)
+        stat = self.source.stat()
+        headings = [(1, "Title", "title"), (2, "Part", "part")]
+        manifest.record("a.md", stat, "1", "t", "a.html", headings=headings)
+        manifest.record("b.md", stat, "2", "t", "b.html")
+        manifest.save()
+        loaded = BuildManifest.load(self.path)
+        self.assertEqual(loaded.headings("a.md"), headings)
+        self.assertIsNone(loaded.headings("b.md"))
+        self.assertIsNone(loaded.headings("new.md"))
+
+    def test_assets(self):
+        manifest = BuildManifest(self.path)
+        stat = self.source.stat()
+        manifest.record_asset("styles.css", stat, "abc", "styles.css")
+        manifest.record_asset("old.png", stat, "def", "old.def.png")
+        manifest.save()
+        loaded = BuildManifest.load(self.path)
+        self.assertTrue(loaded.asset_is_fresh("styles.css", "abc", "styles.css"))
+        self.assertFalse(loaded.asset_is_fresh("styles.css", "xyz", "styles.css"))
+        self.assertFalse(loaded.asset_is_fresh("styles.css", "abc", "styles.a.css"))
+        self.assertEqual(loaded.asset_hash("styles.css", self.source, stat), "abc")
+        self.assertEqual(loaded.remove_missing_assets({"styles.css"}), ["old.def.png"])
+        self.assertEqual(list(loaded.assets), ["styles.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
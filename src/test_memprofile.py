@@ -0,0 +1,90 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import memprofile
+
+MB = 1024 * 1024
+
+
+class TestMeasure(unittest.TestCase):
+    def setUp(self):
+        memprofile.enable()
+
+    def tearDown(self):
+        memprofile.enable(False)
+
+    def test_disabled(self):
+        memprofile.enable(False)
+        memprofile.start_page()
+        with memprofile.measure("stage"):
+            pass
+        self.assertIsNone(memprofile.finish_page())
+
+    def test_retained_and_peak(self):
+        memprofile.start_page()
+        with memprofile.measure("kept"):
+            kept = bytearray(2 * MB)
+        with memprofile.measure("temporary"):
+            temporary = bytearray(4 * MB)
+            del temporary
+        measurements = memprofile.finish_page()
+        stages = measurements["stages"]
+        self.assertGreaterEqual(stages["kept"]["retained"], 2 * MB)
+        self.assertGreaterEqual(stages["temporary"]["peak"], 4 * MB)
+        self.assertLess(stages["temporary"]["retained"], MB)
+        self.assertGreaterEqual(measurements["peak"], 6 * MB)
+        self.assertGreaterEqual(measurements["retained"], 2 * MB)
+        del kept
+
+    def test_pages_are_separate(self):
+        memprofile.start_page()
+        with memprofile.measure("first"):
+            pass
+        memprofile.finish_page()
+        memprofile.start_page()
+        self.assertEqual(memprofile.finish_page()["stages"], {})
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.page_memory = {
+            "small.md": {
+                "peak": 100,
+                "retained": 50,
+                "stages": {"parse": {"peak": 100, "retained": 50}},
+            },
+            "large.md": {
+                "peak": 1000,
+                "retained": 10,
+                "stages": {
+                    "parse": {"peak": 400, "retained": 5},
+                    "render": {"peak": 1000, "retained": 5},
+                },
+            },
+        }
+
+    def test_build_report(self):
+        report = memprofile.build_report(self.page_memory, top=1)
+        self.assertEqual(list(report["stages"]), ["render", "parse"])
+        self.assertEqual(
+            report["stages"]["parse"],
+            {"max_peak": 400, "max_retained": 50, "total_retained": 55},
+        )
+        self.assertEqual(
+            [page["source"] for page in report["highest_peak"]], ["large.md"]
+        )
+        self.assertEqual(
+            [page["source"] for page in report["most_retained"]], ["small.md"]
+        )
+
+    def test_write_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "memory.json"
+            memprofile.write_report(memprofile.build_report(self.page_memory), path)
+            self.assertEqual(json.loads(path.read_text())["pages"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,363 @@
+import io
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from benchmarks.corpus import CorpusGenerator
+from page import (
+    extract_title,
+    markdown_to_html_node,
+    parse_markdown,
+    parsed_to_html_node,
+    render_blocks,
+    parse_page,
+    render_page,
+    render_parsed,
+    split_front_matter,
+    stream_page,
+)
+from inline import parse_inline
+from toc import Headings
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+# lines of a repeated section used to generate large inputs lazily
+SECTION = [
+    "## Section with a [link](https://boot.dev)",
+    "",
+    "A paragraph with **bold** and _italic_ text that keeps going for a while.",
+    "And a second line of the same paragraph with some `code` in it.",
+    "",
+    "- first item",
+    "- second item",
+    "",
+]
+SECTION_SIZE = sum(len(line) + 1 for line in SECTION)
+
+
+def generated_lines(size: int):
+    """Yields a page of about size characters without ever holding it whole"""
+    yield "# Generated"
+    yield ""
+    for _ in range(size // SECTION_SIZE):
+        yield from SECTION
+
+
+class CountingWriter(io.TextIOBase):
+    """Text sink keeping only the number of written characters"""
+
+    def __init__(self):
+        self.written = 0
+
+    def write(self, text):
+        self.written += len(text)
+        return len(text)
+
+
+class TestMarkdownToHTMLNode(unittest.TestCase):
+    def test_paragraphs(self):
+        md = """
+This is **bolded** paragraph
+text in a p
+tag here
+
+This is another paragraph with _italic_ text and `code` here
+
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p>"
+            "<p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    def test_codeblock(self):
+        md = """
+```
+This is text that _should_ remain
+the **same** even with <inline> stuff
+
+```
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>This is text that _should_ remain\n"
+            "the **same** even with &lt;inline&gt; stuff\n\n</code></pre></div>",
+        )
+
+    def test_heading_and_quote(self):
+        md = "## A [link](https://boot.dev)\n\n> a quote\n> on two lines"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><h2 id="a-link">A <a href="https://boot.dev">link</a></h2>'
+            "<blockquote>a quote on two lines</blockquote></div>",
+        )
+
+    def test_lists(self):
+        md = "- one\n- **two**\n\n1. first\n2. ![img](a.png)"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>one</li><li><b>two</b></li></ul>"
+            '<ol><li>first</li><li><img src="a.png" alt="img" /></li></ol></div>',
+        )
+
+
+class TestRenderBlocks(unittest.TestCase):
+    def assert_same_as_tree(self, markdown):
+        blocks = parse_markdown(markdown)
+        self.assertEqual(render_blocks(blocks), parsed_to_html_node(blocks).to_html())
+
+    def test_every_block_type(self):
+        self.assert_same_as_tree(
+            "# Title\n\n## Sub **bold**\n\n```\n<code>\n```\n\n> a _quote_\n\n"
+            "- [link](https://boot.dev)\n- ![img](a.png)\n\n1. one\n2. `two`\n\n"
+            "plain paragraph"
+        )
+
+    def test_empty_blocks_skipped(self):
+        self.assert_same_as_tree("# \n\n****\n\n- ****\n- a\n\n- ****\n\n> ")
+        self.assertEqual(render_blocks(parse_markdown("****")), "<div></div>")
+
+    def test_generated_corpus(self):
+        for seed in range(5):
+            self.assert_same_as_tree(CorpusGenerator(seed).document(16 * 1024))
+
+
+class TestExtractTitle(unittest.TestCase):
+    def test_title(self):
+        self.assertEqual(extract_title("intro\n\n# Hello  \n\n## Sub"), "Hello")
+
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            extract_title("## Only a subheading")
+
+    def test_code_comment_is_not_title(self):
+        markdown = "```\n# install deps\npip install x\n```\n\n# Setup\n\nText"
+        self.assertEqual(extract_title(markdown), "Setup")
+        self.assertEqual(parse_page(markdown)[0], "Setup")
+        out = io.StringIO()
+        stream_page(io.StringIO(markdown), out, TEMPLATE)
+        self.assertEqual(out.getvalue(), render_page(markdown, TEMPLATE))
+        self.assertTrue(out.getvalue().startswith("<title>Setup</title>"))
+
+
+class TestRenderPage(unittest.TestCase):
+    def test_render_page(self):
+        self.assertEqual(
+            render_page("# Hello\n\nWorld", TEMPLATE),
+            '<title>Hello</title><main>'
+            '<div><h1 id="hello">Hello</h1><p>World</p></div></main>',
+        )
+
+
+class TestFrontMatter(unittest.TestCase):
+    markdown = "---\nauthor: Jane: Doe\n\ndate:2024-01-01\n---\n# Title\n\nText"
+
+    def test_split(self):
+        self.assertEqual(
+            split_front_matter(self.markdown),
+            ({"author": "Jane: Doe", "date": "2024-01-01"}, "# Title\n\nText"),
+        )
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title"), ({}, "# Title"))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a field\n---\n# Title")
+
+    def test_not_closed(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nauthor: me\n# Title")
+
+    def test_parse_page(self):
+        title, fields, blocks, headings = parse_page(self.markdown)
+        self.assertEqual(title, "Title")
+        self.assertEqual(fields["author"], "Jane: Doe")
+        self.assertEqual(len(blocks), 2)
+        self.assertEqual(headings, [(1, "Title", "title")])
+
+    def test_fields_in_template(self):
+        template = "<title>{{ Title }}</title>{{ author }}|{{ Content }}"
+        self.assertEqual(
+            render_page(self.markdown, template),
+            '<title>Title</title>Jane: Doe|'
+            '<div><h1 id="title">Title</h1><p>Text</p></div>',
+        )
+
+    def test_title_not_overridden(self):
+        markdown = "---\nTitle: other\n---\n# Title"
+        self.assertEqual(render_page(markdown, "{{ Title }}"), "Title")
+
+
+class TestHeadings(unittest.TestCase):
+    markdown = "# Title\n\n## Setup\n\ntext\n\n### **Bold** step\n\n## Setup"
+
+    def test_collected_while_parsing(self):
+        _, _, blocks, headings = parse_page(self.markdown)
+        self.assertEqual(
+            headings,
+            [
+                (1, "Title", "title"),
+                (2, "Setup", "setup"),
+                (3, "Bold step", "bold-step"),
+                (2, "Setup", "setup-1"),
+            ],
+        )
+        self.assertEqual(blocks[-1][1][2], "setup-1")
+
+    def test_ids_rendered(self):
+        html = markdown_to_html_node(self.markdown).to_html()
+        self.assertIn('<h3 id="bold-step"><b>Bold</b> step</h3>', html)
+        self.assertIn('<h2 id="setup-1">Setup</h2>', html)
+        self.assertEqual(render_blocks(parse_markdown(self.markdown)), html)
+
+    def test_toc_placeholder(self):
+        html = render_page(self.markdown, "<nav>{{ TOC }}</nav>")
+        self.assertEqual(
+            html,
+            '<nav><ul><li><a href="#setup">Setup</a>'
+            '<ul><li><a href="#bold-step">Bold step</a></li></ul></li>'
+            '<li><a href="#setup-1">Setup</a></li></ul></nav>',
+        )
+
+
+class TestNestedInline(unittest.TestCase):
+    markdown = "# Title **x**\n\n**bold _and italic_** and a ** b\n\n## See ![a](i.png)"
+
+    def test_render(self):
+        _, _, blocks, headings = parse_page(self.markdown, parse_inline)
+        html = render_blocks(blocks)
+        self.assertEqual(
+            html,
+            '<div><h1 id="title-x">Title <b>x</b></h1>'
+            "<p><b>bold <i>and italic</i></b> and a ** b</p>"
+            '<h2 id="see-a">See <img src="i.png" alt="a" /></h2></div>',
+        )
+        self.assertEqual(parsed_to_html_node(blocks).to_html(), html)
+        self.assertEqual(headings[1], (2, "See a", "see-a"))
+
+    def test_stream(self):
+        out = io.StringIO()
+        source = io.StringIO(self.markdown)
+        stream_page(source, out, TEMPLATE, parse_inline=parse_inline)
+        parsed = parse_page(self.markdown, parse_inline)
+        self.assertEqual(out.getvalue(), render_parsed(parsed, TEMPLATE))
+
+
+class TestStreamPage(unittest.TestCase):
+    markdown = (
+        "Intro before the title\n\n# Hello **world**\n\n"
+        "```\ncode\n\nblock\n```\n\n> quote\n\n1. one\n2. two\n"
+    )
+
+    def test_same_as_render_page(self):
+        out = io.StringIO()
+        stream_page(io.StringIO(self.markdown), out, TEMPLATE)
+        self.assertEqual(out.getvalue(), render_page(self.markdown, TEMPLATE))
+
+    def test_binary_source(self):
+        out = io.StringIO()
+        stream_page(io.BytesIO(self.markdown.encode()), out, TEMPLATE)
+        self.assertEqual(out.getvalue(), render_page(self.markdown, TEMPLATE))
+
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            stream_page(io.StringIO("## Only a subheading"), io.StringIO(), TEMPLATE)
+
+    def test_same_lines_as_render_page(self):
+        # an unclosed fence keeps the trailing blank lines of the page
+        documents = [
+            "# T\n## H\n- x\n\n\n  \n```\n## H\n## H\n  \n---\n---\n",
+            "# T\n\n```\ncode\n\n  \n",
+            "# T\n\n```\ncode",
+            "# T\n\n```x```\n\npara\n",
+        ]
+        for markdown in documents:
+            expected = render_page(markdown, TEMPLATE)
+            with tempfile.TemporaryFile() as f:
+                f.write(markdown.encode())
+                f.flush()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    sources = {
+                        "text": io.StringIO(markdown),
+                        "binary": io.BytesIO(markdown.encode()),
+                        "mmap": buffer,
+                    }
+                    for kind, source in sources.items():
+                        with self.subTest(markdown=markdown, source=kind):
+                            out = io.StringIO()
+                            stream_page(source, out, TEMPLATE)
+                            self.assertEqual(out.getvalue(), expected)
+
+    def test_toc_after_content(self):
+        markdown = self.markdown + "\n## Part\n\n## Part\n"
+        template = TEMPLATE + "<nav>{{ TOC }}</nav>"
+        out = io.StringIO()
+        headings = Headings()
+        stream_page(io.StringIO(markdown), out, template, headings=headings)
+        self.assertEqual(out.getvalue(), render_page(markdown, template))
+        self.assertEqual(headings.entries, parse_page(markdown)[3])
+        self.assertIn('<a href="#part-1">Part</a>', out.getvalue())
+
+    def test_toc_before_content(self):
+        template = "<nav>{{ TOC }}</nav>" + TEMPLATE
+        out = io.StringIO()
+        stream_page(io.StringIO(self.markdown + "\n## Part\n"), out, template)
+        self.assertTrue(out.getvalue().startswith("<nav></nav>"))
+
+    def test_front_matter(self):
+        markdown = "---\nauthor: me\n---\n" + self.markdown
+        template = "{{ author }}:" + TEMPLATE
+        out = io.StringIO()
+        stream_page(io.StringIO(markdown), out, template)
+        self.assertEqual(out.getvalue(), render_page(markdown, template))
+        self.assertTrue(out.getvalue().startswith("me:<title>Hello **world**"))
+
+    def test_bounded_memory(self):
+        size = 1024 * 1024
+        out = CountingWriter()
+        tracemalloc.start()
+        try:
+            stream_page(generated_lines(size), out, TEMPLATE)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(out.written, size)
+        # a fixed ceiling, interning tag names may resize the interned dict once
+        self.assertLess(peak, 2 * 1024 * 1024)
+
+    @unittest.skipUnless(
+        os.environ.get("SSGEN_LARGE_TESTS"), "set SSGEN_LARGE_TESTS=1 to run"
+    )
+    def test_memory_ceiling_1gb(self):
+        """Streams a 1 GB page in a fresh process and checks its maximum RSS"""
+        script = textwrap.dedent(
+            """
+            import resource
+            import test_page
+            from page import stream_page
+
+            out = test_page.CountingWriter()
+            stream_page(test_page.generated_lines(1024**3), out, test_page.TEMPLATE)
+            assert out.written > 1024**3, out.written
+            print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+            """
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        max_rss_kb = int(result.stdout.strip())
+        self.assertLess(max_rss_kb, 64 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import gzip
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import postprocess
+from postprocess import gzip_file, is_compressible, minify_html, write_gzip
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_block_whitespace_dropped(self):
+        self.assertEqual(
+            minify_html("<div>\n  <h1> Title </h1>\n  <p>a\n   b</p>\n</div>\n"),
+            "<div><h1>Title</h1><p>a b</p></div>",
+        )
+
+    def test_inline_whitespace_kept(self):
+        self.assertEqual(
+            minify_html("<p>a <b>b</b>  <i>c</i></p>"), "<p>a <b>b</b> <i>c</i></p>"
+        )
+
+    def test_comments_removed(self):
+        self.assertEqual(minify_html("<p>a<!-- <p>x</p> -->b</p>"), "<p>ab</p>")
+
+    def test_preformatted_kept(self):
+        html = "<pre>  keep\n  this </pre><script>if (a  <b) {}</script>"
+        self.assertEqual(minify_html(f"<div>\n{html}\n</div>"), f"<div>{html}</div>")
+
+    def test_doctype(self):
+        self.assertEqual(
+            minify_html("<!DOCTYPE html>\n<html>\n<head></head></html>"),
+            "<!DOCTYPE html><html><head></head></html>",
+        )
+
+    def test_empty(self):
+        self.assertEqual(minify_html(""), "")
+
+
+class TestGzip(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "index.html"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_is_compressible(self):
+        self.assertTrue(is_compressible("a/styles.CSS"))
+        self.assertFalse(is_compressible("logo.png"))
+
+    def test_write_gzip(self):
+        data = b"<p>text</p>" * 1000
+        write_gzip(self.path, data, 6)
+        gz = Path(postprocess.gzip_path(self.path))
+        self.assertEqual(gzip.decompress(gz.read_bytes()), data)
+        first = gz.read_bytes()
+        # no timestamp in the header, equal data gives equal files
+        write_gzip(self.path, data, 6)
+        self.assertEqual(gz.read_bytes(), first)
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html.gz"])
+
+    def test_gzip_file(self):
+        data = os.urandom(3 * 2**20)
+        self.path.write_bytes(data)
+        gzip_file(self.path, 1)
+        gz = Path(postprocess.gzip_path(self.path))
+        self.assertEqual(gzip.decompress(gz.read_bytes()), data)
+
+    def test_remove_gzip(self):
+        write_gzip(self.path, b"x")
+        postprocess.remove_gzip(self.path)
+        postprocess.remove_gzip(self.path)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
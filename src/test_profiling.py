@@ -0,0 +1,97 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import profiling
+
+
+@profiling.timed("outer")
+def outer():
+    time.sleep(0.002)
+    return inner()
+
+
+@profiling.timed("inner")
+def inner():
+    time.sleep(0.002)
+    return "done"
+
+
+@profiling.timed("numbers")
+def numbers(count):
+    yield from range(count)
+
+
+class TestSpans(unittest.TestCase):
+    def setUp(self):
+        profiling.enable()
+
+    def tearDown(self):
+        profiling.enable(False)
+
+    def test_disabled(self):
+        profiling.enable(False)
+        self.assertEqual(outer(), "done")
+        self.assertEqual(profiling.collect(), {})
+
+    def test_nested_self_times(self):
+        self.assertEqual(outer(), "done")
+        spans = profiling.collect()
+        self.assertEqual(set(spans), {"outer", "outer;inner"})
+        self.assertGreaterEqual(spans["outer"], 0.002)
+        self.assertGreaterEqual(spans["outer;inner"], 0.002)
+        self.assertEqual(profiling.collect(), {})
+
+    def test_span_context(self):
+        with profiling.span("page"):
+            inner()
+        self.assertEqual(set(profiling.collect()), {"page", "page;inner"})
+
+    def test_span_records_on_error(self):
+        with self.assertRaises(KeyError):
+            with profiling.span("page"):
+                raise KeyError
+        self.assertEqual(set(profiling.collect()), {"page"})
+
+    def test_generator(self):
+        with profiling.span("consumer"):
+            self.assertEqual(list(numbers(3)), [0, 1, 2])
+        self.assertEqual(set(profiling.collect()), {"consumer", "consumer;numbers"})
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.page_times = {
+            "fast.md": {"parse": 0.1, "parse;text_to_textnodes": 0.2},
+            "slow.md": {"parse": 0.5, "render;to_html": 1.0},
+        }
+
+    def test_stage_totals(self):
+        self.assertEqual(
+            profiling.stage_totals(self.page_times["slow.md"]),
+            {"parse": 0.5, "to_html": 1.0},
+        )
+
+    def test_build_report(self):
+        report = profiling.build_report(self.page_times, top=1)
+        self.assertEqual(report["pages"], 2)
+        self.assertAlmostEqual(report["seconds"], 1.8)
+        self.assertAlmostEqual(report["stages"]["parse"], 0.6)
+        self.assertEqual(
+            [page["source"] for page in report["slowest_pages"]], ["slow.md"]
+        )
+        self.assertIn("build;parse;text_to_textnodes 200000", report["folded"])
+
+    def test_write_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "profile.json"
+            profiling.write_report(profiling.build_report(self.page_times), path)
+            self.assertEqual(json.loads(path.read_text())["pages"], 2)
+            folded = path.with_suffix(".folded").read_text().splitlines()
+            self.assertIn("build;render;to_html 1000000", folded)
+
+
+if __name__ == "__main__":
+    unittest.main()
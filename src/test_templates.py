@@ -0,0 +1,120 @@
+import os
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+import templates
+from templates import Template, compile_template
+
+SOURCE = "<title>{{ Title }}</title><p>{{author}}</p><main>{{ Content }}</main>"
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template(SOURCE)
+        self.assertEqual(
+            template.segments, ("<title>", "</title><p>", "</p><main>", "</main>")
+        )
+        self.assertEqual(
+            template.slots,
+            (
+                ("Title", "{{ Title }}"),
+                ("author", "{{author}}"),
+                ("Content", "{{ Content }}"),
+            ),
+        )
+
+    def test_no_slots(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.slots, ())
+        self.assertEqual(template.render({"Title": "x"}), "<p>static</p>")
+
+    def test_render(self):
+        self.assertEqual(
+            Template(SOURCE).render({"Title": "T", "author": "A", "Content": "C"}),
+            "<title>T</title><p>A</p><main>C</main>",
+        )
+
+    def test_render_missing_field(self):
+        self.assertEqual(
+            Template(SOURCE).render({"Title": "T", "Content": "C"}),
+            "<title>T</title><p>{{author}}</p><main>C</main>",
+        )
+
+    def test_render_fields_not_scanned(self):
+        # a field value looking like a placeholder is not filled again
+        self.assertEqual(
+            Template(SOURCE).render({"Title": "{{ Content }}", "Content": "C"}),
+            "<title>{{ Content }}</title><p>{{author}}</p><main>C</main>",
+        )
+
+    def test_repeated_slot(self):
+        self.assertEqual(
+            Template("{{ Title }}-{{ Title }}").render({"Title": "T"}), "T-T"
+        )
+
+    def test_render_around(self):
+        head, tail = Template(SOURCE).render_around({"Title": "T", "author": "A"})
+        self.assertEqual(head, "<title>T</title><p>A</p><main>")
+        self.assertEqual(tail, "</main>")
+
+    def test_render_around_missing_slot(self):
+        self.assertEqual(
+            Template("<title>{{ Title }}</title>").render_around({"Title": "T"}),
+            ("<title>T</title>", ""),
+        )
+
+    def test_with_urls(self):
+        template = Template(
+            '<link href="/styles.css"><img SRC = \'/a.png\'>'
+            '<a href="/other">{{ Title }}</a>'
+        )
+        urls = {"/styles.css": "/s.1.css", "/a.png": "/a.2.png"}
+        rewritten = template.with_urls(urls)
+        self.assertEqual(
+            rewritten.source,
+            '<link href="/s.1.css"><img SRC = \'/a.2.png\'>'
+            '<a href="/other">{{ Title }}</a>',
+        )
+        self.assertEqual(rewritten.slots, (("Title", "{{ Title }}"),))
+
+    def test_pickle(self):
+        template = Template(SOURCE)
+        restored = pickle.loads(pickle.dumps(template))
+        self.assertEqual(restored, template)
+        self.assertEqual(restored.slots, template.slots)
+
+    def test_compile_template_cached(self):
+        self.assertIs(compile_template(SOURCE), compile_template(SOURCE))
+
+
+class TestLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "template.html"
+        self.path.write_text(SOURCE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached(self):
+        self.assertIs(templates.load(self.path), templates.load(str(self.path)))
+
+    def test_invalidated_on_change(self):
+        first = templates.load(self.path)
+        stat = self.path.stat()
+        self.path.write_text("<h1>{{ Title }}</h1>{{ Content }}")
+        # a different mtime even on filesystems with coarse timestamps
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        second = templates.load(self.path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({"Title": "T", "Content": "C"}), "<h1>T</h1>C")
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            templates.load(Path(self.tmp.name) / "missing.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,9 @@ import unittest
 
 from htmlnode import LeafNode
 from textnode import (
+    DELIMITERS,
+    FrozenTextNode,
+    InlineParseCache,
     TextNode,
     TextType,
     split_nodes_delimiter,
@@ -9,6 +12,8 @@ from textnode import (
     split_nodes_link,
     text_node_to_html_node,
     text_to_textnodes,
+    textnodes_to_html,
+    tokenize_inline,
 )
 
 
@@ -48,6 +53,10 @@ class TestTextNode(unittest.TestCase):
         expected_repr = "TextNode('This is a text node', bold, None)"
         self.assertEqual(repr(node), expected_repr)
 
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
@@ -87,6 +96,57 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         html_node: LeafNode = text_node_to_html_node(node)
         self.assertEqual(html_node.tag, "a")
         self.assertEqual(html_node.props, {"href": "www.link.pl"})
+        self.assertEqual(
+            html_node.to_html(), '<a href="www.link.pl">This is a link node</a>'
+        )
+
+
+class TestTextNodesToHTML(unittest.TestCase):
+    def test_same_as_leaf_nodes(self):
+        nodes = [
+            TextNode("plain ", TextType.NORMAL),
+            TextNode("bold", TextType.BOLD),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("code", TextType.CODE),
+            TextNode("a link", TextType.LINK, 'https://boot.dev/?a=1&b="2"'),
+            TextNode('an "image"', TextType.IMG, "img.png"),
+        ]
+        self.assertEqual(
+            textnodes_to_html(nodes),
+            "".join(text_node_to_html_node(node).to_html() for node in nodes),
+        )
+
+    def test_empty(self):
+        self.assertEqual(textnodes_to_html([]), "")
+
+    def test_urls(self):
+        nodes = [
+            TextNode("link", TextType.LINK, "/a.css"),
+            TextNode("image", TextType.IMG, "/b.png"),
+            TextNode("other", TextType.LINK, "/c"),
+        ]
+        urls = {"/a.css": "/a.1.css", "/b.png": "/b.2.png"}
+        expected = (
+            '<a href="/a.1.css">link</a><img src="/b.2.png" alt="image" />'
+            '<a href="/c">other</a>'
+        )
+        self.assertEqual(textnodes_to_html(nodes, urls), expected)
+        self.assertEqual(
+            "".join(text_node_to_html_node(node, urls).to_html() for node in nodes),
+            expected,
+        )
+
+    def test_empty_text(self):
+        with self.assertRaises(ValueError):
+            textnodes_to_html([TextNode("", TextType.BOLD)])
+        with self.assertRaises(ValueError):
+            textnodes_to_html([TextNode("", TextType.LINK, "url")])
+
+    def test_empty_image_alt(self):
+        self.assertEqual(
+            textnodes_to_html([TextNode("", TextType.IMG, "x.png")]),
+            '<img src="x.png" alt="" />',
+        )
 
 
 class TestSplitNodesDelimiter(unittest.TestCase):
@@ -316,5 +376,141 @@ class TextTextToMarkdown(unittest.TestCase):
     #     self.assertEqual(text_to_textnodes(markdown_text), expected)
 
 
+class TestTokenizeInline(unittest.TestCase):
+    @staticmethod
+    def split_nodes_chain(text):
+        """The original multi-pass text_to_textnodes used as a reference"""
+        nodes = [TextNode(text, TextType.NORMAL)]
+        for delimiter, text_type in DELIMITERS.items():
+            nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+        return split_nodes_link(split_nodes_image(nodes))
+
+    def test_compat_matches_chain(self):
+        samples = [
+            "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev).",
+            " ",
+            "",
+            "This is a text with no markdown syntax",
+            "**bold****bold again**",
+            "**a _b_ c** and `x` then _y_",
+            "***a**",
+            "[![Inner image](inner.png)](https://inner-link.com)",
+            "`![Code image](code.jpg)` and [a](b)",
+        ]
+        for text in samples:
+            with self.subTest(text=text):
+                self.assertEqual(tokenize_inline(text), self.split_nodes_chain(text))
+
+    def test_compat_raises_like_chain(self):
+        samples = [
+            "This is a text with *unmatched delimiters**",
+            "_a **b** c_",
+            "`a_b_c`",
+            "a `b",
+        ]
+        for text in samples:
+            with self.subTest(text=text):
+                with self.assertRaises(Exception):
+                    self.split_nodes_chain(text)
+                with self.assertRaises(Exception):
+                    tokenize_inline(text)
+
+    def test_lenient_unmatched_delimiters(self):
+        self.assertEqual(
+            tokenize_inline("snake_case and **bold** and `tick", compat=False),
+            [
+                TextNode("snake_case and ", TextType.NORMAL),
+                TextNode("bold", TextType.BOLD),
+                TextNode(" and `tick", TextType.NORMAL),
+            ],
+        )
+
+    def test_lenient_delimiters_in_link(self):
+        self.assertEqual(
+            tokenize_inline("see [my_page](https://a.com/my_page) _now_", compat=False),
+            [
+                TextNode("see ", TextType.NORMAL),
+                TextNode("my_page", TextType.LINK, "https://a.com/my_page"),
+                TextNode(" ", TextType.NORMAL),
+                TextNode("now", TextType.ITALIC),
+            ],
+        )
+
+    def test_lenient_delimiter_not_closed_in_link(self):
+        self.assertEqual(
+            tokenize_inline("_a [b](c_d)", compat=False),
+            [
+                TextNode("_a ", TextType.NORMAL),
+                TextNode("b", TextType.LINK, "c_d"),
+            ],
+        )
+        self.assertEqual(
+            tokenize_inline("_a [b](c_d) e_", compat=False),
+            [TextNode("a [b](c_d) e", TextType.ITALIC)],
+        )
+
+    def test_lenient_image(self):
+        self.assertEqual(
+            tokenize_inline("![alt_text](img_1.png)", compat=False),
+            [TextNode("alt_text", TextType.IMG, "img_1.png")],
+        )
+
+
+class TestInlineParseCache(unittest.TestCase):
+    def test_same_result_as_text_to_textnodes(self):
+        text = "A **bold** [link](https://boot.dev) and ![img](a.png)"
+        cache = InlineParseCache()
+        self.assertEqual(list(cache.parse(text)), text_to_textnodes(text))
+
+    def test_hits_and_misses(self):
+        cache = InlineParseCache()
+        first = cache.parse("See _also_")
+        second = cache("See _also_")
+        self.assertIs(first, second)
+        self.assertEqual(
+            cache.stats(), {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+        )
+
+    def test_eviction_least_recently_used(self):
+        cache = InlineParseCache(maxsize=2)
+        cache.parse("a")
+        cache.parse("b")
+        cache.parse("a")
+        cache.parse("c")
+        self.assertEqual(cache.evictions, 1)
+        cache.parse("a")
+        self.assertEqual(cache.hits, 2)
+        cache.parse("b")
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(len(cache), 2)
+
+    def test_results_are_immutable(self):
+        nodes = InlineParseCache().parse("**bold**")
+        self.assertIsInstance(nodes, tuple)
+        self.assertIsInstance(nodes[0], FrozenTextNode)
+        with self.assertRaises(AttributeError):
+            nodes[0].text = "changed"
+
+    def test_errors_not_cached(self):
+        cache = InlineParseCache()
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                cache.parse("unmatched **bold")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 2)
+
+    def test_clear(self):
+        cache = InlineParseCache()
+        cache.parse("a")
+        cache.clear()
+        self.assertEqual(
+            cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
+        )
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            InlineParseCache(maxsize=0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from toc import HEADING_INDEX, Headings, render_toc, slugify, write_heading_index
+
+
+class TestSlugify(unittest.TestCase):
+    def test_words(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+
+    def test_separators(self):
+        self.assertEqual(slugify(" snake_case -- and  more "), "snake-case-and-more")
+
+    def test_unicode(self):
+        self.assertEqual(slugify("Über Straße"), "über-straße")
+
+    def test_no_word(self):
+        self.assertEqual(slugify("?!"), "")
+
+
+class TestHeadings(unittest.TestCase):
+    def test_collected(self):
+        headings = Headings()
+        self.assertEqual(headings.add(1, "Title"), "title")
+        self.assertEqual(headings.add(2, "A section"), "a-section")
+        self.assertEqual(
+            list(headings), [(1, "Title", "title"), (2, "A section", "a-section")]
+        )
+
+    def test_repeated(self):
+        headings = Headings()
+        ids = [headings.add(2, "Intro") for _ in range(3)]
+        self.assertEqual(ids, ["intro", "intro-1", "intro-2"])
+
+    def test_suffix_taken_by_text(self):
+        headings = Headings()
+        self.assertEqual(headings.add(2, "Intro 1"), "intro-1")
+        self.assertEqual(headings.add(2, "Intro"), "intro")
+        self.assertEqual(headings.add(2, "Intro"), "intro-2")
+        # "intro-2" was handed out as a suffix
+        self.assertEqual(headings.add(2, "Intro 2"), "intro-2-1")
+
+    def test_default_slug(self):
+        headings = Headings()
+        self.assertEqual(headings.add(2, "?"), "section")
+        self.assertEqual(headings.add(2, "!"), "section-1")
+
+    def test_not_collected(self):
+        headings = Headings(collect=False)
+        self.assertEqual(headings.add(2, "Intro"), "intro")
+        self.assertEqual(headings.add(2, "Intro"), "intro-1")
+        self.assertEqual(len(headings), 0)
+
+
+class TestRenderToc(unittest.TestCase):
+    def test_nested(self):
+        headings = [
+            (1, "Title", "title"),
+            (2, "A", "a"),
+            (3, "B", "b"),
+            (2, "C", "c"),
+        ]
+        self.assertEqual(
+            render_toc(headings),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a></li></ul></li>'
+            '<li><a href="#c">C</a></li></ul>',
+        )
+
+    def test_closes_deep_lists(self):
+        headings = [(2, "A", "a"), (3, "B", "b"), (4, "C", "c"), (2, "D", "d")]
+        self.assertEqual(
+            render_toc(headings),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a>'
+            '<ul><li><a href="#c">C</a></li></ul></li></ul></li>'
+            '<li><a href="#d">D</a></li></ul>',
+        )
+
+    def test_skipped_level(self):
+        headings = [(2, "A", "a"), (4, "B", "b"), (3, "C", "c")]
+        self.assertEqual(
+            render_toc(headings),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a></li>'
+            '<li><a href="#c">C</a></li></ul></li></ul>',
+        )
+
+    def test_levels(self):
+        headings = [(1, "T", "t"), (2, "A", "a"), (3, "B", "b")]
+        self.assertEqual(
+            render_toc(headings, min_level=1, max_level=1),
+            '<ul><li><a href="#t">T</a></li></ul>',
+        )
+
+    def test_empty(self):
+        self.assertEqual(render_toc([(1, "Title", "title")]), "")
+
+
+class TestHeadingIndex(unittest.TestCase):
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_heading_index(tmp, {"index.html": [(1, "Home", "home")]})
+            data = json.loads((Path(tmp) / HEADING_INDEX).read_text())
+        self.assertEqual(
+            data, {"index.html": [{"level": 1, "text": "Home", "id": "home"}]}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
 import re
+from bisect import bisect_right
+from collections import OrderedDict
 from enum import Enum
-from typing import Optional
+from typing import Mapping, Optional
 
 import extract
 import htmlnode
+from profiling import timed
 
 
 class TextType(Enum):
@@ -29,6 +32,8 @@ class TextNode:
         url (Optional[str]): An optional URL associated with the text node (e.g., for links or images).
     """
 
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: Optional[str] = None):
         self.text = text
         self.text_type = text_type
@@ -46,9 +51,37 @@ class TextNode:
         # used r! to escape possible special characters in the output
 
 
-def text_node_to_html_node(text_node: TextNode) -> htmlnode.LeafNode:
-    """This function converts TextNode to an LeafNode"""
+class FrozenTextNode(TextNode):
+    """A TextNode that can not be modified, so it can be shared between results"""
+
+    __slots__ = ()
+
+    def __init__(self, text: str, text_type: TextType, url: Optional[str] = None):
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "text_type", text_type)
+        object.__setattr__(self, "url", url)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"FrozenTextNode is immutable, can not set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"FrozenTextNode is immutable, can not delete {name!r}")
+
+    def __hash__(self) -> int:
+        return hash((self.text, self.text_type, self.url))
 
+
+def text_node_to_html_node(
+    text_node: TextNode, urls: Mapping[str, str] | None = None
+) -> htmlnode.LeafNode:
+    """
+    This function converts TextNode to an LeafNode
+    Link and image URLs found in urls are replaced (e.g. fingerprinted assets)
+    """
+
+    url = text_node.url
+    if urls is not None and url is not None:
+        url = urls.get(url, url)
     match text_node.text_type:
         case TextType.NORMAL:
             return htmlnode.LeafNode(tag=None, value=text_node.text)
@@ -59,17 +92,61 @@ def text_node_to_html_node(text_node: TextNode) -> htmlnode.LeafNode:
         case TextType.CODE:
             return htmlnode.LeafNode(tag="code", value=text_node.text)
         case TextType.LINK:
-            return htmlnode.LeafNode(tag="a", value=None, props={"href": text_node.url})
+            return htmlnode.LeafNode(tag="a", value=text_node.text, props={"href": url})
         case TextType.IMG:
             return htmlnode.LeafNode(
                 tag="img",
                 value=None,
-                props={"src": text_node.url, "alt": text_node.text},
+                props={"src": url, "alt": text_node.text},
             )
         case _:
             raise ValueError("invalid text type")
 
 
+# open and close tags of the text types rendered as <tag>text</tag>,
+# links and images carry attributes and are formatted separately
+INLINE_TAGS = {
+    TextType.NORMAL: ("", ""),
+    TextType.BOLD: ("<b>", "</b>"),
+    TextType.ITALIC: ("<i>", "</i>"),
+    TextType.CODE: ("<code>", "</code>"),
+}
+
+
+def textnodes_to_html(
+    nodes: list[TextNode], urls: Mapping[str, str] | None = None
+) -> str:
+    """
+    Renders TextNodes as HTML without building a LeafNode for every node.
+    The output is the same as rendering text_node_to_html_node of every node,
+    link and image URLs are looked up in urls the same way.
+    """
+    parts = []
+    append = parts.append
+    for node in nodes:
+        tags = INLINE_TAGS.get(node.text_type)
+        if tags is not None:
+            if not node.text:
+                raise ValueError("LeafNode must have a value.")
+            append(tags[0])
+            append(node.text)
+            append(tags[1])
+        elif node.text_type is TextType.LINK:
+            if not node.text:
+                raise ValueError("LeafNode must have a value.")
+            url = node.url if urls is None else urls.get(node.url, node.url)
+            append(f"<a{htmlnode.serialize_props((('href', url),))}>")
+            append(node.text)
+            append("</a>")
+        elif node.text_type is TextType.IMG:
+            url = node.url if urls is None else urls.get(node.url, node.url)
+            props = htmlnode.serialize_props((("src", url), ("alt", node.text)))
+            append(f"<img{props} />")
+        else:
+            raise ValueError("invalid text type")
+    return "".join(parts)
+
+
 def split_nodes_delimiter(
     old_nodes: list[TextNode], delimiter: str, text_type: TextType
 ) -> list[TextNode]:
@@ -114,57 +191,189 @@ def split_nodes_delimiter(
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
     """Split each TextNode so that images are extracted to separate TextNode"""
     result = []
-    img_pattern = re.compile(r"(!\[[^\[\]]*\]\([^\(\)]*\))")  # link pattern
 
     for node in old_nodes:
         # extraction should happen from TextType.NORMAL only
         # this might change later if nesting will be implemented
         if node.text_type != TextType.NORMAL:
             result.append(node)
-        elif node.text_type == TextType.NORMAL:
-            node_parts = img_pattern.split(node.text)
-
-            for part in node_parts:
-                # do not add an empty node to the result list
-                if not part:
-                    continue
-                if img_pattern.match(part):
-                    # extract markdown returns a list of tuples
-                    anchor, url = extract.extract_markdown_images(part)[0]
-                    result.append(TextNode(anchor, TextType.IMG, url))
-                else:
-                    result.append(TextNode(text=part, text_type=TextType.NORMAL))
+            continue
+        text = node.text
+        pos = 0
+        for match in extract.IMAGE_PATTERN.finditer(text):
+            start, end = match.span()
+            anchor, url = match.groups()
+            # do not add an empty node to the result list
+            if start > pos:
+                result.append(TextNode(text=text[pos:start], text_type=TextType.NORMAL))
+            result.append(TextNode(anchor, TextType.IMG, url))
+            pos = end
+        if pos < len(text):
+            result.append(TextNode(text=text[pos:], text_type=TextType.NORMAL))
 
     return result
 
 
+def _link_in(part: str) -> tuple[str, str]:
+    """Returns label and url of the first strict link within a link syntax span"""
+    # the spans do not overlap, so searching every part stays linear
+    match = extract.LINK_PATTERN.search(part)
+    if match is None:
+        raise ValueError(f"No [label](url) link found in {part!r}.")
+    return match.groups()
+
+
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     """Split each TextNode so that links are extracted to separate TextNode"""
     result = []
-    link_pattern = re.compile(r"(\[[^\]]+]\([^)]+\))")  # link pattern
 
     for node in old_nodes:
         # extraction should happen from TextType.NORMAL only
         # this might change later if nesting will be implemented
         if node.text_type != TextType.NORMAL:
             result.append(node)
-        elif node.text_type == TextType.NORMAL:
-            node_parts = link_pattern.split(node.text)
-
-            for part in node_parts:
-                # do not add an empty node to the result list
-                if not part:
-                    continue
-                if link_pattern.match(part):
-                    # extract markdown returns a list of tuples
-                    label, url = extract.extract_markdown_links(part)[0]
-                    result.append(TextNode(label, TextType.LINK, url))
-                else:
-                    result.append(TextNode(text=part, text_type=TextType.NORMAL))
+            continue
+        text = node.text
+        pos = 0
+        for start, end in extract.iter_link_syntax(text):
+            # do not add an empty node to the result list
+            if start > pos:
+                result.append(TextNode(text=text[pos:start], text_type=TextType.NORMAL))
+            label, url = _link_in(text[start:end])
+            result.append(TextNode(label, TextType.LINK, url))
+            pos = end
+        if pos < len(text):
+            result.append(TextNode(text=text[pos:], text_type=TextType.NORMAL))
+
+    return result
+
+
+# delimiters in order of precedence, the same order the split_nodes_* chain used
+DELIMITERS = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+_DELIMITER_PATTERN = re.compile(r"\*\*|[_`]")
+# lenient mode also stops on link/image openers so their urls are not split
+_INLINE_PATTERN = re.compile(r"\*\*|[_`\[]|!\[")
 
+
+def _split_run_compat(run: str, result: list[TextNode]) -> None:
+    """Append a plain run to result, extracting images and links like the old chain"""
+    if not run:
+        return
+    if "[" not in run:
+        result.append(TextNode(run, TextType.NORMAL))
+        return
+    nodes = split_nodes_image([TextNode(run, TextType.NORMAL)])
+    result.extend(split_nodes_link(nodes))
+
+
+def _tokenize_compat(text: str) -> list[TextNode]:
+    """Single scan reproducing the output and errors of the split_nodes_* chain"""
+    result = []
+    precedence = tuple(DELIMITERS)
+    pos = 0
+
+    while match := _DELIMITER_PATTERN.search(text, pos):
+        delimiter = match.group()
+        start = match.end()
+        end = text.find(delimiter, start)
+        # the chain split by higher precedence delimiters first, so a span
+        # containing one of them was an unbalanced fragment there
+        if end == -1 or any(
+            text.find(higher, start, end) != -1
+            for higher in precedence[: precedence.index(delimiter)]
+        ):
+            raise Exception(
+                f"Delimtiers ( {delimiter} ) do not match, which indicates invalid markdown syntax."
+            )
+        _split_run_compat(text[pos : match.start()], result)
+        if end > start:
+            result.append(TextNode(text[start:end], DELIMITERS[delimiter]))
+        pos = end + len(delimiter)
+
+    _split_run_compat(text[pos:], result)
     return result
 
 
+def _find_outside_spans(
+    text: str, token: str, start: int, spans: tuple[list[int], list[int]]
+) -> int:
+    """Finds token from start like str.find, skipping link and image spans"""
+    starts, ends = spans
+    end = text.find(token, start)
+    while end != -1:
+        index = bisect_right(starts, end) - 1
+        if index < 0 or ends[index] <= end:
+            return end
+        end = text.find(token, ends[index])
+    return end
+
+
+def _tokenize_lenient(text: str) -> list[TextNode]:
+    """
+    Single scan treating unmatched delimiters as plain text.
+    Delimiters inside link and image spans do not close emphasis or code.
+    """
+    result = []
+    pos = 0  # start of the pending normal text
+    scan = 0  # where the next search for markup starts
+    exhausted = set()  # delimiters with no further closing occurrence
+    spans = None  # starts and ends of the link and image spans, found once
+
+    while match := _INLINE_PATTERN.search(text, scan):
+        token = match.group()
+        start = match.end()
+
+        if token in ("[", "!["):
+            span = extract.SPAN_PATTERN.match(text, match.start())
+            if span is None:
+                scan = start
+                continue
+            if match.start() > pos:
+                result.append(TextNode(text[pos : match.start()], TextType.NORMAL))
+            label, url = span.groups()
+            text_type = TextType.LINK if token == "[" else TextType.IMG
+            result.append(TextNode(label, text_type, url))
+            pos = scan = span.end()
+            continue
+
+        if spans is None:
+            found = list(extract.iter_spans(text))
+            spans = [span[0] for span in found], [span[1] for span in found]
+        end = (
+            -1 if token in exhausted else _find_outside_spans(text, token, start, spans)
+        )
+        if end == -1:
+            # no closing delimiter later on, so none of the following ones match either
+            exhausted.add(token)
+            scan = start
+            continue
+        if match.start() > pos:
+            result.append(TextNode(text[pos : match.start()], TextType.NORMAL))
+        if end > start:
+            result.append(TextNode(text[start:end], DELIMITERS[token]))
+        pos = scan = end + len(token)
+
+    if pos < len(text):
+        result.append(TextNode(text[pos:], TextType.NORMAL))
+    return result
+
+
+def tokenize_inline(text: str, compat: bool = True) -> list[TextNode]:
+    """
+    Tokenizes inline markdown into TextNodes in a single left-to-right scan
+
+    param text: str: markdown string to be tokenized
+    param compat: bool: reproduce the split_nodes_* chain exactly, including raising
+                        on unmatched delimiters; when False unmatched delimiters are
+                        kept as plain text and delimiters inside links/images are ignored
+    return list[TextNode]: the same nodes the split_nodes_* chain produces in compat mode
+    """
+    if compat:
+        return _tokenize_compat(text)
+    return _tokenize_lenient(text)
+
+
+@timed("text_to_textnodes")
 def text_to_textnodes(text: str) -> list[TextNode]:
     """
     Converts text to TextNodes which parse markdown syntax and prepare for HTML conversion
@@ -172,19 +381,71 @@ def text_to_textnodes(text: str) -> list[TextNode]:
     param text: str: markdown string to be coverted to HTML
     return list[TextNode]: TextNode class used for markdown syntax parsing
     """
-    # creating TextNode for syntax processing
-    text_node = TextNode(text=text, text_type=TextType.NORMAL)
-    # preparing delimiter config
-    # config part might be moved later in order to make code more reusable and maintainable
-    delimiter_config = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+    return tokenize_inline(text, compat=True)
 
-    processed_nodes = [text_node]
-    for delimiter, text_type in delimiter_config.items():
-        processed_nodes = split_nodes_delimiter(
-            processed_nodes, delimiter=delimiter, text_type=text_type
-        )
 
-    processed_nodes = split_nodes_image(processed_nodes)
-    processed_nodes = split_nodes_link(processed_nodes)
+class InlineParseCache:
+    """
+    Bounded LRU cache of text_to_textnodes results keyed by the text.
+
+    Repeated paragraphs (footers, admonitions, "see also" lines) are parsed
+    once. Results are tuples of FrozenTextNode, so callers can share them.
+    Texts failing to parse are not cached and raise on every call.
+
+    Attributes:
+        maxsize (int): The maximum number of cached texts.
+        hits (int): Calls answered from the cache.
+        misses (int): Calls that had to parse the text.
+        evictions (int): Entries dropped to stay within maxsize.
+    """
 
-    return processed_nodes
+    def __init__(self, maxsize: int = 4096, compat: bool = True):
+        if maxsize < 1:
+            raise ValueError("InlineParseCache needs room for at least one entry.")
+        self.maxsize = maxsize
+        self.compat = compat
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[FrozenTextNode, ...]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __call__(self, text: str) -> tuple[FrozenTextNode, ...]:
+        return self.parse(text)
+
+    @timed("inline_cache")
+    def parse(self, text: str) -> tuple[FrozenTextNode, ...]:
+        """Returns the TextNodes of the text, parsing it only if it is not cached"""
+        entries = self._entries
+        nodes = entries.get(text)
+        if nodes is not None:
+            self.hits += 1
+            entries.move_to_end(text)
+            return nodes
+
+        self.misses += 1
+        nodes = tuple(
+            FrozenTextNode(node.text, node.text_type, node.url)
+            for node in tokenize_inline(text, compat=self.compat)
+        )
+        entries[text] = nodes
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return nodes
+
+    def stats(self) -> dict[str, int]:
+        """Returns the counters, e.g. for build reports"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+    def clear(self) -> None:
+        """Drops every entry and resets the counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
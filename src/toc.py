@@ -0,0 +1,138 @@
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# a heading of a page: level, plain text and the id of its element
+Heading = tuple[int, str, str]
+# output paths relative to the output directory and the headings of each page
+HeadingIndex = dict[str, list[Heading]]
+
+# site-wide heading index, written to the output directory
+HEADING_INDEX = "headings.json"
+# slug of headings without a letter or digit
+DEFAULT_SLUG = "section"
+# headings listed by a table of contents, the h1 is the title of the page
+TOC_MIN_LEVEL = 2
+TOC_MAX_LEVEL = 6
+
+_NOT_SLUG = re.compile(r"[^\w\s-]")
+_SEPARATORS = re.compile(r"[\s_-]+")
+
+
+def slugify(text: str) -> str:
+    """
+    Turns heading text into an id: lowercase words joined by "-".
+    "Hello, World!" gives "hello-world", letters of any script are kept.
+    """
+    words = _NOT_SLUG.sub("", text.lower())
+    return _SEPARATORS.sub("-", words).strip("-")
+
+
+class Headings:
+    """
+    Headings of a page, collected while its blocks are parsed.
+
+    add() gives every heading an id unique within the page. A dict counts the
+    headings asking for every slug, so a repeated heading text gets the next
+    free "-N" suffix straight away instead of the page being searched for it.
+    Suffixed ids are not stored, "intro-2" is taken if "intro" was asked for
+    more than twice, so the dict grows with the distinct heading texts only.
+
+    Attributes:
+        entries (list[Heading]): Level, text and id of every heading in order,
+            stays empty when the headings are not collected.
+    """
+
+    __slots__ = ("entries", "collect", "_counts")
+
+    def __init__(self, collect: bool = True):
+        """
+        :param collect: keep the headings in entries, without it only ids are
+                        handed out, e.g. for a streamed page without a
+                        table of contents
+        """
+        self.entries: list[Heading] = []
+        self.collect = collect
+        # slug to the number of headings that asked for it
+        self._counts: dict[str, int] = {}
+
+    def _taken(self, slug: str) -> bool:
+        """Checks if slug was handed out, as a slug or a suffixed slug"""
+        if slug in self._counts:
+            return True
+        base, _, suffix = slug.rpartition("-")
+        return suffix.isdigit() and 0 < int(suffix) < self._counts.get(base, 0)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Heading]:
+        return iter(self.entries)
+
+    def add(self, level: int, text: str) -> str:
+        """Records a heading and returns its id"""
+        base = slugify(text) or DEFAULT_SLUG
+        count = self._counts.get(base, 0)
+        slug = base
+        if count or self._taken(base):
+            count = max(count, 1)
+            slug = f"{base}-{count}"
+            # "Intro 1" may have taken the suffix of the second "Intro"
+            while self._taken(slug):
+                count += 1
+                slug = f"{base}-{count}"
+        self._counts[base] = count + 1
+        if self.collect:
+            self.entries.append((level, text, slug))
+        return slug
+
+
+def render_toc(
+    headings: Iterable[Heading],
+    min_level: int = TOC_MIN_LEVEL,
+    max_level: int = TOC_MAX_LEVEL,
+) -> str:
+    """
+    Renders headings as nested lists of links to their ids.
+
+    A heading deeper than the one before opens a list inside its item, a
+    heading at or above it closes the lists deeper than itself. Skipped
+    levels (an h4 right after an h2) nest one list, not two.
+
+    :returns: str - the <ul>, "" if no heading is within the levels
+    """
+    parts = []
+    levels = []  # heading levels of the open lists, outermost first
+    for level, text, slug in headings:
+        if not min_level <= level <= max_level:
+            continue
+        if levels and level <= levels[-1]:
+            parts.append("</li>")
+            while len(levels) > 1 and level <= levels[-2]:
+                levels.pop()
+                parts.append("</ul></li>")
+        else:
+            parts.append("<ul>")
+            levels.append(level)
+        parts.append(f'<li><a href="#{slug}">{text}</a>')
+    if levels:
+        parts.append("</li>")
+        parts.append("</ul></li>" * (len(levels) - 1))
+        parts.append("</ul>")
+    return "".join(parts)
+
+
+def write_heading_index(dest_dir: str | Path, index: HeadingIndex) -> None:
+    """Writes the headings of every page for search and navigation tooling"""
+    path = Path(dest_dir) / HEADING_INDEX
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        output: [
+            {"level": level, "text": text, "id": slug}
+            for level, text, slug in headings
+        ]
+        for output, headings in index.items()
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True, ensure_ascii=False)